@@ -0,0 +1,349 @@
+"""
+Offline benchmark of the agent hot loop.
+
+Runs AgentExecutor.execute_next_step end-to-end for the goal based, dynamic task and fixed task
+workflows seeded by AgentWorkflowSeed, with the llm, the long term memory, Redis and Postgres
+replaced by the in-process fakes of benchmarks.fakes and an in-memory SQLite database. Only
+SuperAGI's own overhead is measured: steps/sec, DB queries per step, p50/p99 step latency and the
+peak memory allocated by a step.
+
+Usage:
+    python -m benchmarks.agent_step_benchmark --steps 100
+    python -m benchmarks.agent_step_benchmark --workflows goal_based --max-p99-ms 50 --json result.json
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import pkgutil
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack, redirect_stdout
+from datetime import datetime
+from unittest import mock
+
+# encryption_helper refuses to import without a key
+os.environ.setdefault("ENCRYPTION_KEY", "benchmark-encryption-key-32bytes")
+
+import numpy as np
+import redis
+import tiktoken
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import superagi.models
+from benchmarks.fakes import FakeEmbedding, FakeLlm, InMemoryRedis, InMemoryVectorStore, WhitespaceEncoding
+from superagi.agent.task_queue import TaskQueue
+from superagi.agent.types.agent_execution_status import AgentExecutionStatus
+from superagi.agent.workflow_seed import AgentWorkflowSeed, IterationWorkflowSeed
+from superagi.apm.telemetry_writer import TelemetryWriter
+from superagi.helper.encyption_helper import encrypt_data
+from superagi.helper.feed_publisher import FeedPublisher
+from superagi.helper.model_registry import ModelRegistry
+from superagi.helper.toolkit_config_cache import ToolkitConfigCache
+from superagi.helper.token_counter import TokenCounter
+from superagi.jobs.execution_context import ExecutionContextCache
+from superagi.jobs.step_scheduler import StepScheduler
+from superagi.models import db
+from superagi.models.agent import Agent
+from superagi.models.agent_config import AgentConfiguration
+from superagi.models.agent_execution import AgentExecution
+from superagi.models.agent_execution_config import AgentExecutionConfiguration
+from superagi.models.base_model import DBBaseModel
+from superagi.models.models import Models
+from superagi.models.models_config import ModelsConfig
+from superagi.models.organisation import Organisation
+from superagi.models.project import Project
+from superagi.models.workflows.agent_workflow import AgentWorkflow
+from superagi.models.workflows.iteration_workflow import IterationWorkflow
+
+# Benchmark name to the name of the agent workflow seeded by AgentWorkflowSeed.
+WORKFLOWS = {
+    "goal_based": "Goal Based Workflow",
+    "task_based": "Dynamic Task Workflow",
+    "fixed_task": "Fixed Task Workflow",
+}
+MODEL = "gpt-4"
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_for_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+class AgentStepBenchmark:
+    """
+    Seeds an in-memory SQLite database with an organisation, a fake OpenAI model and the agent
+    workflows, then times execute_next_step on fresh agent executions of each workflow. A new
+    execution is started whenever the previous one completes.
+    """
+
+    def __init__(self, steps: int = 50, warmup: int = 5, allocation_steps: int = 20):
+        self.steps = steps
+        self.warmup = warmup
+        self.allocation_steps = allocation_steps
+        self.engine = create_engine("sqlite://", poolclass=StaticPool,
+                                    connect_args={"check_same_thread": False})
+        self.Session = sessionmaker(bind=self.engine)
+        self.redis = InMemoryRedis()
+        self.memory = InMemoryVectorStore(FakeEmbedding())
+        self.query_count = 0
+        self.failed_steps = 0
+        event.listen(self.engine, "before_cursor_execute", self._count_query)
+
+    def _count_query(self, conn, cursor, statement, parameters, context, executemany):
+        self.query_count += 1
+
+    def _fail_step(self, agent_execution_id):
+        self.failed_steps += 1
+
+    def setup(self):
+        for module in pkgutil.walk_packages(superagi.models.__path__, superagi.models.__name__ + "."):
+            importlib.import_module(module.name)
+        DBBaseModel.metadata.create_all(self.engine)
+
+        with self.Session() as session:
+            IterationWorkflowSeed.build_single_step_agent(session)
+            IterationWorkflowSeed.build_task_based_agents(session)
+            IterationWorkflowSeed.build_action_based_agents(session)
+            IterationWorkflowSeed.build_initialize_task_workflow(session)
+            AgentWorkflowSeed.build_goal_based_agent(session)
+            AgentWorkflowSeed.build_task_based_agent(session)
+            AgentWorkflowSeed.build_fixed_task_based_agent(session)
+
+            organisation = Organisation(name="Benchmark", description="Benchmark organisation")
+            session.add(organisation)
+            session.commit()
+            project = Project(name="Benchmark", organisation_id=organisation.id, description="Benchmark project")
+            models_config = ModelsConfig(provider="OpenAI", api_key=encrypt_data("fake-key"), org_id=organisation.id)
+            session.add_all([project, models_config])
+            session.commit()
+            session.add(Models(model_name=MODEL, description="Fake model", end_point="", version="",
+                               model_provider_id=models_config.id, token_limit=8192, type="",
+                               org_id=organisation.id, model_features=""))
+            session.commit()
+            self.project_id = project.id
+
+    def _patches(self) -> ExitStack:
+        stack = ExitStack()
+        stack.enter_context(mock.patch.object(db, "engine", self.engine))
+        stack.enter_context(mock.patch.object(redis.Redis, "from_url", lambda *args, **kwargs: self.redis))
+        stack.enter_context(mock.patch.object(ModelRegistry, "_redis", None))
+        stack.enter_context(mock.patch.object(StepScheduler, "_redis", None))
+        stack.enter_context(mock.patch.object(TaskQueue, "_redis", None))
+        stack.enter_context(mock.patch.object(FeedPublisher, "_redis", None))
+        stack.enter_context(mock.patch.dict(ModelRegistry._entries, clear=True))
+        stack.enter_context(mock.patch.object(ToolkitConfigCache, "_redis", None))
+        stack.enter_context(mock.patch.dict(ToolkitConfigCache._entries, clear=True))
+        stack.enter_context(mock.patch.object(StepScheduler, "schedule_next_step", lambda agent_execution_id: None))
+        stack.enter_context(mock.patch.object(StepScheduler, "schedule_retry", self._fail_step))
+        # telemetry is flushed between workflows, not by a thread sharing the single SQLite connection
+        stack.enter_context(mock.patch.object(TelemetryWriter, "_ensure_flusher", lambda: None))
+        # status webhooks are sent by the workers, only the enqueueing happens on the step path
+        stack.enter_context(mock.patch("superagi.worker.webhook_callback"))
+        stack.enter_context(mock.patch("superagi.llms.llm_model_factory._build_model",
+                                       lambda model_instance, api_key, **kwargs:
+                                       FakeLlm(model=model_instance["model_name"], api_key=api_key)))
+        stack.enter_context(mock.patch.dict("superagi.llms.llm_model_factory._model_pool", clear=True))
+        stack.enter_context(mock.patch.dict(TokenCounter._encodings, clear=True))
+        try:
+            tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # the BPE files can not be downloaded, which also breaks langchain's token splitter
+            stack.enter_context(mock.patch.object(tiktoken, "get_encoding", lambda name: WhitespaceEncoding()))
+            stack.enter_context(mock.patch.object(tiktoken, "encoding_for_model", lambda name: WhitespaceEncoding()))
+        stack.callback(ExecutionContextCache.invalidate)
+        ExecutionContextCache.invalidate()
+
+        from superagi.jobs.agent_executor import AgentExecutor
+        stack.enter_context(mock.patch("superagi.jobs.agent_executor.Session", self.Session))
+        stack.enter_context(mock.patch.object(AgentExecutor, "build_memory",
+                                              lambda model_llm_source, model_api_key: self.memory))
+        return stack
+
+    def create_agent(self, workflow: str) -> int:
+        with self.Session() as session:
+            agent_workflow = AgentWorkflow.find_by_name(session, WORKFLOWS[workflow])
+            agent = Agent(name=f"Benchmark {workflow}", description="Benchmark agent", project_id=self.project_id,
+                          agent_workflow_id=agent_workflow.id)
+            session.add(agent)
+            session.commit()
+            agent_config_values = {
+                "goal": ["Write a short market report about electric bikes"],
+                "instruction": ["Keep every answer brief"],
+                "constraints": ["Exclusively use the commands listed in double quotes e.g. \"command name\""],
+                "tools": [],
+                "exit": "No exit criterion",
+                "iteration_interval": 0,
+                "model": MODEL,
+                "permission_type": "God Mode",
+                "LTM_DB": "Redis",
+                "max_iterations": 1000000,
+                "user_timezone": "UTC",
+                "knowledge": None,
+            }
+            session.add_all([AgentConfiguration(agent_id=agent.id, key=key, value=str(value))
+                             for key, value in agent_config_values.items()])
+            session.commit()
+            return agent.id
+
+    def create_execution(self, agent_id: int) -> int:
+        """Creates a running execution the way the agent execution controller does."""
+        with self.Session() as session:
+            agent = session.query(Agent).filter(Agent.id == agent_id).first()
+            start_step = AgentWorkflow.fetch_trigger_step_id(session, agent.agent_workflow_id)
+            iteration_step_id = IterationWorkflow.fetch_trigger_step_id(session, start_step.action_reference_id).id \
+                if start_step.action_type == "ITERATION_WORKFLOW" else -1
+            execution = AgentExecution(status=AgentExecutionStatus.RUNNING.value, last_execution_time=datetime.now(),
+                                       agent_id=agent_id, name="Benchmark run", num_of_calls=0, num_of_tokens=0,
+                                       current_agent_step_id=start_step.id,
+                                       iteration_workflow_step_id=iteration_step_id)
+            session.add(execution)
+            session.commit()
+            agent_configs = Agent.fetch_configuration(session, agent_id)
+            AgentExecutionConfiguration.add_or_update_agent_execution_config(
+                session=session, execution=execution,
+                agent_execution_configs={key: agent_configs[key] for key in ("goal", "instruction", "tools")})
+            return execution.id
+
+    def _is_running(self, agent_execution_id: int) -> bool:
+        with self.Session() as session:
+            execution = session.query(AgentExecution).filter(AgentExecution.id == agent_execution_id).first()
+            return execution.status == AgentExecutionStatus.RUNNING.value
+
+    def _run_steps(self, executor, agent_id: int, steps: int, trace_allocations: bool = False) -> dict:
+        durations, queries, peaks = [], [], []
+        executions = 0
+        agent_execution_id = None
+        for _ in range(steps):
+            if agent_execution_id is None or not self._is_running(agent_execution_id):
+                agent_execution_id = self.create_execution(agent_id)
+                executions += 1
+            self.query_count = 0
+            if trace_allocations:
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+            started_at = time.perf_counter()
+            executor.execute_next_step(agent_execution_id)
+            durations.append(time.perf_counter() - started_at)
+            queries.append(self.query_count)
+            if trace_allocations:
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        return {"durations": durations, "queries": queries, "peaks": peaks, "executions": executions}
+
+    def run_workflow(self, executor, workflow: str) -> dict:
+        """
+        Benchmarks one workflow.
+
+        Args:
+            executor (AgentExecutor): The executor.
+            workflow (str): A key of WORKFLOWS.
+
+        Returns:
+            dict: The metrics of the workflow.
+        """
+        agent_id = self.create_agent(workflow)
+        self.failed_steps = 0
+        self._run_steps(executor, agent_id, self.warmup)
+        measured = self._run_steps(executor, agent_id, self.steps)
+        failed_steps = self.failed_steps
+
+        peaks = []
+        if self.allocation_steps:
+            # separate pass, tracing allocations slows every step down
+            tracemalloc.start()
+            try:
+                peaks = self._run_steps(executor, agent_id, self.allocation_steps, trace_allocations=True)["peaks"]
+            finally:
+                tracemalloc.stop()
+        TelemetryWriter.flush()
+
+        durations_ms = np.array(measured["durations"]) * 1000
+        return {
+            "workflow": workflow,
+            "steps": self.steps,
+            "executions": measured["executions"],
+            "failed_steps": failed_steps,
+            "steps_per_sec": round(self.steps / sum(measured["durations"]), 2),
+            "queries_per_step": round(float(np.mean(measured["queries"])), 2),
+            "p50_ms": round(float(np.percentile(durations_ms, 50)), 3),
+            "p99_ms": round(float(np.percentile(durations_ms, 99)), 3),
+            "max_ms": round(float(durations_ms.max()), 3),
+            "peak_alloc_kib": round(float(np.mean(peaks)) / 1024, 1) if peaks else None,
+        }
+
+    def run(self, workflows=tuple(WORKFLOWS)) -> list:
+        """
+        Benchmarks the workflows.
+
+        Args:
+            workflows (list): Keys of WORKFLOWS.
+
+        Returns:
+            list: The metrics of each workflow.
+        """
+        self.setup()
+        with self._patches():
+            from superagi.jobs.agent_executor import AgentExecutor
+            executor = AgentExecutor()
+            return [self.run_workflow(executor, workflow) for workflow in workflows]
+
+
+def format_results(results: list) -> str:
+    columns = ["workflow", "steps_per_sec", "queries_per_step", "p50_ms", "p99_ms", "max_ms", "peak_alloc_kib",
+               "executions", "failed_steps"]
+    rows = [columns] + [[str(result[column]) for column in columns] for result in results]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join("  ".join(value.rjust(width) for value, width in zip(row, widths)) for row in rows)
+
+
+def check_thresholds(results: list, max_p99_ms: float = None, max_queries_per_step: float = None) -> list:
+    """Returns a message for every workflow failing a threshold or a step."""
+    failures = []
+    for result in results:
+        if result["failed_steps"]:
+            failures.append(f"{result['workflow']}: {result['failed_steps']} steps failed")
+        if max_p99_ms is not None and result["p99_ms"] > max_p99_ms:
+            failures.append(f"{result['workflow']}: p99 {result['p99_ms']}ms > {max_p99_ms}ms")
+        if max_queries_per_step is not None and result["queries_per_step"] > max_queries_per_step:
+            failures.append(f"{result['workflow']}: {result['queries_per_step']} queries per step "
+                            f"> {max_queries_per_step}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of AgentExecutor.execute_next_step")
+    parser.add_argument("--steps", type=int, default=50, help="Measured steps per workflow")
+    parser.add_argument("--warmup", type=int, default=5, help="Steps run before measuring")
+    parser.add_argument("--allocation-steps", type=int, default=20,
+                        help="Steps run under tracemalloc after the timed ones, 0 to skip")
+    parser.add_argument("--workflows", nargs="+", choices=list(WORKFLOWS), default=list(WORKFLOWS))
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    parser.add_argument("--max-p99-ms", type=float, help="Fail when a workflow p99 exceeds this latency")
+    parser.add_argument("--max-queries-per-step", type=float, help="Fail when a workflow exceeds this query count")
+    parser.add_argument("--log-level", default="ERROR", help="Level of the SuperAGI logger during the run")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("Super AGI").setLevel(args.log_level.upper())
+    benchmark = AgentStepBenchmark(steps=args.steps, warmup=args.warmup, allocation_steps=args.allocation_steps)
+    # keeps the stray prints of the step path out of the report
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        results = benchmark.run(args.workflows)
+    print(format_results(results))
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(results, file, indent=2)
+
+    failures = check_thresholds(results, args.max_p99_ms, args.max_queries_per_step)
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+import ast
+import hashlib
+import json
+import re
+from collections import defaultdict
+from typing import Any, Iterable, List, Optional
+
+import numpy as np
+
+from superagi.agent.task_queue import COMPLETE_TASK_SCRIPT
+from superagi.llms.base_llm import BaseLlm
+from superagi.vector_store.base import VectorStore
+from superagi.vector_store.document import Document
+from superagi.vector_store.embedding.base import BaseEmbedding
+
+PENDING_TASKS_PATTERN = re.compile(r"You have following incomplete tasks `(\[.*?\])`", re.DOTALL)
+
+
+class FakeLlm(BaseLlm):
+    """
+    Deterministic llm answering every prompt of the seeded workflows without any network call.
+
+    Task prompts get a JSON array: the initial tasks, the pending tasks unchanged when asked to
+    prioritize them and no new task otherwise. Prompts describing the tool schema get a ThinkingTool
+    call and everything else, e.g. the ThinkingTool prompt itself, gets a short plain text answer.
+    """
+
+    def __init__(self, model: str = "gpt-4", api_key: str = "fake-key", initial_tasks: int = 3, **kwargs):
+        self.model = model
+        self.api_key = api_key
+        self.initial_tasks = initial_tasks
+        self.calls = 0
+
+    def chat_completion(self, messages, max_tokens=None, **kwargs):
+        self.calls += 1
+        prompt = "\n".join(message["content"] for message in messages)
+        return {"response": None, "content": self._reply(prompt)}
+
+    def _reply(self, prompt: str) -> str:
+        if "JSON.parse()" in prompt:
+            pending_tasks = PENDING_TASKS_PATTERN.search(prompt)
+            if "sort them in the order of execution" in prompt and pending_tasks is not None:
+                return json.dumps(ast.literal_eval(pending_tasks.group(1)))
+            if "Construct a sequence of actions" in prompt:
+                return json.dumps([f"Task {i + 1} towards the goal" for i in range(self.initial_tasks)])
+            return "[]"
+        if '"tool"' in prompt:
+            return json.dumps({
+                "thoughts": {
+                    "text": f"Reasoning about the goal, call {self.calls}",
+                    "reasoning": "The goal needs more thinking before acting",
+                    "plan": "- think\n- act",
+                    "criticism": "None",
+                    "speak": "Thinking about the goal"
+                },
+                "tool": {"name": "ThinkingTool", "args": {"task_description": f"Plan step {self.calls}"}}
+            })
+        return f"Thought {self.calls}: the next step is clear."
+
+    def get_source(self):
+        return "OpenAI"
+
+    def get_api_key(self):
+        return self.api_key
+
+    def get_model(self):
+        return self.model
+
+    def get_models(self):
+        return [self.model]
+
+    def verify_access_key(self):
+        return True
+
+
+class FakeEmbedding(BaseEmbedding):
+    """Embeds a text into a unit vector seeded by its hash, so equal texts get equal vectors."""
+
+    def __init__(self, model: str = "fake-embedding", dimension: int = 64):
+        self.model = model
+        self.dimension = dimension
+
+    def get_embedding(self, text):
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+class InMemoryVectorStore(VectorStore):
+    """Brute force cosine similarity store, filtered by exact metadata matches."""
+
+    def __init__(self, embedding_model: BaseEmbedding):
+        self.embedding_model = embedding_model
+        self.vectors = []
+        self.texts = []
+        self.metadatas = []
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = []
+        for text, metadata, embedding in zip(texts, metadatas, self.embedding_model.get_embeddings(texts)):
+            ids.append(str(len(self.texts)))
+            self.vectors.append(embedding)
+            self.texts.append(text)
+            self.metadatas.append(metadata)
+        return ids
+
+    def get_matching_text(self, query: str, top_k: int = 5, metadata: Optional[dict] = None, **kwargs: Any):
+        candidates = [i for i, item_metadata in enumerate(self.metadatas)
+                      if all(item_metadata.get(key) == value for key, value in (metadata or {}).items())]
+        if not candidates:
+            return {"documents": [], "search_res": ""}
+        scores = np.array([self.vectors[i] for i in candidates]) @ np.array(self.embedding_model.get_embedding(query))
+        best = [candidates[i] for i in np.argsort(-scores)[:top_k]]
+        documents = [Document(text_content=self.texts[i], metadata=self.metadatas[i]) for i in best]
+        return {"documents": documents, "search_res": "\n".join(document.text_content for document in documents)}
+
+    def get_index_stats(self) -> dict:
+        return {"vector_count": len(self.texts)}
+
+    def add_embeddings_to_vector_db(self, embeddings: dict) -> None:
+        for text, embedding, metadata in zip(embeddings["text"], embeddings["embeddings"], embeddings["metadata"]):
+            self.vectors.append(embedding)
+            self.texts.append(text)
+            self.metadatas.append(metadata)
+
+    def delete_embeddings_from_vector_db(self, ids: List[str]) -> None:
+        for i in sorted((int(id) for id in ids), reverse=True):
+            del self.vectors[i], self.texts[i], self.metadatas[i]
+
+
+class InMemoryPipeline:
+    """Buffers the commands of a pipeline and runs them on execute."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((getattr(self.client, name), args, kwargs))
+            return self
+        return command
+
+    def execute(self):
+        results = [command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+class InMemoryScript:
+    """Registered script, called like redis.commands.core.Script."""
+
+    def __init__(self, run):
+        self.run = run
+
+    def __call__(self, keys=None, args=None, client=None):
+        return self.run(keys or [], args or [])
+
+
+class InMemoryRedis:
+    """The subset of the redis client used on the agent step path, backed by process memory."""
+
+    def __init__(self):
+        self.values = {}
+        self.lists = defaultdict(list)
+        self.sorted_sets = defaultdict(dict)
+        self.ttls = {}
+        self.published = defaultdict(int)
+        # python equivalents of the Lua scripts
+        self.scripts = {COMPLETE_TASK_SCRIPT: self._complete_task}
+
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+
+    def register_script(self, script):
+        return InMemoryScript(self.scripts[script])
+
+    def _complete_task(self, keys, args):
+        task = self.lpop(keys[0])
+        if task is not None:
+            self.lpush(keys[1], json.dumps({"task": task, "response": args[0]}))
+        return task
+
+    def publish(self, channel, message):
+        self.published[channel] += 1
+        return 0
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, *args, **kwargs):
+        self.values[key] = str(value)
+        return True
+
+    def incr(self, key, amount=1):
+        self.values[key] = str(int(self.values.get(key, 0)) + amount)
+        return int(self.values[key])
+
+    def delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            deleted += sum(key in store for store in (self.values, self.lists, self.sorted_sets))
+            self.values.pop(key, None)
+            self.lists.pop(key, None)
+            self.sorted_sets.pop(key, None)
+        return deleted
+
+    def lpush(self, key, *values):
+        for value in values:
+            self.lists[key].insert(0, str(value))
+        return len(self.lists[key])
+
+    def lpop(self, key):
+        return self.lists[key].pop(0) if self.lists.get(key) else None
+
+    def lindex(self, key, index):
+        items = self.lists.get(key, [])
+        return items[index] if -len(items) <= index < len(items) else None
+
+    def lrange(self, key, start, end):
+        items = self.lists.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def zadd(self, key, mapping):
+        self.sorted_sets[key].update(mapping)
+        return len(mapping)
+
+    def zrangebyscore(self, key, min_score, max_score):
+        return [member for member, score in sorted(self.sorted_sets.get(key, {}).items(), key=lambda item: item[1])
+                if min_score <= score <= max_score]
+
+    def zrem(self, key, *members):
+        return sum(self.sorted_sets[key].pop(member, None) is not None for member in members)
+
+
+class WhitespaceEncoding:
+    """Stand-in for a tiktoken encoding when its BPE file can not be downloaded."""
+
+    name = "whitespace"
+
+    def encode(self, text: str, **kwargs) -> List[str]:
+        return text.split()
+
+    def decode(self, tokens: List[str]) -> str:
+        return " ".join(tokens)
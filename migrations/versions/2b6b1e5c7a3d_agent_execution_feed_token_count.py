@@ -0,0 +1,27 @@
+"""agent_execution_feed_token_count
+
+Revision ID: 2b6b1e5c7a3d
+Revises: 9270eb5a8475
+Create Date: 2023-10-12 11:02:14.318274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b6b1e5c7a3d'
+down_revision = '9270eb5a8475'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('agent_execution_feeds', sa.Column('token_count', sa.Integer(), nullable=True))
+    op.create_index("ix_aef_execution_id_feed_group_id_created_at", "agent_execution_feeds",
+                    ['agent_execution_id', 'feed_group_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_aef_execution_id_feed_group_id_created_at", "agent_execution_feeds")
+    op.drop_column('agent_execution_feeds', 'token_count')
@@ -0,0 +1,43 @@
+"""agent_execution_step_traces
+
+Revision ID: 5d2f9c1a8b47
+Revises: 2b6b1e5c7a3d
+Create Date: 2023-10-16 10:21:47.105638
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f9c1a8b47'
+down_revision = '2b6b1e5c7a3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('agent_execution_step_traces',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('agent_execution_id', sa.Integer(), nullable=False),
+                    sa.Column('agent_id', sa.Integer(), nullable=True),
+                    sa.Column('step_type', sa.String(), nullable=True),
+                    sa.Column('queue_wait_ms', sa.Float(), nullable=True),
+                    sa.Column('total_ms', sa.Float(), nullable=True),
+                    sa.Column('db_ms', sa.Float(), nullable=True),
+                    sa.Column('llm_ms', sa.Float(), nullable=True),
+                    sa.Column('tool_ms', sa.Float(), nullable=True),
+                    sa.Column('embedding_ms', sa.Float(), nullable=True),
+                    sa.Column('tokens', sa.Integer(), nullable=True),
+                    sa.Column('spans', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+                    sa.Column('created_at', sa.DateTime(), nullable=True),
+                    sa.Column('updated_at', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('id')
+                    )
+    op.create_index("ix_aest_agent_execution_id", "agent_execution_step_traces", ['agent_execution_id'])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_aest_agent_execution_id", "agent_execution_step_traces")
+    op.drop_table('agent_execution_step_traces')
@@ -0,0 +1,153 @@
+"""analytics_rollups
+
+Revision ID: 8e4b7a1c9d20
+Revises: 5d2f9c1a8b47
+Create Date: 2023-10-18 09:12:33.418204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b7a1c9d20'
+down_revision = '5d2f9c1a8b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('agent_execution_id', sa.Integer(), nullable=True))
+    op.execute("UPDATE events SET agent_execution_id = (event_property->>'agent_execution_id')::int "
+               "WHERE event_property->>'agent_execution_id' IS NOT NULL")
+    op.create_index("ix_events_agent_execution_id", "events", ['agent_execution_id'])
+    op.create_index("ix_events_org_id_event_name", "events", ['org_id', 'event_name'])
+
+    op.create_table('analytics_agents',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('org_id', sa.Integer(), nullable=False),
+                    sa.Column('agent_id', sa.Integer(), nullable=False),
+                    sa.Column('agent_name', sa.String(), nullable=True),
+                    sa.Column('model', sa.String(), nullable=True),
+                    sa.Column('created_at', sa.DateTime(), nullable=True),
+                    sa.Column('updated_at', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('id'),
+                    sa.UniqueConstraint('agent_id', name='uq_analytics_agents_agent_id')
+                    )
+    op.create_index("ix_analytics_agents_org_id", "analytics_agents", ['org_id'])
+
+    op.create_table('analytics_runs',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('org_id', sa.Integer(), nullable=False),
+                    sa.Column('agent_id', sa.Integer(), nullable=True),
+                    sa.Column('agent_execution_id', sa.Integer(), nullable=False),
+                    sa.Column('name', sa.String(), nullable=True),
+                    sa.Column('started_at', sa.DateTime(), nullable=True),
+                    sa.Column('ended_at', sa.DateTime(), nullable=True),
+                    sa.Column('tokens', sa.Integer(), nullable=False),
+                    sa.Column('calls', sa.Integer(), nullable=False),
+                    sa.Column('created_at', sa.DateTime(), nullable=True),
+                    sa.Column('updated_at', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('id'),
+                    sa.UniqueConstraint('agent_execution_id', name='uq_analytics_runs_agent_execution_id')
+                    )
+    op.create_index("ix_analytics_runs_org_id_agent_id", "analytics_runs", ['org_id', 'agent_id'])
+    op.create_index("ix_analytics_runs_org_id_ended_at", "analytics_runs", ['org_id', 'ended_at'])
+
+    op.create_table('analytics_daily_rollups',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('org_id', sa.Integer(), nullable=False),
+                    sa.Column('agent_id', sa.Integer(), nullable=False),
+                    sa.Column('model', sa.String(), nullable=True),
+                    sa.Column('day', sa.Date(), nullable=False),
+                    sa.Column('runs', sa.Integer(), nullable=False),
+                    sa.Column('tokens', sa.Integer(), nullable=False),
+                    sa.Column('calls', sa.Integer(), nullable=False),
+                    sa.Column('run_time', sa.Float(), nullable=False),
+                    sa.Column('timed_runs', sa.Integer(), nullable=False),
+                    sa.Column('created_at', sa.DateTime(), nullable=True),
+                    sa.Column('updated_at', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('id'),
+                    sa.UniqueConstraint('org_id', 'agent_id', 'day', name='uq_analytics_daily_rollups_agent_day')
+                    )
+    op.create_index("ix_analytics_daily_rollups_org_id_day", "analytics_daily_rollups", ['org_id', 'day'])
+
+    op.create_table('analytics_agent_tools',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('org_id', sa.Integer(), nullable=False),
+                    sa.Column('agent_id', sa.Integer(), nullable=False),
+                    sa.Column('tool_name', sa.String(), nullable=False),
+                    sa.Column('calls', sa.Integer(), nullable=False),
+                    sa.Column('created_at', sa.DateTime(), nullable=True),
+                    sa.Column('updated_at', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('id'),
+                    sa.UniqueConstraint('org_id', 'agent_id', 'tool_name', name='uq_analytics_agent_tools_agent_tool')
+                    )
+
+    # backfill the rollups from the existing events
+    op.execute("""
+        INSERT INTO analytics_agents (org_id, agent_id, agent_name, model, created_at, updated_at)
+        SELECT DISTINCT ON (agent_id) org_id, agent_id, event_property->>'agent_name', event_property->>'model',
+               created_at, created_at
+        FROM events
+        WHERE event_name = 'agent_created' AND agent_id IS NOT NULL AND org_id IS NOT NULL
+        ORDER BY agent_id, id DESC
+    """)
+    op.execute("""
+        INSERT INTO analytics_runs (org_id, agent_id, agent_execution_id, name, started_at, tokens, calls,
+                                    created_at, updated_at)
+        SELECT DISTINCT ON (agent_execution_id) org_id, agent_id, agent_execution_id,
+               event_property->>'agent_execution_name', created_at, 0, 0, created_at, created_at
+        FROM events
+        WHERE event_name = 'run_created' AND agent_execution_id IS NOT NULL AND org_id IS NOT NULL
+        ORDER BY agent_execution_id, id
+    """)
+    op.execute("""
+        UPDATE analytics_runs
+        SET ended_at = ended.created_at,
+            tokens = COALESCE((ended.event_property->>'tokens_consumed')::int, 0),
+            calls = COALESCE((ended.event_property->>'calls')::int, 0),
+            updated_at = ended.created_at
+        FROM (SELECT DISTINCT ON (agent_execution_id) agent_execution_id, event_property, created_at
+              FROM events
+              WHERE event_name IN ('run_completed', 'run_iteration_limit_crossed') AND agent_execution_id IS NOT NULL
+              ORDER BY agent_execution_id, id DESC) AS ended
+        WHERE analytics_runs.agent_execution_id = ended.agent_execution_id
+    """)
+    op.execute("""
+        INSERT INTO analytics_daily_rollups (org_id, agent_id, model, day, runs, tokens, calls, run_time, timed_runs,
+                                             created_at, updated_at)
+        SELECT e.org_id, e.agent_id, a.model, e.created_at::date, count(*),
+               COALESCE(sum((e.event_property->>'tokens_consumed')::int), 0),
+               COALESCE(sum((e.event_property->>'calls')::int), 0),
+               COALESCE(sum(GREATEST(extract(epoch FROM e.created_at - r.started_at), 0)), 0),
+               count(r.started_at), now(), now()
+        FROM events e
+        LEFT JOIN analytics_agents a ON a.agent_id = e.agent_id
+        LEFT JOIN analytics_runs r ON r.agent_execution_id = e.agent_execution_id
+        WHERE e.event_name IN ('run_completed', 'run_iteration_limit_crossed')
+              AND e.agent_id IS NOT NULL AND e.org_id IS NOT NULL
+        GROUP BY e.org_id, e.agent_id, a.model, e.created_at::date
+    """)
+    op.execute("""
+        INSERT INTO analytics_agent_tools (org_id, agent_id, tool_name, calls, created_at, updated_at)
+        SELECT org_id, agent_id, event_property->>'tool_name', count(*), now(), now()
+        FROM events
+        WHERE event_name = 'tool_used' AND agent_id IS NOT NULL AND org_id IS NOT NULL
+              AND event_property->>'tool_name' IS NOT NULL
+        GROUP BY org_id, agent_id, event_property->>'tool_name'
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('analytics_agent_tools')
+    op.drop_index("ix_analytics_daily_rollups_org_id_day", "analytics_daily_rollups")
+    op.drop_table('analytics_daily_rollups')
+    op.drop_index("ix_analytics_runs_org_id_ended_at", "analytics_runs")
+    op.drop_index("ix_analytics_runs_org_id_agent_id", "analytics_runs")
+    op.drop_table('analytics_runs')
+    op.drop_index("ix_analytics_agents_org_id", "analytics_agents")
+    op.drop_table('analytics_agents')
+    op.drop_index("ix_events_org_id_event_name", "events")
+    op.drop_index("ix_events_agent_execution_id", "events")
+    op.drop_column('events', 'agent_execution_id')
@@ -0,0 +1,23 @@
+"""agent_execution_feed_cursor_index
+
+Revision ID: c41f2e8b7a05
+Revises: 8e4b7a1c9d20
+Create Date: 2023-10-19 11:40:05.227613
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f2e8b7a05'
+down_revision = '8e4b7a1c9d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_aef_execution_id_id", "agent_execution_feeds", ['agent_execution_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_aef_execution_id_id", "agent_execution_feeds")
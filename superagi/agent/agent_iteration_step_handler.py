@@ -1,15 +1,17 @@
 from datetime import datetime
-import json
 from sqlalchemy import asc
 from sqlalchemy.sql.operators import and_
 import logging
 import superagi
 from superagi.agent.agent_message_builder import AgentLlmMessageBuilder
 from superagi.agent.agent_prompt_builder import AgentPromptBuilder
+from superagi.agent.agent_runtime_config import AgentRuntimeConfig
 from superagi.agent.output_handler import ToolOutputHandler, get_output_handler
+from superagi.agent.output_parser import AgentReply
 from superagi.agent.task_queue import TaskQueue
 from superagi.agent.tool_builder import ToolBuilder
 from superagi.apm.event_handler import EventHandler
+from superagi.apm.step_tracer import StepTracer, LLM_SPAN, TOOL_SPAN
 from superagi.config.config import get_config
 from superagi.helper.error_handler import ErrorHandler
 from superagi.helper.token_counter import TokenCounter
@@ -17,7 +19,6 @@ from superagi.lib.logger import logger
 from superagi.models.agent import Agent
 from superagi.models.agent_config import AgentConfiguration
 from superagi.models.agent_execution import AgentExecution
-from superagi.models.agent_execution_config import AgentExecutionConfiguration
 from superagi.models.agent_execution_feed import AgentExecutionFeed
 from superagi.models.agent_execution_permission import AgentExecutionPermission
 from superagi.models.organisation import Organisation
@@ -34,45 +35,58 @@ from superagi.apm.call_log_helper import CallLogHelper
 
 class AgentIterationStepHandler:
     """ Handles iteration workflow steps in the agent workflow."""
-    def __init__(self, session, llm, agent_id: int, agent_execution_id: int, memory=None):
+    def __init__(self, session, llm, agent_id: int, agent_execution_id: int, memory=None,
+                 runtime_config: AgentRuntimeConfig = None):
         self.session = session
         self.llm = llm
         self.agent_execution_id = agent_execution_id
         self.agent_id = agent_id
         self.memory = memory
-        self.organisation = Agent.find_org_by_agent_id(self.session, agent_id=self.agent_id)
+        self.runtime_config = runtime_config
+        self.organisation_id = runtime_config.organisation_id if runtime_config is not None \
+            else Agent.find_org_by_agent_id(self.session, agent_id=self.agent_id).id
         self.task_queue = TaskQueue(str(self.agent_execution_id))
+        self.tool_initializer = None
+
+    def _runtime_config(self) -> AgentRuntimeConfig:
+        if self.runtime_config is None:
+            self.runtime_config = AgentRuntimeConfig.build(self.session, self.agent_id, self.agent_execution_id)
+        return self.runtime_config
 
     def execute_step(self):
-        agent_config = Agent.fetch_configuration(self.session, self.agent_id)
+        runtime_config = self._runtime_config()
+        agent_config = runtime_config.agent_config
         execution = AgentExecution.get_agent_execution_from_id(self.session, self.agent_execution_id)
         iteration_workflow_step = IterationWorkflowStep.find_by_id(self.session, execution.iteration_workflow_step_id)
-        agent_execution_config = AgentExecutionConfiguration.fetch_configuration(self.session, self.agent_execution_id)
+        agent_execution_config = runtime_config.execution_config
         if not self._handle_wait_for_permission(execution, agent_config, agent_execution_config,
                                                 iteration_workflow_step):
             return
 
         workflow_step = AgentWorkflowStep.find_by_id(self.session, execution.current_agent_step_id)
-        organisation = Agent.find_org_by_agent_id(self.session, agent_id=self.agent_id)
         iteration_workflow = IterationWorkflow.find_by_id(self.session, workflow_step.action_reference_id)
-        agent_feeds = AgentExecutionFeed.fetch_agent_execution_feeds(self.session, self.agent_execution_id)
+        agent_feeds = AgentExecutionFeed.fetch_agent_execution_feeds(self.session, self.agent_execution_id, limit=1)
         if not agent_feeds:
             self.task_queue.clear_tasks()
 
-        agent_tools = self._build_tools(agent_config, agent_execution_config)
-        prompt = self._build_agent_prompt(iteration_workflow=iteration_workflow,
-                                          agent_config=agent_config,
-                                          agent_execution_config=agent_execution_config,
-                                          prompt=iteration_workflow_step.prompt,
-                                          agent_tools=agent_tools)
-
-        messages = AgentLlmMessageBuilder(self.session, self.llm, self.llm.get_model(), self.agent_id, self.agent_execution_id) \
-            .build_agent_messages(prompt, agent_feeds, history_enabled=iteration_workflow_step.history_enabled,
-                                  completion_prompt=iteration_workflow_step.completion_prompt)
+        with StepTracer.span("build_tools"):
+            agent_tools = self._build_tools(agent_config, agent_execution_config)
+        with StepTracer.span("build_prompt"):
+            prompt = self._build_agent_prompt(iteration_workflow=iteration_workflow,
+                                              agent_config=agent_config,
+                                              agent_execution_config=agent_execution_config,
+                                              prompt=iteration_workflow_step.prompt,
+                                              agent_tools=agent_tools)
+
+        with StepTracer.span("build_messages"):
+            messages = AgentLlmMessageBuilder(self.session, self.llm, self.llm.get_model(), self.agent_id, self.agent_execution_id) \
+                .build_agent_messages(prompt, agent_feeds, history_enabled=iteration_workflow_step.history_enabled,
+                                      completion_prompt=iteration_workflow_step.completion_prompt)
 
         logger.debug("Prompt messages:", messages)
         current_tokens = TokenCounter.count_message_tokens(messages = messages, model = self.llm.get_model())
-        response = self.llm.chat_completion(messages, TokenCounter(session=self.session, organisation_id=organisation.id).token_limit(self.llm.get_model()) - current_tokens)
+        with StepTracer.span(LLM_SPAN):
+            response = self.llm.chat_completion(messages, TokenCounter(session=self.session, organisation_id=self.organisation_id).token_limit(self.llm.get_model()) - current_tokens)
 
         if 'error' in response and response['message'] is not None:
             ErrorHandler.handle_openai_errors(self.session, self.agent_id, self.agent_execution_id, response['message'])
@@ -82,22 +96,19 @@ class AgentIterationStepHandler:
 
         total_tokens = current_tokens + TokenCounter.count_message_tokens(response['content'], self.llm.get_model())
         AgentExecution.update_tokens(self.session, self.agent_execution_id, total_tokens)
-        try:
-            content = json.loads(response['content'])
-            tool = content.get('tool', {})
-            tool_name = tool.get('name', '') if tool else ''
-        except json.JSONDecodeError:
-            print("Decoding JSON has failed")
-            tool_name = ''
-
-        CallLogHelper(session=self.session, organisation_id=organisation.id).create_call_log(execution.name,
-                                                                                             agent_config['agent_id'], total_tokens, tool_name, agent_config['model'])
-
-        assistant_reply = response['content']
+        StepTracer.add_tokens(total_tokens)
+        # parsed once and shared with the output handler
+        assistant_reply = AgentReply(response['content'])
+        CallLogHelper(session=self.session, organisation_id=self.organisation_id).create_call_log(execution.name,
+                                                                                             agent_config['agent_id'], total_tokens, assistant_reply.tool_name, agent_config['model'],
+                                                                                             buffered=True)
+
         output_handler = get_output_handler(iteration_workflow_step.output_type,
                                             agent_execution_id=self.agent_execution_id,
-                                            agent_config=agent_config,memory=self.memory, agent_tools=agent_tools)
-        response = output_handler.handle(self.session, assistant_reply)
+                                            agent_config=agent_config,memory=self.memory, agent_tools=agent_tools,
+                                            tool_initializer=self.tool_initializer)
+        with StepTracer.span(TOOL_SPAN):
+            response = output_handler.handle(self.session, assistant_reply)
         if response.status == "COMPLETE":
             execution.status = "COMPLETED"
             self.session.commit()
@@ -108,7 +119,7 @@ class AgentIterationStepHandler:
                                                              'name': execution.name,
                                                              'tokens_consumed': execution.num_of_tokens,
                                                              "calls": execution.num_of_calls},
-                                                            execution.agent_id, organisation.id)
+                                                            execution.agent_id, self.organisation_id, buffered=True)
         elif response.status == "WAITING_FOR_PERMISSION":
             execution.status = "WAITING_FOR_PERMISSION"
             execution.permission_id = response.permission_id
@@ -141,30 +152,40 @@ class AgentIterationStepHandler:
                                                            agent_config["constraints"], agent_tools,
                                                            (not iteration_workflow.has_task_queue))
         if iteration_workflow.has_task_queue:
+            # only the most recent completed tasks make it into the prompt
+            completed_tasks_limit = int(get_config("MAX_COMPLETED_TASKS_IN_PROMPT", 50))
             response = self.task_queue.get_last_task_details()
             last_task, last_task_result = (response["task"], response["response"]) if response is not None else ("", "")
             current_task = self.task_queue.get_first_task() or ""
-            token_limit = TokenCounter(session=self.session, organisation_id=self.organisation.id).token_limit() - max_token_limit
+            token_limit = TokenCounter(session=self.session, organisation_id=self.organisation_id).token_limit() - max_token_limit
             prompt = AgentPromptBuilder.replace_task_based_variables(prompt, current_task, last_task, last_task_result,
                                                                      self.task_queue.get_tasks(),
-                                                                     self.task_queue.get_completed_tasks(), token_limit)
+                                                                     self.task_queue.get_completed_tasks(
+                                                                         limit=completed_tasks_limit), token_limit)
         return prompt
 
     def _build_tools(self, agent_config: dict, agent_execution_config: dict):
         agent_tools = [ThinkingTool()]
 
-        config_data = AgentConfiguration.get_model_api_key(self.session, self.agent_id, agent_config["model"])
-        model_api_key = config_data['api_key']
+        if self.runtime_config is not None and self.runtime_config.model_api_key is not None:
+            model_api_key = self.runtime_config.model_api_key
+        else:
+            model_api_key = AgentConfiguration.get_model_api_key(self.session, self.agent_id, agent_config["model"])['api_key']
         tool_builder = ToolBuilder(self.session, self.agent_id, self.agent_execution_id)
-        resource_summary = ResourceSummarizer(session=self.session, agent_id=self.agent_id, model=agent_config['model']).fetch_or_create_agent_resource_summary(default_summary=agent_config.get("resource_summary"))
+        resource_summary = ResourceSummarizer(session=self.session, agent_id=self.agent_id, model=agent_config['model'],
+                                              organisation_id=self.organisation_id) \
+            .fetch_or_create_agent_resource_summary(default_summary=agent_config.get("resource_summary"))
         if resource_summary is not None:
             agent_tools.append(QueryResourceTool())
         user_tools = self.session.query(Tool).filter(
             and_(Tool.id.in_(agent_execution_config["tools"]), Tool.file_name is not None)).all()
         for tool in user_tools:
             agent_tools.append(tool_builder.build_tool(tool))
+        # the llm and managers are only set on the tool the llm picks
         agent_tools = [tool_builder.set_default_params_tool(tool, agent_config, agent_execution_config,
-                                                            model_api_key, resource_summary,self.memory) for tool in agent_tools]
+                                                            model_api_key, resource_summary,self.memory, lazy=True)
+                       for tool in agent_tools]
+        self.tool_initializer = tool_builder.tool_initializer(agent_config, model_api_key, self.memory)
         return agent_tools
 
     def _handle_wait_for_permission(self, agent_execution, agent_config: dict, agent_execution_config: dict,
@@ -190,7 +211,8 @@ class AgentIterationStepHandler:
             return False
         if agent_execution_permission.status == "APPROVED":
             agent_tools = self._build_tools(agent_config, agent_execution_config)
-            tool_output_handler = ToolOutputHandler(self.agent_execution_id, agent_config, agent_tools,self.memory)
+            tool_output_handler = ToolOutputHandler(self.agent_execution_id, agent_config, agent_tools,self.memory,
+                                                    tool_initializer=self.tool_initializer)
             tool_result = tool_output_handler.handle_tool_response(self.session,
                                                                    agent_execution_permission.assistant_reply)
             result = tool_result.result
@@ -1,11 +1,10 @@
 import time
-from typing import Tuple, List
-from sqlalchemy import asc
+from typing import Tuple, List, Optional
 
 from superagi.config.config import get_config
 from superagi.helper.error_handler import ErrorHandler
 from superagi.helper.prompt_reader import PromptReader
-from superagi.helper.token_counter import TokenCounter
+from superagi.helper.token_counter import TokenCounter, MODEL_TOKENS_PER_MESSAGE, DEFAULT_TOKENS_PER_MESSAGE
 from superagi.models.agent_execution import AgentExecution
 from superagi.models.agent_execution_feed import AgentExecutionFeed
 from superagi.types.common import BaseMessage
@@ -13,6 +12,10 @@ from superagi.models.agent_execution_config import AgentExecutionConfiguration
 from superagi.models.agent import Agent
 
 
+# Tokens of the summary prompt template around the summarized feeds and the previous summary.
+LTM_SUMMARY_PROMPT_TOKENS = 300
+
+
 class AgentLlmMessageBuilder:
     """Agent message builder for LLM agent."""
     def __init__(self, session, llm, llm_model: str, agent_id: int, agent_execution_id: int):
@@ -29,7 +32,7 @@ class AgentLlmMessageBuilder:
 
         Args:
             prompt (str): The prompt to be used for generating the agent messages.
-            agent_feeds (list): The list of agent feeds.
+            agent_feeds (list): The agent feeds, only checked for emptiness as the history is windowed in the database.
             history_enabled (bool): Whether to use history or not.
             completion_prompt (str): The completion prompt to be used for generating the agent messages.
         """
@@ -39,13 +42,11 @@ class AgentLlmMessageBuilder:
         if history_enabled:
             messages.append({"role": "system", "content": f"The current time and date is {time.strftime('%c')}"})
             base_token_limit = TokenCounter.count_message_tokens(messages, self.llm_model)
-            full_message_history = [{'role': agent_feed.role, 'content': agent_feed.feed, 'chat_id': agent_feed.id}
-                                                for agent_feed in agent_feeds]
-            past_messages, current_messages = self._split_history(full_message_history,
-                                                              ((token_limit - base_token_limit - max_output_token_limit) // 4) * 3)
-            if past_messages:
-                ltm_summary = self._build_ltm_summary(past_messages=past_messages,
-                                                                   output_token_limit=(token_limit - base_token_limit - max_output_token_limit) // 4)
+            ltm_token_limit = (token_limit - base_token_limit - max_output_token_limit) // 4
+            ltm_summary, current_messages = None, []
+            if agent_feeds:
+                ltm_summary, current_messages = self._build_history(ltm_token_limit * 3, ltm_token_limit, token_limit)
+            if ltm_summary:
                 messages.append({"role": "assistant", "content": ltm_summary})
 
             for history in current_messages:
@@ -56,18 +57,89 @@ class AgentLlmMessageBuilder:
         self._add_initial_feeds(agent_feeds, messages)
         return messages
 
-    def _split_history(self, history: List, pending_token_limit: int) -> Tuple[List[BaseMessage], List[BaseMessage]]:
-        hist_token_count = 0
-        i = len(history)
-        for message in reversed(history):
-            token_count = TokenCounter.count_message_tokens([{"role": message["role"], "content": message["content"]}],
-                                                            self.llm_model)
-            hist_token_count += token_count
-            if hist_token_count > pending_token_limit:
-                self._add_or_update_last_agent_feed_ltm_summary_id(str(history[i-1]['chat_id']))
-                return history[:i], history[i:]
-            i -= 1
-        return [], history
+    def _build_history(self, pending_token_limit: int, output_token_limit: int,
+                       token_limit: int) -> Tuple[Optional[str], List[BaseMessage]]:
+        """
+        Builds the history of the agent: a rolling summary of the older feeds followed by the recent feeds
+        fitting in the pending token limit.
+
+        The summary covers the feeds of the current feed group up to the persisted ltm_summary_feed_id and is
+        only extended when the recent feeds overflow. A summary of another feed group, e.g. of a previous
+        task of the queue, is ignored. The overflowing feeds are then evicted in blocks of LTM_SUMMARY_BLOCK_SIZE
+        feeds, each block being folded into the summary with one completion, so that the following steps
+        fit again without summarizing.
+
+        Returns:
+            tuple: The summary, None if no feed was summarized yet, and the current messages.
+        """
+        tokens_per_message = MODEL_TOKENS_PER_MESSAGE.get(self.llm_model, DEFAULT_TOKENS_PER_MESSAGE)
+        feed_group_id = AgentExecution.find_by_id(self.session, self.agent_execution_id).current_feed_group_id
+        summary_feed_id, ltm_summary = self._fetch_ltm_summary(feed_group_id)
+        current_feeds, split_feed_id = AgentExecutionFeed.fetch_agent_execution_feeds_window(
+            self.session, self.agent_execution_id, pending_token_limit, tokens_per_message,
+            after_feed_id=summary_feed_id)
+        if split_feed_id is not None:
+            evicted_feeds = [{'role': feed.role, 'content': feed.feed, 'chat_id': feed.id,
+                              'tokens': feed.message_tokens}
+                             for feed in AgentExecutionFeed.fetch_agent_execution_feeds_range(
+                                 self.session, self.agent_execution_id, after_feed_id=summary_feed_id,
+                                 until_feed_id=split_feed_id, tokens_per_message=tokens_per_message)]
+            # round the eviction up to whole blocks, always keeping the latest feed
+            block_size = max(int(get_config("LTM_SUMMARY_BLOCK_SIZE", 10)), 1)
+            extra_feeds = min(-len(evicted_feeds) % block_size, max(len(current_feeds) - 1, 0))
+            for index, feed in enumerate(current_feeds[:extra_feeds]):
+                evicted_feeds.append({'role': feed.role, 'content': feed.feed, 'chat_id': feed.id,
+                                      'tokens': feed.cumulative_tokens - current_feeds[index + 1].cumulative_tokens})
+
+            block_token_limit = max(token_limit - 2 * output_token_limit - LTM_SUMMARY_PROMPT_TOKENS,
+                                    output_token_limit)
+            for block in self._split_blocks(evicted_feeds, block_size, block_token_limit):
+                block_summary = self._summarize_block(ltm_summary, block, output_token_limit, block_token_limit)
+                if block_summary is None:
+                    break
+                ltm_summary, summary_feed_id = block_summary, block[-1]["chat_id"]
+                current_feeds = [feed for feed in current_feeds if feed.id > summary_feed_id]
+                execution = AgentExecution(id=self.agent_execution_id)
+                AgentExecutionConfiguration.add_or_update_agent_execution_config(
+                    self.session, execution, {"ltm_summary": ltm_summary, "ltm_summary_feed_id": str(summary_feed_id),
+                                              "ltm_summary_feed_group_id": feed_group_id})
+
+        current_messages = [{'role': feed.role, 'content': feed.feed, 'chat_id': feed.id} for feed in current_feeds]
+        return ltm_summary, current_messages
+
+    def _fetch_ltm_summary(self, feed_group_id: str) -> Tuple[Optional[int], Optional[str]]:
+        """Fetches the rolling summary of the feed group and the id of the last feed it covers."""
+        configs = dict(self.session.query(AgentExecutionConfiguration.key, AgentExecutionConfiguration.value)
+                       .filter(AgentExecutionConfiguration.agent_execution_id == self.agent_execution_id,
+                               AgentExecutionConfiguration.key.in_(("ltm_summary", "ltm_summary_feed_id",
+                                                                    "ltm_summary_feed_group_id",
+                                                                    "last_agent_feed_ltm_summary_id")))
+                       .all())
+        # executions summarized before the rolling summary tracked the feed id up to the last split
+        summary_feed_id = configs.get("ltm_summary_feed_id") or configs.get("last_agent_feed_ltm_summary_id")
+        if not summary_feed_id or not configs.get("ltm_summary"):
+            return None, None
+        summary_feed_group_id = configs.get("ltm_summary_feed_group_id")
+        if summary_feed_group_id is None:
+            # summaries stored without their feed group belong to the group of the last feed they cover
+            summary_feed_group_id = self.session.query(AgentExecutionFeed.feed_group_id) \
+                .filter(AgentExecutionFeed.id == int(summary_feed_id)).scalar()
+        if summary_feed_group_id != feed_group_id:
+            return None, None
+        return int(summary_feed_id), configs["ltm_summary"]
+
+    @staticmethod
+    def _split_blocks(feeds: list, block_size: int, block_token_limit: int) -> List[list]:
+        blocks, block, block_tokens = [], [], 0
+        for feed in feeds:
+            if block and (len(block) == block_size or block_tokens + feed["tokens"] > block_token_limit):
+                blocks.append(block)
+                block, block_tokens = [], 0
+            block.append(feed)
+            block_tokens += feed["tokens"]
+        if block:
+            blocks.append(block)
+        return blocks
 
     def _add_initial_feeds(self, agent_feeds: list, messages: list):
         if agent_feeds:
@@ -81,43 +153,21 @@ class AgentLlmMessageBuilder:
             self.session.add(agent_execution_feed)
             self.session.commit()
 
-    def _add_or_update_last_agent_feed_ltm_summary_id(self, last_agent_feed_ltm_summary_id):
-        execution = AgentExecution(id=self.agent_execution_id)
-        agent_execution_configs = {"last_agent_feed_ltm_summary_id": last_agent_feed_ltm_summary_id}
-        AgentExecutionConfiguration.add_or_update_agent_execution_config(self.session, execution,
-                                                                         agent_execution_configs)
-
-
-    def _build_ltm_summary(self, past_messages, output_token_limit) -> str:
-        ltm_prompt = self._build_prompt_for_ltm_summary(past_messages=past_messages,
-                                                        token_limit=output_token_limit)
-
-        summary = AgentExecutionConfiguration.fetch_value(self.session, self.agent_execution_id, "ltm_summary")
-        previous_ltm_summary = summary.value if summary is not None else ""
-
-        ltm_summary_base_token_limit = 10
-        if ((TokenCounter.count_text_tokens(ltm_prompt) + ltm_summary_base_token_limit + output_token_limit)
-            - TokenCounter(session=self.session, organisation_id=self.organisation.id).token_limit(self.llm_model)) > 0:
-            last_agent_feed_ltm_summary_id = AgentExecutionConfiguration.fetch_value(self.session,
-                                                       self.agent_execution_id, "last_agent_feed_ltm_summary_id")
-            last_agent_feed_ltm_summary_id = (
-                int(last_agent_feed_ltm_summary_id.value)
-                if last_agent_feed_ltm_summary_id is not None and last_agent_feed_ltm_summary_id.value is not None
-                else 0
-            )
-            past_messages = self.session.query(AgentExecutionFeed.role, AgentExecutionFeed.feed,
-                                               AgentExecutionFeed.id) \
-                .filter(AgentExecutionFeed.agent_execution_id == self.agent_execution_id,
-                        AgentExecutionFeed.id > last_agent_feed_ltm_summary_id) \
-                .order_by(asc(AgentExecutionFeed.created_at)) \
-                .all()
-
-            past_messages = [
-                {'role': past_message.role, 'content': past_message.feed, 'chat_id': past_message.id}
-                for past_message in past_messages]
+    def _summarize_block(self, previous_ltm_summary: Optional[str], block: List[BaseMessage],
+                         output_token_limit: int, block_token_limit: int) -> Optional[str]:
+        """
+        Folds a block of feeds into the rolling summary.
 
+        Returns:
+            str: The new summary, None if the completion failed.
+        """
+        # a single feed larger than the block budget is cut to fit the summary prompt
+        block = [{**feed, 'content': feed['content'][:block_token_limit * 4]} for feed in block]
+        if previous_ltm_summary:
             ltm_prompt = self._build_prompt_for_recursive_ltm_summary_using_previous_ltm_summary(
-                previous_ltm_summary=previous_ltm_summary, past_messages=past_messages, token_limit=output_token_limit)
+                previous_ltm_summary=previous_ltm_summary, past_messages=block, token_limit=output_token_limit)
+        else:
+            ltm_prompt = self._build_prompt_for_ltm_summary(past_messages=block, token_limit=output_token_limit)
 
         msgs = [{"role": "system", "content": "You are GPT Prompt writer"},
                 {"role": "assistant", "content": ltm_prompt}]
@@ -125,13 +175,7 @@ class AgentLlmMessageBuilder:
 
         if 'error' in ltm_summary and ltm_summary['message'] is not None:
             ErrorHandler.handle_openai_errors(self.session, self.agent_id, self.agent_execution_id, ltm_summary['message'])
-
-        execution = AgentExecution(id=self.agent_execution_id)
-        agent_execution_configs = {"ltm_summary": ltm_summary["content"]}
-        AgentExecutionConfiguration.add_or_update_agent_execution_config(session=self.session, execution=execution,
-                                                                 agent_execution_configs=agent_execution_configs)
-
-        return ltm_summary["content"]
+        return ltm_summary.get("content")
 
     def _build_prompt_for_ltm_summary(self, past_messages: List[BaseMessage], token_limit: int):
         ltm_summary_prompt = PromptReader.read_agent_prompt(__file__, "agent_summary.txt")
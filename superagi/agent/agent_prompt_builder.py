@@ -12,6 +12,9 @@ FINISH_NAME = "finish"
 class AgentPromptBuilder:
     """Agent prompt builder for LLM agent."""
 
+    # rendered args json schema of the tool classes, keyed by tool class, name and args schema
+    _tool_args_json = {}
+
     @staticmethod
     def add_list_items_to_string(items: List[str]) -> str:
         list_string = ""
@@ -29,7 +32,6 @@ class AgentPromptBuilder:
             add_finish (bool): Whether to add finish tool or not.
         """
         final_string = ""
-        print(tools)
         for i, item in enumerate(tools):
             final_string += f"{i + 1}. {cls._generate_tool_string(item)}\n"
         finish_description = (
@@ -53,9 +55,18 @@ class AgentPromptBuilder:
     @classmethod
     def _generate_tool_string(cls, tool: BaseTool) -> str:
         output = f"\"{tool.name}\": {tool.description}"
-        # print(tool.args)
-        output += f", args json schema: {json.dumps(tool.args)}"
+        output += f", args json schema: {cls._get_tool_args_json(tool)}"
         return output
+
+    @classmethod
+    def _get_tool_args_json(cls, tool: BaseTool) -> str:
+        # generating the pydantic schema is costly and the same for every instance of a tool
+        key = (type(tool), tool.name, tool.args_schema)
+        args_json = cls._tool_args_json.get(key)
+        if args_json is None:
+            args_json = json.dumps(tool.args)
+            cls._tool_args_json[key] = args_json
+        return args_json
     
     @classmethod
     def clean_prompt(cls, prompt):
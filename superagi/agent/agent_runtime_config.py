@@ -0,0 +1,104 @@
+from typing import Optional
+
+from sqlalchemy import func
+
+from superagi.models.agent import Agent
+from superagi.models.agent_config import AgentConfiguration
+from superagi.models.agent_execution_config import AgentExecutionConfiguration
+
+# Execution configuration keys the steps run with, other keys e.g. the ltm summary change every step.
+EXECUTION_CONFIG_KEYS = ("goal", "instruction", "tools")
+
+
+class AgentRuntimeConfig:
+    """
+    Snapshot of the configuration an agent execution runs with: the agent configuration, the execution
+    configuration and the model credentials, parsed once and shared by the handlers of a step.
+
+    Attributes:
+        agent_id (int): The agent id.
+        agent_execution_id (int): The agent execution id.
+        organisation_id (int): The organisation id of the agent.
+        model (str): The configured model.
+        model_api_key (str): The api key of the model.
+        model_provider (str): The provider of the model.
+        agent_config (dict): The parsed agent configuration, as returned by Agent.fetch_configuration.
+        execution_config (dict): The parsed execution configuration, as returned by
+            AgentExecutionConfiguration.fetch_configuration.
+        version (tuple): Version of the configuration rows the snapshot was built from, see fetch_version.
+    """
+
+    def __init__(self, agent_id: int, agent_execution_id: int, organisation_id: int, agent_config: dict,
+                 execution_config: dict, model_api_key: Optional[str] = None, model_provider: Optional[str] = None,
+                 version: tuple = ()):
+        self.agent_id = agent_id
+        self.agent_execution_id = agent_execution_id
+        self.organisation_id = organisation_id
+        self.agent_config = agent_config
+        self.execution_config = execution_config
+        self.model = agent_config.get("model")
+        self.model_api_key = model_api_key
+        self.model_provider = model_provider
+        self.version = version
+
+    @property
+    def goal(self) -> list:
+        return self.execution_config.get("goal") or self.agent_config.get("goal") or []
+
+    @property
+    def instruction(self) -> list:
+        return self.execution_config.get("instruction") or self.agent_config.get("instruction") or []
+
+    @property
+    def tools(self) -> list:
+        return self.execution_config.get("tools") or []
+
+    @classmethod
+    def fetch_version(cls, session, agent_id: int, agent_execution_id: int = None) -> tuple:
+        """
+        Fetches a cheap version marker of the agent and execution configuration in a single query.
+
+        Args:
+            session: The database session.
+            agent_id (int): The agent id.
+            agent_execution_id (int): The agent execution id.
+
+        Returns:
+            tuple: The last update time and the number of the agent configuration rows, followed by the
+                same for the execution configuration rows.
+        """
+        execution_configs = session.query(AgentExecutionConfiguration.id).filter(
+            AgentExecutionConfiguration.agent_execution_id == agent_execution_id,
+            AgentExecutionConfiguration.key.in_(EXECUTION_CONFIG_KEYS))
+        execution_updated_at = execution_configs.with_entities(
+            func.max(AgentExecutionConfiguration.updated_at)).scalar_subquery()
+        execution_count = execution_configs.with_entities(func.count(AgentExecutionConfiguration.id)).scalar_subquery()
+        result = session.query(func.max(AgentConfiguration.updated_at), func.count(AgentConfiguration.id),
+                               execution_updated_at, execution_count) \
+            .filter(AgentConfiguration.agent_id == agent_id).first()
+        return tuple(result) if result is not None else (None, 0, None, 0)
+
+    @classmethod
+    def build(cls, session, agent_id: int, agent_execution_id: int, version: tuple = ()):
+        """
+        Builds the snapshot from the database.
+
+        Args:
+            session: The database session.
+            agent_id (int): The agent id.
+            agent_execution_id (int): The agent execution id.
+            version (tuple): The version fetched before building.
+
+        Returns:
+            AgentRuntimeConfig: The configuration snapshot.
+        """
+        agent_config = Agent.fetch_configuration(session, agent_id)
+        execution_config = AgentExecutionConfiguration.fetch_configuration(session, agent_execution_id)
+        organisation = Agent.find_org_by_agent_id(session, agent_id=agent_id)
+        model_config = {}
+        if agent_config.get("model") is not None:
+            model_config = AgentConfiguration.get_model_api_key(session, agent_id, agent_config["model"]) or {}
+        return cls(agent_id=agent_id, agent_execution_id=agent_execution_id, organisation_id=organisation.id,
+                   agent_config=agent_config, execution_config=execution_config,
+                   model_api_key=model_config.get("api_key"), model_provider=model_config.get("provider"),
+                   version=version)
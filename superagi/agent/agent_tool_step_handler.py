@@ -3,9 +3,11 @@ import json
 from superagi.agent.task_queue import TaskQueue
 from superagi.agent.agent_message_builder import AgentLlmMessageBuilder
 from superagi.agent.agent_prompt_builder import AgentPromptBuilder
+from superagi.agent.agent_runtime_config import AgentRuntimeConfig
 from superagi.agent.output_handler import ToolOutputHandler
 from superagi.agent.output_parser import AgentSchemaToolOutputParser
 from superagi.agent.queue_step_handler import QueueStepHandler
+from superagi.apm.step_tracer import StepTracer, LLM_SPAN, TOOL_SPAN
 from superagi.agent.tool_builder import ToolBuilder
 from superagi.helper.error_handler import ErrorHandler
 from superagi.helper.prompt_reader import PromptReader
@@ -14,7 +16,6 @@ from superagi.lib.logger import logger
 from superagi.models.agent import Agent
 from superagi.models.agent_config import AgentConfiguration
 from superagi.models.agent_execution import AgentExecution
-from superagi.models.agent_execution_config import AgentExecutionConfiguration
 from superagi.models.agent_execution_feed import AgentExecutionFeed
 from superagi.models.agent_execution_permission import AgentExecutionPermission
 from superagi.models.tool import Tool
@@ -27,22 +28,30 @@ from sqlalchemy import and_
 
 class AgentToolStepHandler:
     """Handles the tools steps in the agent workflow"""
-    def __init__(self, session, llm, agent_id: int, agent_execution_id: int, memory=None):
+    def __init__(self, session, llm, agent_id: int, agent_execution_id: int, memory=None,
+                 runtime_config: AgentRuntimeConfig = None):
         self.session = session
         self.llm = llm
         self.agent_execution_id = agent_execution_id
         self.agent_id = agent_id
         self.memory = memory
+        self.runtime_config = runtime_config
         self.task_queue = TaskQueue(str(self.agent_execution_id))
-        self.organisation = Agent.find_org_by_agent_id(self.session, self.agent_id)
+        self.organisation_id = runtime_config.organisation_id if runtime_config is not None \
+            else Agent.find_org_by_agent_id(self.session, self.agent_id).id
+
+    def _runtime_config(self) -> AgentRuntimeConfig:
+        if self.runtime_config is None:
+            self.runtime_config = AgentRuntimeConfig.build(self.session, self.agent_id, self.agent_execution_id)
+        return self.runtime_config
 
     def execute_step(self):
         execution = AgentExecution.get_agent_execution_from_id(self.session, self.agent_execution_id)
         workflow_step = AgentWorkflowStep.find_by_id(self.session, execution.current_agent_step_id)
         step_tool = AgentWorkflowStepTool.find_by_id(self.session, workflow_step.action_reference_id)
-        agent_config = Agent.fetch_configuration(self.session, self.agent_id)
-        agent_execution_config = AgentExecutionConfiguration.fetch_configuration(self.session, self.agent_execution_id)
-        # print(agent_execution_config)
+        runtime_config = self._runtime_config()
+        agent_config = runtime_config.agent_config
+        agent_execution_config = runtime_config.execution_config
 
         if not self._handle_wait_for_permission(execution, workflow_step):
             return
@@ -62,7 +71,8 @@ class AgentToolStepHandler:
         tool_obj = self._build_tool_obj(agent_config, agent_execution_config, step_tool.tool_name)
         tool_output_handler = ToolOutputHandler(self.agent_execution_id, agent_config, [tool_obj],self.memory,
                                                 output_parser=AgentSchemaToolOutputParser())
-        final_response = tool_output_handler.handle(self.session, assistant_reply)
+        with StepTracer.span(TOOL_SPAN):
+            final_response = tool_output_handler.handle(self.session, assistant_reply)
         step_response = "default"
         if step_tool.output_instruction:
             step_response = self._process_output_instruction(final_response.result, step_tool, workflow_step)
@@ -98,14 +108,15 @@ class AgentToolStepHandler:
     def _process_input_instruction(self, agent_config, agent_execution_config, step_tool, workflow_step):
         tool_obj = self._build_tool_obj(agent_config, agent_execution_config, step_tool.tool_name)
         prompt = self._build_tool_input_prompt(step_tool, tool_obj, agent_execution_config)
-        logger.info("Prompt: ", prompt)
-        agent_feeds = AgentExecutionFeed.fetch_agent_execution_feeds(self.session, self.agent_execution_id)
+        logger.debug("Prompt:", prompt)
+        agent_feeds = AgentExecutionFeed.fetch_agent_execution_feeds(self.session, self.agent_execution_id, limit=1)
         messages = AgentLlmMessageBuilder(self.session, self.llm, self.llm.get_model(), self.agent_id, self.agent_execution_id) \
             .build_agent_messages(prompt, agent_feeds, history_enabled=step_tool.history_enabled,
                                   completion_prompt=step_tool.completion_prompt)
         # print(messages)
         current_tokens = TokenCounter.count_message_tokens(messages, self.llm.get_model())
-        response = self.llm.chat_completion(messages, TokenCounter(session=self.session, organisation_id=self.organisation.id).token_limit(self.llm.get_model()) - current_tokens)
+        with StepTracer.span(LLM_SPAN):
+            response = self.llm.chat_completion(messages, TokenCounter(session=self.session, organisation_id=self.organisation_id).token_limit(self.llm.get_model()) - current_tokens)
 
         if 'error' in response and response['message'] is not None:
             ErrorHandler.handle_openai_errors(self.session, self.agent_id, self.agent_execution_id, response['message'])
@@ -114,21 +125,25 @@ class AgentToolStepHandler:
             raise RuntimeError(f"Failed to get response from llm")
         total_tokens = current_tokens + TokenCounter.count_message_tokens(response, self.llm.get_model())
         AgentExecution.update_tokens(self.session, self.agent_execution_id, total_tokens)
+        StepTracer.add_tokens(total_tokens)
         assistant_reply = response['content']
         return assistant_reply
 
     def _build_tool_obj(self, agent_config, agent_execution_config, tool_name: str):
-        model_api_key = AgentConfiguration.get_model_api_key(self.session, self.agent_id, agent_config["model"])['api_key']
+        if self.runtime_config is not None and self.runtime_config.model_api_key is not None:
+            model_api_key = self.runtime_config.model_api_key
+        else:
+            model_api_key = AgentConfiguration.get_model_api_key(self.session, self.agent_id, agent_config["model"])['api_key']
         tool_builder = ToolBuilder(self.session, self.agent_id, self.agent_execution_id)
         resource_summary = ""
         if tool_name == "QueryResourceTool":
             resource_summary = ResourceSummarizer(session=self.session,
                                                   agent_id=self.agent_id,
-                                                  model=agent_config["model"]).fetch_or_create_agent_resource_summary(
+                                                  model=agent_config["model"],
+                                                  organisation_id=self.organisation_id).fetch_or_create_agent_resource_summary(
                 default_summary=agent_config.get("resource_summary"))
 
-        organisation = Agent.find_org_by_agent_id(self.session, self.agent_id)
-        tool = self.session.query(Tool).join(Toolkit, and_(Tool.toolkit_id == Toolkit.id, Toolkit.organisation_id == organisation.id, Tool.name == tool_name)).first()
+        tool = self.session.query(Tool).join(Toolkit, and_(Tool.toolkit_id == Toolkit.id, Toolkit.organisation_id == self.organisation_id, Tool.name == tool_name)).first()
         tool_obj = tool_builder.build_tool(tool)
         tool_obj = tool_builder.set_default_params_tool(tool_obj, agent_config, agent_execution_config, model_api_key,
                                                         resource_summary,self.memory)
@@ -139,8 +154,9 @@ class AgentToolStepHandler:
         prompt = self._build_tool_output_prompt(step_tool, final_response, workflow_step)
         messages = [{"role": "system", "content": prompt}]
         current_tokens = TokenCounter.count_message_tokens(messages, self.llm.get_model())
-        response = self.llm.chat_completion(messages,
-                                            TokenCounter(session=self.session, organisation_id=self.organisation.id).token_limit(self.llm.get_model()) - current_tokens)
+        with StepTracer.span(LLM_SPAN):
+            response = self.llm.chat_completion(messages,
+                                                TokenCounter(session=self.session, organisation_id=self.organisation_id).token_limit(self.llm.get_model()) - current_tokens)
 
         if 'error' in response and response['message'] is not None:
             ErrorHandler.handle_openai_errors(self.session, self.agent_id, self.agent_execution_id, response['message'])
@@ -149,6 +165,7 @@ class AgentToolStepHandler:
             raise RuntimeError(f"ToolWorkflowStepHandler: Failed to get output response from llm")
         total_tokens = current_tokens + TokenCounter.count_message_tokens(response, self.llm.get_model())
         AgentExecution.update_tokens(self.session, self.agent_execution_id, total_tokens)
+        StepTracer.add_tokens(total_tokens)
         step_response = response['content']
         step_response = step_response.replace("'", "").replace("\"", "")
         return step_response
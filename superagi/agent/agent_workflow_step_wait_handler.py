@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from superagi.agent.types.agent_execution_status import AgentExecutionStatus
+from superagi.jobs.step_scheduler import StepScheduler
 from superagi.lib.logger import logger
 from superagi.models.agent_execution import AgentExecution
 from superagi.models.workflows.agent_workflow_step import AgentWorkflowStep
@@ -28,6 +29,7 @@ class AgentWaitStepHandler:
             execution.status = AgentExecutionStatus.WAIT_STEP.value
 
             self.session.commit()
+            StepScheduler.schedule_wait_step(self.agent_execution_id, step_wait.delay)
 
     def handle_next_step(self):
         """Handle next step of agent workflow in case of wait step."""
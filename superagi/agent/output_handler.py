@@ -1,6 +1,5 @@
-import json
 from superagi.agent.common_types import TaskExecutorResponse, ToolExecutorResponse
-from superagi.agent.output_parser import AgentSchemaOutputParser
+from superagi.agent.output_parser import AgentReply, AgentSchemaOutputParser
 from superagi.agent.task_queue import TaskQueue
 from superagi.agent.tool_executor import ToolExecutor
 from superagi.helper.json_cleaner import JsonCleaner
@@ -22,13 +21,15 @@ class ToolOutputHandler:
                  agent_config: dict,
                  tools: list,
                  memory:VectorStore=None,
-                 output_parser=AgentSchemaOutputParser()):
+                 output_parser=AgentSchemaOutputParser(),
+                 tool_initializer=None):
         self.agent_execution_id = agent_execution_id
         self.task_queue = TaskQueue(str(agent_execution_id))
         self.agent_config = agent_config
         self.tools = tools
         self.output_parser = output_parser
         self.memory=memory
+        self.tool_initializer = tool_initializer
 
     def handle(self, session, assistant_reply):
         """Handles the tool output response from the thinking step.
@@ -36,8 +37,9 @@ class ToolOutputHandler:
 
         Args:
             session (Session): The database session.
-            assistant_reply (str): The assistant reply.
+            assistant_reply (AgentReply | str): The assistant reply.
         """
+        assistant_reply = AgentReply.of(assistant_reply)
         response = self._check_permission_in_restricted_mode(session, assistant_reply)
         if response.is_permission_required:
             return response
@@ -48,7 +50,7 @@ class ToolOutputHandler:
         agent_execution = AgentExecution.find_by_id(session, self.agent_execution_id)
         agent_execution_feed = AgentExecutionFeed(agent_execution_id=self.agent_execution_id,
                                                   agent_id=self.agent_config["agent_id"],
-                                                  feed=assistant_reply,
+                                                  feed=assistant_reply.text,
                                                   role="assistant",
                                                   feed_group_id=agent_execution.current_feed_group_id)
         session.add(agent_execution_feed)
@@ -70,7 +72,7 @@ class ToolOutputHandler:
         Adds the text generated by the assistant and tool response to the memory.
 
         Args:
-            assistant_reply (str): The assistant reply.
+            assistant_reply (AgentReply | str): The assistant reply.
             tool_response_result (str): The tool response.
 
         Returns:
@@ -78,8 +80,7 @@ class ToolOutputHandler:
         """
         if self.memory is not None:
             try:
-                data = json.loads(assistant_reply)
-                task_description = data['thoughts']['text']
+                task_description = AgentReply.of(assistant_reply).data['thoughts']['text']
                 final_tool_response = tool_response_result
                 prompt = task_description + final_tool_response
                 text_splitter = TokenTextSplitter(chunk_size=1024, chunk_overlap=10)
@@ -100,10 +101,13 @@ class ToolOutputHandler:
         action = self.output_parser.parse(assistant_reply)
         agent = session.query(Agent).filter(Agent.id == self.agent_config["agent_id"]).first()
         organisation = agent.get_agent_organisation(session)
-        tool_executor = ToolExecutor(organisation_id=organisation.id, agent_id=agent.id, tools=self.tools, agent_execution_id=self.agent_execution_id)
+        tool_executor = ToolExecutor(organisation_id=organisation.id, agent_id=agent.id, tools=self.tools,
+                                     agent_execution_id=self.agent_execution_id,
+                                     tool_initializer=self.tool_initializer)
         return tool_executor.execute(session, action.name, action.args)
 
-    def _check_permission_in_restricted_mode(self, session, assistant_reply: str):
+    def _check_permission_in_restricted_mode(self, session, assistant_reply):
+        assistant_reply = AgentReply.of(assistant_reply)
         action = self.output_parser.parse(assistant_reply)
         tools = {t.name: t for t in self.tools}
 
@@ -116,7 +120,7 @@ class ToolOutputHandler:
                 status="PENDING",
                 agent_id=self.agent_config["agent_id"],
                 tool_name=action.name,
-                assistant_reply=assistant_reply)
+                assistant_reply=assistant_reply.text)
 
             session.add(new_agent_execution_permission)
             session.commit()
@@ -126,10 +130,10 @@ class ToolOutputHandler:
 
     def _check_for_completion(self, tool_response):
         self.task_queue.complete_task(tool_response.result)
-        current_tasks = self.task_queue.get_tasks()
-        if self.task_queue.get_completed_tasks() and len(current_tasks) == 0:
+        pending_tasks = self.task_queue.task_count()
+        if pending_tasks == 0 and self.task_queue.completed_task_count():
             tool_response.status = "COMPLETE"
-        if current_tasks and tool_response.status == "COMPLETE":
+        if pending_tasks and tool_response.status == "COMPLETE":
             tool_response.status = "PENDING"
         return tool_response
 
@@ -145,7 +149,7 @@ class TaskOutputHandler:
         self.agent_config = agent_config
 
     def handle(self, session, assistant_reply):
-        assistant_reply = JsonCleaner.extract_json_array_section(assistant_reply)
+        assistant_reply = JsonCleaner.extract_json_array_section(AgentReply.of(assistant_reply).text)
         tasks = eval(assistant_reply)
         tasks = np.array(tasks).flatten().tolist()
         for task in reversed(tasks):
@@ -160,7 +164,7 @@ class TaskOutputHandler:
                                                       role="system",
                                                       feed_group_id=agent_execution.current_feed_group_id)
             session.add(agent_execution_feed)
-        status = "COMPLETE" if len(self.task_queue.get_tasks()) == 0 else "PENDING"
+        status = "COMPLETE" if self.task_queue.task_count() == 0 else "PENDING"
         session.commit()
         return TaskExecutorResponse(status=status, retry=False)
 
@@ -176,23 +180,26 @@ class ReplaceTaskOutputHandler:
         self.agent_config = agent_config
 
     def handle(self, session, assistant_reply):
-        assistant_reply = JsonCleaner.extract_json_array_section(assistant_reply)
+        assistant_reply = JsonCleaner.extract_json_array_section(AgentReply.of(assistant_reply).text)
         tasks = eval(assistant_reply)
         self.task_queue.clear_tasks()
         for task in reversed(tasks):
             self.task_queue.add_task(task)
         if len(tasks) > 0:
             logger.info("Tasks reprioritized in order: " + str(tasks))
-        status = "COMPLETE" if len(self.task_queue.get_tasks()) == 0 else "PENDING"
+        status = "COMPLETE" if self.task_queue.task_count() == 0 else "PENDING"
         session.commit()
         return TaskExecutorResponse(status=status, retry=False)
 
 
-def get_output_handler(output_type: str, agent_execution_id: int, agent_config: dict, agent_tools: list = [],memory=None):
+def get_output_handler(output_type: str, agent_execution_id: int, agent_config: dict, agent_tools: list = [],memory=None,
+                       tool_initializer=None):
     if output_type == "tools":
-        return ToolOutputHandler(agent_execution_id, agent_config, agent_tools,memory=memory)
+        return ToolOutputHandler(agent_execution_id, agent_config, agent_tools,memory=memory,
+                                 tool_initializer=tool_initializer)
     elif output_type == "replace_tasks":
         return ReplaceTaskOutputHandler(agent_execution_id, agent_config)
     elif output_type == "tasks":
         return TaskOutputHandler(agent_execution_id, agent_config)
-    return ToolOutputHandler(agent_execution_id, agent_config, agent_tools,memory=memory)
+    return ToolOutputHandler(agent_execution_id, agent_config, agent_tools,memory=memory,
+                             tool_initializer=tool_initializer)
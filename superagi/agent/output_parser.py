@@ -8,6 +8,83 @@ from superagi.helper.json_cleaner import JsonCleaner
 from superagi.lib.logger import logger
 
 
+class AgentReply:
+    """
+    Assistant reply whose JSON object is decoded once, on first access, and kept on the reply. The
+    output handlers pass it along so the permission check, the tool execution and the call log share
+    a single parse.
+
+    Attributes:
+        text (str): The raw reply.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._data = None
+        self._error = None
+        self._parsed = False
+
+    @classmethod
+    def of(cls, reply) -> "AgentReply":
+        return reply if isinstance(reply, AgentReply) else cls(reply)
+
+    @staticmethod
+    def decode(text: str):
+        """
+        Decodes the JSON object of a reply with json, falling back to ast for python literals such
+        as single quoted keys or capitalized booleans.
+
+        Args:
+            text (str): The reply.
+
+        Returns:
+            The decoded object.
+        """
+        text = text.strip()
+        if text.startswith("```") and text.endswith("```"):
+            text = "```".join(text.split("```")[1:-1])
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+        section = JsonCleaner.extract_json_section(text)
+        if section != text:
+            try:
+                return json.loads(section)
+            except ValueError:
+                pass
+        # ast throws error if true/false params passed in json
+        return ast.literal_eval(JsonCleaner.clean_boolean(section))
+
+    @property
+    def data(self):
+        """The decoded reply, raises the decoding error if the reply is not valid."""
+        if not self._parsed:
+            try:
+                self._data = self.decode(self.text)
+            except Exception as e:
+                self._error = e
+            self._parsed = True
+        if self._error is not None:
+            raise self._error
+        return self._data
+
+    def get(self, key: str, default=None):
+        try:
+            data = self.data
+        except Exception:
+            return default
+        return data.get(key, default) if isinstance(data, dict) else default
+
+    @property
+    def tool_name(self) -> str:
+        tool = self.get("tool")
+        return tool.get("name", "") if isinstance(tool, dict) else ""
+
+    def __str__(self):
+        return self.text
+
+
 class AgentGPTAction(NamedTuple):
     name: str
     args: Dict
@@ -26,17 +103,11 @@ class BaseOutputParser(ABC):
 
 class AgentSchemaOutputParser(BaseOutputParser):
     """Parses the output from the agent schema"""
-    def parse(self, response: str) -> AgentGPTAction:
-        if response.startswith("```") and response.endswith("```"):
-            response = "```".join(response.split("```")[1:-1])
-        response = JsonCleaner.extract_json_section(response)
-        # ast throws error if true/false params passed in json
-        response = JsonCleaner.clean_boolean(response)
-
-        # OpenAI returns `str(content_dict)`, literal_eval reverses this
+    def parse(self, response) -> AgentGPTAction:
+        reply = AgentReply.of(response)
         try:
-            logger.debug("AgentSchemaOutputParser: ", response)
-            response_obj = ast.literal_eval(response)
+            logger.debug("AgentSchemaOutputParser: ", reply.text)
+            response_obj = reply.data
             args = response_obj['tool']['args'] if 'args' in response_obj['tool'] else {}
             return AgentGPTAction(
                 name=response_obj['tool']['name'],
@@ -49,17 +120,11 @@ class AgentSchemaOutputParser(BaseOutputParser):
 
 class AgentSchemaToolOutputParser(BaseOutputParser):
     """Parses the output from the agent schema for the tool"""
-    def parse(self, response: str) -> AgentGPTAction:
-        if response.startswith("```") and response.endswith("```"):
-            response = "```".join(response.split("```")[1:-1])
-        response = JsonCleaner.extract_json_section(response)
-        # ast throws error if true/false params passed in json
-        response = JsonCleaner.clean_boolean(response)
-
-        # OpenAI returns `str(content_dict)`, literal_eval reverses this
+    def parse(self, response) -> AgentGPTAction:
+        reply = AgentReply.of(response)
         try:
-            logger.debug("AgentSchemaOutputParser: ", response)
-            response_obj = ast.literal_eval(response)
+            logger.debug("AgentSchemaOutputParser: ", reply.text)
+            response_obj = reply.data
             args = response_obj['args'] if 'args' in response_obj else {}
             return AgentGPTAction(
                 name=response_obj['name'],
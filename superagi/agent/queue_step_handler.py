@@ -3,6 +3,7 @@ import time
 import numpy as np
 
 from superagi.agent.agent_message_builder import AgentLlmMessageBuilder
+from superagi.apm.step_tracer import StepTracer, LLM_SPAN
 from superagi.agent.task_queue import TaskQueue
 from superagi.helper.error_handler import ErrorHandler
 from superagi.helper.json_cleaner import JsonCleaner
@@ -46,7 +47,7 @@ class QueueStepHandler:
             execution.current_feed_group_id = "DEFAULT"
             task_queue.set_status(QueueStatus.PROCESSING.value)
 
-        if not task_queue.get_tasks():
+        if not task_queue.task_count():
             task_queue.set_status(QueueStatus.COMPLETE.value)
             return "COMPLETE"
         self._consume_from_queue(task_queue)
@@ -57,10 +58,9 @@ class QueueStepHandler:
         self._process_reply(task_queue, assistant_reply)
 
     def _consume_from_queue(self, task_queue: TaskQueue):
-        tasks = task_queue.get_tasks()
+        task = task_queue.get_first_task()
         agent_execution = AgentExecution.find_by_id(self.session, self.agent_execution_id)
-        if tasks:
-            task = task_queue.get_first_task()
+        if task is not None:
             # generating the new feed group id
             agent_execution.current_feed_group_id = "GROUP_" + str(int(time.time()))
             self.session.commit()
@@ -75,22 +75,22 @@ class QueueStepHandler:
 
     def _process_reply(self, task_queue: TaskQueue, assistant_reply: str):
         assistant_reply = JsonCleaner.extract_json_array_section(assistant_reply)
-        print("Queue reply:", assistant_reply)
+        logger.debug("Queue reply:", assistant_reply)
         task_array = np.array(eval(assistant_reply)).flatten().tolist()
         for task in task_array:
             task_queue.add_task(str(task))
-            logger.info("RAMRAM: Added task to queue: ", task)
+            logger.debug("Added task to queue:", task)
 
     def _process_input_instruction(self, step_tool):
         prompt = self._build_queue_input_prompt(step_tool)
-        logger.info("Prompt: ", prompt)
-        agent_feeds = AgentExecutionFeed.fetch_agent_execution_feeds(self.session, self.agent_execution_id)
-        print(".........//////////////..........2")
+        logger.debug("Prompt:", prompt)
+        agent_feeds = AgentExecutionFeed.fetch_agent_execution_feeds(self.session, self.agent_execution_id, limit=1)
         messages = AgentLlmMessageBuilder(self.session, self.llm, self.llm.get_model(), self.agent_id, self.agent_execution_id) \
             .build_agent_messages(prompt, agent_feeds, history_enabled=step_tool.history_enabled,
                                   completion_prompt=step_tool.completion_prompt)
         current_tokens = TokenCounter.count_message_tokens(messages, self.llm.get_model())
-        response = self.llm.chat_completion(messages, TokenCounter(session=self.session, organisation_id=self.organisation.id).token_limit(self.llm.get_model()) - current_tokens)
+        with StepTracer.span(LLM_SPAN):
+            response = self.llm.chat_completion(messages, TokenCounter(session=self.session, organisation_id=self.organisation.id).token_limit(self.llm.get_model()) - current_tokens)
         
         if 'error' in response and response['message'] is not None:
             ErrorHandler.handle_openai_errors(self.session, self.agent_id, self.agent_execution_id, response['message'])
@@ -99,6 +99,7 @@ class QueueStepHandler:
             raise RuntimeError(f"Failed to get response from llm")
         total_tokens = current_tokens + TokenCounter.count_message_tokens(response, self.llm.get_model())
         AgentExecution.update_tokens(self.session, self.agent_execution_id, total_tokens)
+        StepTracer.add_tokens(total_tokens)
         assistant_reply = response['content']
         return assistant_reply
 
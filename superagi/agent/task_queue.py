@@ -1,26 +1,79 @@
+import ast
 import json
 
 import redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 
 from superagi.config.config import get_config
+from superagi.lib.logger import logger
+from superagi.models.agent_execution import AgentExecution
 
 redis_url = get_config('REDIS_URL') or "localhost:6379"
-"""TaskQueue manages current tasks and past tasks in Redis """
+
+# Statuses after which the queue of an execution is expired, it is kept again once the execution runs.
+EXPIRED_QUEUE_STATUSES = ("COMPLETED", "PAUSED", "TERMINATED", "ERROR_PAUSED", "ITERATION_LIMIT_EXCEEDED")
+
+# Pops the first pending task and pushes it with its response on the completed list in one step,
+# returning the popped task or nil when no task is pending.
+COMPLETE_TASK_SCRIPT = """
+local task = redis.call('LPOP', KEYS[1])
+if not task then
+    return nil
+end
+redis.call('LPUSH', KEYS[2], cjson.encode({task = task, response = ARGV[1]}))
+return task
+"""
+
+
 class TaskQueue:
+    """
+    TaskQueue manages current tasks and past tasks in Redis.
+
+    Pending tasks are kept as plain strings, completed tasks as JSON objects with the task and its
+    response, newest first. The queue of an execution which is finished, stopped or paused is expired
+    after TASK_QUEUE_TTL seconds by expire(), once the status change is committed, and kept again by
+    persist() when the execution runs again.
+    """
+
+    _redis = None
+    _complete_task_script = None
+
     def __init__(self, queue_name: str):
         self.queue_name = queue_name + "_q"
         self.completed_tasks = queue_name + "_q_completed"
-        self.db = redis.Redis.from_url("redis://" + redis_url + "/0", decode_responses=True)
+        self.db = self._redis_client()
+
+    @classmethod
+    def _redis_client(cls):
+        if cls._redis is None:
+            cls._redis = redis.Redis.from_url("redis://" + redis_url + "/0", decode_responses=True)
+            cls._complete_task_script = cls._redis.register_script(COMPLETE_TASK_SCRIPT)
+        return cls._redis
+
+    @staticmethod
+    def _decode_completed_task(entry: str) -> dict:
+        try:
+            return json.loads(entry)
+        except ValueError:
+            # entries written before the JSON format are python dict literals
+            return ast.literal_eval(entry)
 
     def add_task(self, task: str):
         self.db.lpush(self.queue_name, task)
-        # print("Added task. New tasks:", str(self.get_tasks()))
 
     def complete_task(self, response):
-        if len(self.get_tasks()) <= 0:
-            return
-        task = self.db.lpop(self.queue_name)
-        self.db.lpush(self.completed_tasks, str({"task": task, "response": response}))
+        """
+        Moves the first pending task to the completed tasks.
+
+        Args:
+            response (str): The response of the task.
+
+        Returns:
+            str: The completed task, None if no task was pending.
+        """
+        return self._complete_task_script(keys=[self.queue_name, self.completed_tasks], args=[str(response)],
+                                          client=self.db)
 
     def get_first_task(self):
         return self.db.lindex(self.queue_name, 0)
@@ -28,9 +81,24 @@ class TaskQueue:
     def get_tasks(self):
         return self.db.lrange(self.queue_name, 0, -1)
 
-    def get_completed_tasks(self):
-        tasks = self.db.lrange(self.completed_tasks, 0, -1)
-        return [eval(task) for task in tasks]
+    def task_count(self) -> int:
+        return self.db.llen(self.queue_name)
+
+    def completed_task_count(self) -> int:
+        return self.db.llen(self.completed_tasks)
+
+    def get_completed_tasks(self, limit: int = None):
+        """
+        Fetches the completed tasks, newest first.
+
+        Args:
+            limit (int): Number of most recent tasks to fetch, all of them when None.
+
+        Returns:
+            list: The completed tasks as dicts with the task and its response.
+        """
+        tasks = self.db.lrange(self.completed_tasks, 0, -1 if limit is None else limit - 1)
+        return [self._decode_completed_task(task) for task in tasks]
 
     def clear_tasks(self):
         self.db.delete(self.queue_name)
@@ -40,7 +108,7 @@ class TaskQueue:
         if response is None:
             return None
 
-        return eval(response)
+        return self._decode_completed_task(response)
 
     def set_status(self, status):
         self.db.set(self.queue_name + "_status", status)
@@ -48,3 +116,49 @@ class TaskQueue:
     def get_status(self):
         return self.db.get(self.queue_name + "_status")
 
+    def expire(self, ttl: int = None):
+        """
+        Schedules the removal of the queue, to be called once its execution is finished.
+
+        Args:
+            ttl (int): Seconds after which the queue is removed, defaults to TASK_QUEUE_TTL.
+        """
+        ttl = ttl if ttl is not None else int(get_config("TASK_QUEUE_TTL", 7 * 24 * 3600))
+        try:
+            pipe = self.db.pipeline(transaction=False)
+            for key in (self.queue_name, self.completed_tasks, self.queue_name + "_status"):
+                pipe.expire(key, ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Unable to expire task queue {self.queue_name}: {e}")
+
+    def persist(self):
+        """Cancels the removal scheduled by expire(), to be called when the execution runs again."""
+        try:
+            pipe = self.db.pipeline(transaction=False)
+            for key in (self.queue_name, self.completed_tasks, self.queue_name + "_status"):
+                pipe.persist(key)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Unable to persist task queue {self.queue_name}: {e}")
+
+
+@event.listens_for(AgentExecution.status, "set")
+def collect_status_change(target, value, old_value, initiator):
+    session = object_session(target)
+    if value != old_value and session is not None and target.id is not None:
+        session.info.setdefault("task_queue_statuses", {})[target.id] = value
+
+
+@event.listens_for(Session, "after_commit")
+def update_task_queue_expiry(session):
+    for agent_execution_id, status in session.info.pop("task_queue_statuses", {}).items():
+        if status in EXPIRED_QUEUE_STATUSES:
+            TaskQueue(str(agent_execution_id)).expire()
+        elif status == "RUNNING":
+            TaskQueue(str(agent_execution_id)).persist()
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_task_queue_statuses(session):
+    session.info.pop("task_queue_statuses", None)
@@ -1,14 +1,15 @@
 import importlib
 import os
+from functools import partial
+
 from superagi.config.config import get_config
 from superagi.llms.llm_model_factory import get_model
 from superagi.models.tool import Tool
-from superagi.models.tool_config import ToolConfig
 from superagi.models.agent import Agent
 from superagi.resource_manager.file_manager import FileManager
 from superagi.tools.base_tool import BaseToolkitConfiguration
 from superagi.tools.tool_response_query_manager import ToolResponseQueryManager
-from superagi.helper.encyption_helper import decrypt_data, is_encrypted
+from superagi.helper.toolkit_config_cache import ToolkitConfigCache
 
 class DBToolkitConfiguration(BaseToolkitConfiguration):
     session = None
@@ -17,21 +18,26 @@ class DBToolkitConfiguration(BaseToolkitConfiguration):
     def __init__(self, session=None, toolkit_id=None):
         self.session = session
         self.toolkit_id = toolkit_id
+        self._configs = None
 
     def get_tool_config(self, key: str):
-        tool_config = self.session.query(ToolConfig).filter_by(key=key, toolkit_id=self.toolkit_id).first()
-        if tool_config and tool_config.value:
-            if is_encrypted(tool_config.value):
-                return decrypt_data(tool_config.value)
-            else:
-                return tool_config.value
+        # the toolkit snapshot is fetched once per tool instance
+        if self._configs is None:
+            self._configs = ToolkitConfigCache.fetch_configs(self.session, self.toolkit_id)
+        value = self._configs.get(key)
+        if value:
+            return value
         return super().get_tool_config(key=key)
 
 class ToolBuilder:
+    # tool classes imported by this process, keyed by tool id and version
+    _tool_classes = {}
+
     def __init__(self, session, agent_id: int, agent_execution_id: int = None):
         self.session = session
         self.agent_id = agent_id
         self.agent_execution_id = agent_execution_id
+        self._organisation_id = None
 
     def __validate_filename(self, filename):
         """
@@ -57,6 +63,27 @@ class ToolBuilder:
         Returns:
             object: The object of the agent usable tool.
         """
+        obj_class = self.__get_tool_class(tool)
+
+        # Create an instance of the class
+        new_object = obj_class()
+        new_object.toolkit_config = DBToolkitConfiguration(session=self.session, toolkit_id=tool.toolkit_id)
+        return new_object
+
+    def __get_tool_class(self, tool: Tool):
+        """
+        Get the class of a tool, importing its module on first use only.
+
+        Args:
+            tool (Tool) : Tool object from which agent tool would be made.
+
+        Returns:
+            type: The class of the agent usable tool.
+        """
+        key = (tool.id, tool.updated_at)
+        if key in ToolBuilder._tool_classes:
+            return ToolBuilder._tool_classes[key]
+
         file_name = self.__validate_filename(filename=tool.file_name)
 
         tools_dir=""
@@ -75,14 +102,11 @@ class ToolBuilder:
 
         # Get the class from the loaded module
         obj_class = getattr(module, tool.class_name)
-
-        # Create an instance of the class
-        new_object = obj_class()
-        new_object.toolkit_config = DBToolkitConfiguration(session=self.session, toolkit_id=tool.toolkit_id)
-        return new_object
+        ToolBuilder._tool_classes[key] = obj_class
+        return obj_class
 
     def set_default_params_tool(self, tool, agent_config, agent_execution_config, model_api_key: str,
-                                resource_summary: str = "",memory=None):
+                                resource_summary: str = "", memory=None, lazy: bool = False):
         """
         Set the default parameters for the tools.
 
@@ -92,32 +116,72 @@ class ToolBuilder:
             agent_execution_config (dict): Parsed execution configuration
             agent_id (int): The ID of the agent.
             model_api_key (str): The API key of the model
+            lazy (bool): Whether to leave the llm and managers of the tool to set_tool_dependencies.
 
         Returns:
             list: The list of tools with default parameters.
         """
-        organisation = Agent.find_org_by_agent_id(self.session, agent_id=agent_config['agent_id'])
         if hasattr(tool, 'goals'):
             tool.goals = agent_execution_config["goal"]
         if hasattr(tool, 'instructions'):
             tool.instructions = agent_execution_config["instruction"]
-        if hasattr(tool, 'llm') and (agent_config["model"] == "gpt4" or agent_config[
-            "model"] == "gpt-3.5-turbo") and tool.name != "QueryResource":
-            tool.llm = get_model(model="gpt-3.5-turbo", api_key=model_api_key, organisation_id=organisation.id , temperature=0.4)
-        elif hasattr(tool, 'llm'):
-            tool.llm = get_model(model=agent_config["model"], api_key=model_api_key, organisation_id=organisation.id, temperature=0.4)
         if hasattr(tool, 'agent_id'):
             tool.agent_id = self.agent_id
         if hasattr(tool, 'agent_execution_id'):
             tool.agent_execution_id = self.agent_execution_id
+        if not lazy:
+            self.set_tool_dependencies(tool, agent_config, model_api_key, memory)
+
+        if tool.name == "QueryResourceTool":
+            tool.description = tool.description.replace("{summary}", resource_summary)
+
+        return tool
+
+    def set_tool_dependencies(self, tool, agent_config, model_api_key: str, memory=None):
+        """
+        Set the llm and the managers the tool runs with.
+
+        Args:
+            tool : Tool object.
+            agent_config (dict): Parsed agent configuration.
+            model_api_key (str): The API key of the model
+            memory: The long term memory of the agent.
+
+        Returns:
+            object: The tool.
+        """
+        if hasattr(tool, 'llm') and (agent_config["model"] == "gpt4" or agent_config[
+            "model"] == "gpt-3.5-turbo") and tool.name != "QueryResource":
+            tool.llm = get_model(model="gpt-3.5-turbo", api_key=model_api_key,
+                                 organisation_id=self.__get_organisation_id(agent_config), temperature=0.4)
+        elif hasattr(tool, 'llm'):
+            tool.llm = get_model(model=agent_config["model"], api_key=model_api_key,
+                                 organisation_id=self.__get_organisation_id(agent_config), temperature=0.4)
         if hasattr(tool, 'resource_manager'):
             tool.resource_manager = FileManager(session=self.session, agent_id=self.agent_id,
                                                 agent_execution_id=self.agent_execution_id)
         if hasattr(tool, 'tool_response_manager'):
             tool.tool_response_manager = ToolResponseQueryManager(session=self.session,
                                                                   agent_execution_id=self.agent_execution_id,memory=memory)
+        return tool
 
-        if tool.name == "QueryResourceTool":
-            tool.description = tool.description.replace("{summary}", resource_summary)
+    def tool_initializer(self, agent_config, model_api_key: str, memory=None):
+        """
+        Get the callable setting the dependencies of the tools built with lazy set_default_params_tool, so that
+        only the tool chosen by the llm gets them.
+
+        Args:
+            agent_config (dict): Parsed agent configuration.
+            model_api_key (str): The API key of the model
+            memory: The long term memory of the agent.
+
+        Returns:
+            Callable: Callable taking the tool.
+        """
+        return partial(self.set_tool_dependencies, agent_config=agent_config, model_api_key=model_api_key,
+                       memory=memory)
 
-        return tool
\ No newline at end of file
+    def __get_organisation_id(self, agent_config):
+        if self._organisation_id is None:
+            self._organisation_id = Agent.find_org_by_agent_id(self.session, agent_id=agent_config['agent_id']).id
+        return self._organisation_id
\ No newline at end of file
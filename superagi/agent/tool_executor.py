@@ -9,11 +9,14 @@ class ToolExecutor:
     """Executes the tool with the given args."""
     FINISH = "finish"
 
-    def __init__(self, organisation_id: int, agent_id: int, tools: list, agent_execution_id: int):
+    def __init__(self, organisation_id: int, agent_id: int, tools: list, agent_execution_id: int,
+                 tool_initializer=None):
         self.organisation_id = organisation_id
         self.agent_id = agent_id
         self.tools = tools
         self.agent_execution_id = agent_execution_id
+        # sets the dependencies of the tools built lazily, see ToolBuilder.tool_initializer
+        self.tool_initializer = tool_initializer
 
     def execute(self, session, tool_name, tool_args):
         """Executes the tool with the given args.
@@ -33,8 +36,10 @@ class ToolExecutor:
             tool = tools[tool_name]
             retry = False
             EventHandler(session=session).create_event('tool_used', {'tool_name': tool.name, 'agent_execution_id': self.agent_execution_id}, self.agent_id,
-                                                       self.organisation_id),
+                                                       self.organisation_id, buffered=True)
             try:
+                if self.tool_initializer is not None:
+                    self.tool_initializer(tool)
                 parsed_args = self.clean_tool_args(tool_args)
                 observation = tool.execute(parsed_args)
             except ValidationError as e:
@@ -61,7 +66,7 @@ class ToolExecutor:
             )
             output = ToolExecutorResponse(status="ERROR", result=result, retry=True)
 
-        logger.info("Tool Response : " + str(output) + "\n")
+        logger.debug("Tool Response :", output)
         return output
 
     def clean_tool_args(self, args):
@@ -0,0 +1,129 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from superagi.models.analytics_agent import AnalyticsAgent
+from superagi.models.analytics_agent_tool import AnalyticsAgentTool
+from superagi.models.analytics_daily_rollup import AnalyticsDailyRollup
+from superagi.models.analytics_run import AnalyticsRun
+
+RUN_END_EVENTS = ('run_completed', 'run_iteration_limit_crossed')
+
+
+class AnalyticsRollup:
+    """
+    Maintains the analytics rollup tables from the events as they are stored, so that the analytics
+    are served without aggregating over the events table.
+
+    The rollups are updated with upserts in the transaction storing the events, by EventHandler for the
+    events committed right away and by TelemetryWriter for the buffered ones.
+    """
+
+    @classmethod
+    def apply(cls, bind, events: list):
+        """
+        Applies stored events to the rollups.
+
+        Args:
+            bind: The session or connection storing the events.
+            events (list): The column values of the events.
+        """
+        for event in events:
+            event_name = event.get("event_name")
+            if event.get("org_id") is None:
+                continue
+            if event_name == "agent_created":
+                cls._apply_agent_created(bind, event)
+            elif event_name == "run_created":
+                cls._apply_run_created(bind, event)
+            elif event_name in RUN_END_EVENTS:
+                cls._apply_run_ended(bind, event)
+            elif event_name == "tool_used":
+                cls._apply_tool_used(bind, event)
+
+    @staticmethod
+    def _insert(bind, model):
+        # both dialects offer the same ON CONFLICT upserts
+        dialect = bind.dialect if hasattr(bind, "dialect") else bind.get_bind().dialect
+        return (sqlite if dialect.name == "sqlite" else postgresql).insert(model)
+
+    @staticmethod
+    def _property(event: dict, key: str, default=None):
+        return (event.get("event_property") or {}).get(key, default)
+
+    @classmethod
+    def _apply_agent_created(cls, bind, event: dict):
+        if event.get("agent_id") is None:
+            return
+        insert = cls._insert(bind, AnalyticsAgent).values(
+            org_id=event["org_id"], agent_id=event["agent_id"], agent_name=cls._property(event, "agent_name"),
+            model=cls._property(event, "model"), created_at=event["created_at"], updated_at=event["created_at"])
+        bind.execute(insert.on_conflict_do_update(
+            index_elements=["agent_id"],
+            set_={"agent_name": insert.excluded.agent_name, "model": insert.excluded.model,
+                  "updated_at": insert.excluded.updated_at}))
+
+    @classmethod
+    def _apply_run_created(cls, bind, event: dict):
+        agent_execution_id = cls._property(event, "agent_execution_id")
+        if agent_execution_id is None:
+            return
+        insert = cls._insert(bind, AnalyticsRun).values(
+            org_id=event["org_id"], agent_id=event.get("agent_id"), agent_execution_id=int(agent_execution_id),
+            name=cls._property(event, "agent_execution_name"), started_at=event["created_at"], tokens=0, calls=0,
+            created_at=event["created_at"], updated_at=event["created_at"])
+        bind.execute(insert.on_conflict_do_update(
+            index_elements=["agent_execution_id"],
+            set_={"name": insert.excluded.name, "started_at": insert.excluded.started_at}))
+
+    @classmethod
+    def _apply_run_ended(cls, bind, event: dict):
+        ended_at = event["created_at"]
+        tokens = int(cls._property(event, "tokens_consumed") or 0)
+        calls = int(cls._property(event, "calls") or 0)
+        run_time = None
+
+        agent_execution_id = cls._property(event, "agent_execution_id")
+        if agent_execution_id is not None:
+            started_at = bind.execute(select(AnalyticsRun.started_at).where(
+                AnalyticsRun.agent_execution_id == int(agent_execution_id))).scalar()
+            if isinstance(started_at, datetime):
+                run_time = max((ended_at - started_at).total_seconds(), 0.0)
+            insert = cls._insert(bind, AnalyticsRun).values(
+                org_id=event["org_id"], agent_id=event.get("agent_id"), agent_execution_id=int(agent_execution_id),
+                name=cls._property(event, "name"), ended_at=ended_at, tokens=tokens, calls=calls,
+                created_at=ended_at, updated_at=ended_at)
+            bind.execute(insert.on_conflict_do_update(
+                index_elements=["agent_execution_id"],
+                set_={"ended_at": insert.excluded.ended_at, "tokens": insert.excluded.tokens,
+                      "calls": insert.excluded.calls, "updated_at": insert.excluded.updated_at}))
+
+        if event.get("agent_id") is None:
+            return
+        model = bind.execute(select(AnalyticsAgent.model).where(AnalyticsAgent.agent_id == event["agent_id"])).scalar()
+        insert = cls._insert(bind, AnalyticsDailyRollup).values(
+            org_id=event["org_id"], agent_id=event["agent_id"], model=model, day=ended_at.date(), runs=1,
+            tokens=tokens, calls=calls, run_time=run_time or 0.0, timed_runs=0 if run_time is None else 1,
+            created_at=ended_at, updated_at=ended_at)
+        bind.execute(insert.on_conflict_do_update(
+            index_elements=["org_id", "agent_id", "day"],
+            set_={"runs": AnalyticsDailyRollup.runs + insert.excluded.runs,
+                  "tokens": AnalyticsDailyRollup.tokens + insert.excluded.tokens,
+                  "calls": AnalyticsDailyRollup.calls + insert.excluded.calls,
+                  "run_time": AnalyticsDailyRollup.run_time + insert.excluded.run_time,
+                  "timed_runs": AnalyticsDailyRollup.timed_runs + insert.excluded.timed_runs,
+                  "model": insert.excluded.model, "updated_at": insert.excluded.updated_at}))
+
+    @classmethod
+    def _apply_tool_used(cls, bind, event: dict):
+        tool_name = cls._property(event, "tool_name")
+        if tool_name is None or event.get("agent_id") is None:
+            return
+        insert = cls._insert(bind, AnalyticsAgentTool).values(
+            org_id=event["org_id"], agent_id=event["agent_id"], tool_name=tool_name, calls=1,
+            created_at=event["created_at"], updated_at=event["created_at"])
+        bind.execute(insert.on_conflict_do_update(
+            index_elements=["org_id", "agent_id", "tool_name"],
+            set_={"calls": AnalyticsAgentTool.calls + insert.excluded.calls,
+                  "updated_at": insert.excluded.updated_at}))
@@ -3,6 +3,7 @@ from typing import Optional
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from sqlalchemy import func, distinct
+from superagi.apm.telemetry_writer import TelemetryWriter
 from superagi.models.call_logs import CallLogs
 from superagi.models.agent import Agent
 from superagi.models.tool import Tool
@@ -14,7 +15,14 @@ class CallLogHelper:
         self.session = session
         self.organisation_id = organisation_id
 
-    def create_call_log(self, agent_execution_name: str, agent_id: int, tokens_consumed: int, tool_used: str, model: str) -> Optional[CallLogs]:
+    def create_call_log(self, agent_execution_name: str, agent_id: int, tokens_consumed: int, tool_used: str, model: str,
+                        buffered: bool = False) -> Optional[CallLogs]:
+        if buffered and TelemetryWriter.enabled():
+            # stored in the background by the TelemetryWriter, off the agent step path
+            TelemetryWriter.add(CallLogs, {"agent_execution_name": agent_execution_name, "agent_id": agent_id,
+                                           "tokens_consumed": tokens_consumed, "tool_used": tool_used, "model": model,
+                                           "org_id": self.organisation_id})
+            return None
         try:
             call_log = CallLogs(
                 agent_execution_name=agent_execution_name,
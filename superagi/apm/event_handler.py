@@ -1,8 +1,11 @@
 import logging
+from datetime import datetime
 from typing import Optional, Dict
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from superagi.apm.analytics_rollup import AnalyticsRollup
+from superagi.apm.telemetry_writer import TelemetryWriter
 from superagi.models.events import Event
 
 class EventHandler:
@@ -11,18 +14,22 @@ class EventHandler:
         self.session = session
 
     def create_event(self, event_name: str, event_property: Dict, agent_id: int,
-                     org_id: int, event_value: int = 1) -> Optional[Event]:
+                     org_id: int, event_value: int = 1, buffered: bool = False) -> Optional[Event]:
+        agent_execution_id = (event_property or {}).get('agent_execution_id')
+        values = {"event_name": event_name, "event_value": event_value, "event_property": event_property,
+                  "agent_id": agent_id, "org_id": org_id,
+                  "agent_execution_id": int(agent_execution_id) if agent_execution_id is not None else None}
+        if buffered and TelemetryWriter.enabled():
+            # stored in the background by the TelemetryWriter, off the agent step path
+            TelemetryWriter.add(Event, values)
+            return None
         try:
-            event = Event(
-                event_name=event_name,
-                event_value=event_value,
-                event_property=event_property,
-                agent_id=agent_id,
-                org_id=org_id,
-            )
+            now = datetime.utcnow()
+            event = Event(created_at=now, updated_at=now, **values)
             self.session.add(event)
+            AnalyticsRollup.apply(self.session, [{**values, "created_at": now}])
             self.session.commit()
             return event
         except SQLAlchemyError as err:
             logging.error(f"Error while creating event: {str(err)}")
-            return None
\ No newline at end of file
+            return None
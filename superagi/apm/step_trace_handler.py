@@ -0,0 +1,79 @@
+from typing import Dict, List
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from superagi.models.agent import Agent
+from superagi.models.agent_execution import AgentExecution
+from superagi.models.agent_execution_step_trace import AgentExecutionStepTrace
+
+SUMMARY_FIELDS = ["total_ms", "queue_wait_ms", "db_ms", "llm_ms", "tool_ms", "embedding_ms"]
+
+
+class StepTraceHandler:
+    def __init__(self, session: Session, organisation_id: int):
+        self.session = session
+        self.organisation_id = organisation_id
+
+    def get_execution_traces(self, agent_execution_id: int) -> Dict:
+        """
+        Fetches the step traces of an agent execution along with the latency percentiles of each span.
+
+        Args:
+            agent_execution_id (int): The agent execution id.
+
+        Returns:
+            dict: The step traces and their summary.
+        """
+        agent_execution = AgentExecution.get_agent_execution_from_id(self.session, agent_execution_id)
+        if agent_execution is None:
+            raise HTTPException(status_code=404, detail="Agent execution not found")
+        organisation = Agent.find_org_by_agent_id(self.session, agent_execution.agent_id)
+        if organisation is None or organisation.id != self.organisation_id:
+            raise HTTPException(status_code=404, detail="Agent execution not found")
+
+        traces = AgentExecutionStepTrace.fetch_by_execution_id(self.session, agent_execution_id)
+        return {
+            "agent_execution_id": agent_execution_id,
+            "steps": [{
+                "step_type": trace.step_type,
+                "created_at": trace.created_at,
+                "queue_wait_ms": trace.queue_wait_ms,
+                "total_ms": trace.total_ms,
+                "db_ms": trace.db_ms,
+                "llm_ms": trace.llm_ms,
+                "tool_ms": trace.tool_ms,
+                "embedding_ms": trace.embedding_ms,
+                "tokens": trace.tokens,
+                "tokens_per_second": self._tokens_per_second(trace.tokens, trace.llm_ms),
+                "spans": trace.spans or {}
+            } for trace in traces],
+            "summary": self.summarize(traces)
+        }
+
+    @classmethod
+    def summarize(cls, traces: List[AgentExecutionStepTrace]) -> Dict:
+        summary = {"steps": len(traces), "tokens": sum(trace.tokens or 0 for trace in traces)}
+        for field in SUMMARY_FIELDS:
+            values = sorted(getattr(trace, field) for trace in traces if getattr(trace, field) is not None)
+            summary[field] = {
+                "total": round(sum(values), 3),
+                "p50": cls._percentile(values, 50),
+                "p95": cls._percentile(values, 95),
+                "max": values[-1] if values else None
+            }
+        summary["tokens_per_second"] = cls._tokens_per_second(summary["tokens"], summary["llm_ms"]["total"])
+        return summary
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], percentile: int):
+        if not sorted_values:
+            return None
+        index = min(len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1))))
+        return sorted_values[index]
+
+    @staticmethod
+    def _tokens_per_second(tokens, llm_ms):
+        if not tokens or not llm_ms:
+            return None
+        return round(tokens / (llm_ms / 1000), 2)
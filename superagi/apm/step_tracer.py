@@ -0,0 +1,189 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from superagi.config.config import get_config
+from superagi.lib.logger import logger
+from superagi.models.agent_execution_step_trace import AgentExecutionStepTrace
+
+# Spans stored in their own columns, every span is also kept in the spans column.
+DB_SPAN = "db"
+LLM_SPAN = "llm"
+TOOL_SPAN = "tool"
+EMBEDDING_SPAN = "embedding"
+
+_current_trace = contextvars.ContextVar("current_step_trace", default=None)
+
+
+class StepTrace:
+    """
+    Spans recorded while executing one agent step. Spans are inclusive, e.g. the embedding time of the
+    memory writes is part of the tool span as well.
+    """
+
+    def __init__(self, agent_execution_id: int, agent_id: int = None, queue_wait_ms: float = None):
+        self.agent_execution_id = agent_execution_id
+        self.agent_id = agent_id
+        self.step_type = None
+        self.queue_wait_ms = queue_wait_ms
+        self.tokens = 0
+        self.spans = {}
+        self.started_at = time.perf_counter()
+
+    def add(self, name: str, seconds: float):
+        span = self.spans.setdefault(name, {"ms": 0.0, "count": 0})
+        span["ms"] += seconds * 1000
+        span["count"] += 1
+
+    def span_ms(self, name: str) -> float:
+        return round(self.spans.get(name, {}).get("ms", 0.0), 3)
+
+    def to_model(self) -> AgentExecutionStepTrace:
+        return AgentExecutionStepTrace(agent_execution_id=self.agent_execution_id, agent_id=self.agent_id,
+                                       step_type=self.step_type, queue_wait_ms=self.queue_wait_ms,
+                                       total_ms=round((time.perf_counter() - self.started_at) * 1000, 3),
+                                       db_ms=self.span_ms(DB_SPAN), llm_ms=self.span_ms(LLM_SPAN),
+                                       tool_ms=self.span_ms(TOOL_SPAN), embedding_ms=self.span_ms(EMBEDDING_SPAN),
+                                       tokens=self.tokens,
+                                       spans={name: {"ms": round(span["ms"], 3), "count": span["count"]}
+                                              for name, span in self.spans.items()})
+
+
+class StepTracer:
+    """
+    Records the spans of the agent step running in the current context and persists them as an
+    AgentExecutionStepTrace. Outside of a traced step every call is a no-op. Disabled by setting
+    STEP_TRACING_ENABLED to False.
+    """
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return str(get_config("STEP_TRACING_ENABLED", True)).lower() not in ("false", "0")
+
+    @classmethod
+    def start(cls, agent_execution_id: int, agent_id: int = None, queue_wait_ms: float = None):
+        """
+        Starts the trace of an agent step in the current context.
+
+        Args:
+            agent_execution_id (int): The agent execution id.
+            agent_id (int): The agent id.
+            queue_wait_ms (float): Time the step waited in the queue.
+
+        Returns:
+            StepTrace: The trace, None when tracing is disabled.
+        """
+        if not cls.enabled():
+            return None
+        trace = StepTrace(agent_execution_id, agent_id, queue_wait_ms)
+        _current_trace.set(trace)
+        return trace
+
+    @classmethod
+    def current(cls):
+        return _current_trace.get()
+
+    @classmethod
+    def queue_wait_ms(cls, enqueued_at, eta=None):
+        """
+        Computes the time a task waited in the queue after it was due.
+
+        Args:
+            enqueued_at (datetime | str): Local time at which the task was enqueued.
+            eta (datetime | str): Time at which a delayed task was due, as set by celery.
+
+        Returns:
+            float: The wait in milliseconds or None if it can not be computed.
+        """
+        try:
+            due_at = cls._to_local_datetime(enqueued_at)
+            if eta is not None:
+                due_at = max(due_at, cls._to_local_datetime(eta))
+            return max(0.0, round((datetime.now() - due_at).total_seconds() * 1000, 3))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _to_local_datetime(value) -> datetime:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        return value
+
+    @classmethod
+    @contextmanager
+    def span(cls, name: str):
+        trace = _current_trace.get()
+        if trace is None:
+            yield
+            return
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            trace.add(name, time.perf_counter() - started_at)
+
+    @classmethod
+    def set_step(cls, agent_id: int, step_type: str):
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.agent_id = agent_id
+            trace.step_type = step_type
+
+    @classmethod
+    def add_tokens(cls, tokens: int):
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.tokens += tokens or 0
+
+    @classmethod
+    def finish(cls, session_maker):
+        """
+        Ends the trace of the current context and stores it. The trace is written through its own session,
+        so that the state left in the session of the step, e.g. by a failed step, is never committed.
+
+        Args:
+            session_maker: The factory of the database sessions.
+        """
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        _current_trace.set(None)
+        if trace.step_type is None:
+            # the step was skipped before any workflow step ran
+            return
+        session = session_maker()
+        try:
+            session.add(trace.to_model())
+            session.commit()
+        except Exception as e:
+            logger.error(f"Unable to store the trace of agent execution {trace.agent_execution_id}: {e}")
+            session.rollback()
+        finally:
+            session.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_db_span(conn, cursor, statement, parameters, context, executemany):
+    if _current_trace.get() is not None:
+        conn.info.setdefault("step_trace_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_db_span(conn, cursor, statement, parameters, context, executemany):
+    trace = _current_trace.get()
+    query_starts = conn.info.get("step_trace_query_start")
+    if trace is not None and query_starts:
+        trace.add(DB_SPAN, time.perf_counter() - query_starts.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_db_span(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("step_trace_query_start"):
+        connection.info["step_trace_query_start"].pop()
@@ -0,0 +1,228 @@
+import atexit
+import json
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError, SQLAlchemyError
+
+from superagi.apm.analytics_rollup import AnalyticsRollup
+from superagi.config.config import get_config
+from superagi.lib.logger import logger
+from superagi.models.call_logs import CallLogs
+from superagi.models.events import Event
+
+# Models whose rows can be buffered, by table name as used in the spool file.
+TELEMETRY_MODELS = {model.__tablename__: model for model in (Event, CallLogs)}
+# Errors after which the rows are kept to be stored again, other errors come from the rows themselves.
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, DisconnectionError)
+
+
+class TelemetryWriter:
+    """
+    Buffers the Event and CallLogs rows written while an agent step runs and stores them in the
+    background with one multi-row INSERT per table, updating the analytics rollups of the events in the
+    same transaction.
+
+    The buffer is flushed every TELEMETRY_FLUSH_INTERVAL seconds or as soon as it holds
+    TELEMETRY_BATCH_SIZE rows. Rows which can not be stored because the database is unavailable are kept
+    for the next flush and on shutdown they are appended to the TELEMETRY_SPOOL_PATH file, which is
+    replayed by the next flush. A batch rejected for any other reason is stored again row by row and
+    the rejected rows are dropped.
+    Disabled by setting TELEMETRY_BUFFER_ENABLED to False, rows are then written synchronously.
+    """
+
+    _lock = threading.Lock()
+    _rows = {table: [] for table in TELEMETRY_MODELS}
+    _flush_requested = threading.Event()
+    _stopped = threading.Event()
+    _flusher = None
+    _flusher_pid = None
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return str(get_config("TELEMETRY_BUFFER_ENABLED", True)).lower() not in ("false", "0")
+
+    @classmethod
+    def batch_size(cls) -> int:
+        return int(get_config("TELEMETRY_BATCH_SIZE", 100))
+
+    @classmethod
+    def max_buffer_size(cls) -> int:
+        return int(get_config("TELEMETRY_MAX_BUFFER_SIZE", 10000))
+
+    @classmethod
+    def spool_path(cls) -> str:
+        return get_config("TELEMETRY_SPOOL_PATH", "telemetry_spool.jsonl")
+
+    @classmethod
+    def add(cls, row_model, values: dict):
+        """
+        Buffers a row of an Event or CallLogs table.
+
+        Args:
+            row_model: The model class of the row.
+            values (dict): The column values of the row.
+        """
+        now = datetime.utcnow()
+        values = {"created_at": now, "updated_at": now, **values}
+        with cls._lock:
+            rows = cls._rows[row_model.__tablename__]
+            rows.append(values)
+            pending = sum(len(table_rows) for table_rows in cls._rows.values())
+        if pending >= cls.batch_size():
+            cls._flush_requested.set()
+        cls._ensure_flusher()
+
+    @classmethod
+    def pending(cls) -> int:
+        with cls._lock:
+            return sum(len(rows) for rows in cls._rows.values())
+
+    @classmethod
+    def flush(cls) -> bool:
+        """
+        Stores the buffered and spooled rows.
+
+        Returns:
+            bool: True if every row was stored.
+        """
+        with cls._lock:
+            batches = {table: rows for table, rows in cls._rows.items() if rows}
+            cls._rows = {table: [] for table in TELEMETRY_MODELS}
+        for table, rows in cls._read_spool().items():
+            batches[table] = rows + batches.get(table, [])
+        if not batches:
+            return True
+
+        stored = True
+        for table, rows in batches.items():
+            try:
+                cls._store(table, rows)
+            except TRANSIENT_ERRORS as err:
+                logger.error(f"Error while storing {len(rows)} {table} rows: {err}")
+                cls._requeue(table, rows)
+                stored = False
+            except SQLAlchemyError as err:
+                logger.warning(f"Error while storing {len(rows)} {table} rows, storing them one by one: {err}")
+                failed_rows = cls._store_each(table, rows)
+                if failed_rows:
+                    cls._requeue(table, failed_rows)
+                    stored = False
+        return stored
+
+    @classmethod
+    def _store(cls, table: str, rows: list):
+        from superagi.models.db import connect_db
+        with connect_db().begin() as connection:
+            connection.execute(insert(TELEMETRY_MODELS[table]).values(rows))
+            if table == Event.__tablename__:
+                AnalyticsRollup.apply(connection, rows)
+
+    @classmethod
+    def _store_each(cls, table: str, rows: list) -> list:
+        """
+        Stores rows one by one, dropping the rows the database rejects.
+
+        Returns:
+            list: The rows which could not be stored because the database is unavailable.
+        """
+        failed_rows = []
+        for row in rows:
+            try:
+                cls._store(table, [row])
+            except TRANSIENT_ERRORS as err:
+                logger.error(f"Error while storing {table} row: {err}")
+                failed_rows.append(row)
+            except SQLAlchemyError as err:
+                logger.error(f"Dropping {table} row rejected by the database: {row} {err}")
+        return failed_rows
+
+    @classmethod
+    def shutdown(cls):
+        """Stops the background flusher and stores the buffer, spooling it to disk if the database fails."""
+        cls._stopped.set()
+        cls._flush_requested.set()
+        if cls._flusher is not None and cls._flusher.is_alive():
+            cls._flusher.join(timeout=5)
+        cls._flusher = None
+        if not cls.flush():
+            cls._write_spool()
+        cls._stopped.clear()
+
+    @classmethod
+    def _requeue(cls, table: str, rows: list):
+        with cls._lock:
+            requeued = rows + cls._rows[table]
+            dropped = len(requeued) - cls.max_buffer_size()
+            if dropped > 0:
+                logger.warning(f"Telemetry buffer full, dropping {dropped} {table} rows")
+                requeued = requeued[dropped:]
+            cls._rows[table] = requeued
+
+    @classmethod
+    def _ensure_flusher(cls):
+        # the thread does not survive a fork, every worker process starts its own
+        if cls._flusher is not None and cls._flusher_pid == os.getpid() and cls._flusher.is_alive():
+            return
+        with cls._lock:
+            if cls._flusher is not None and cls._flusher_pid == os.getpid() and cls._flusher.is_alive():
+                return
+            cls._flusher = threading.Thread(target=cls._run, name="telemetry-writer", daemon=True)
+            cls._flusher_pid = os.getpid()
+            cls._flusher.start()
+
+    @classmethod
+    def _run(cls):
+        interval = float(get_config("TELEMETRY_FLUSH_INTERVAL", 5))
+        while not cls._stopped.is_set():
+            cls._flush_requested.wait(interval)
+            cls._flush_requested.clear()
+            if cls._stopped.is_set():
+                return
+            try:
+                cls.flush()
+            except Exception as err:
+                logger.error(f"Error while flushing telemetry: {err}")
+
+    @classmethod
+    def _write_spool(cls):
+        with cls._lock:
+            batches = cls._rows
+            cls._rows = {table: [] for table in TELEMETRY_MODELS}
+        try:
+            with open(cls.spool_path(), "a") as spool:
+                for table, rows in batches.items():
+                    for row in rows:
+                        spool.write(json.dumps({"table": table, "row": row}, default=datetime.isoformat) + "\n")
+        except OSError as err:
+            logger.error(f"Unable to spool telemetry rows: {err}")
+
+    @classmethod
+    def _read_spool(cls) -> dict:
+        path = cls.spool_path()
+        if not os.path.exists(path):
+            return {}
+        spool_batch = path + ".replay"
+        try:
+            # renamed first so that rows spooled meanwhile are kept for the next replay
+            os.replace(path, spool_batch)
+            with open(spool_batch) as spool:
+                entries = [json.loads(line) for line in spool if line.strip()]
+            os.remove(spool_batch)
+        except (OSError, ValueError) as err:
+            logger.error(f"Unable to replay telemetry spool {path}: {err}")
+            return {}
+
+        batches = {}
+        for entry in entries:
+            row = entry["row"]
+            for column in ("created_at", "updated_at"):
+                if row.get(column) is not None:
+                    row[column] = datetime.fromisoformat(row[column])
+            batches.setdefault(entry["table"], []).append(row)
+        return batches
+
+
+atexit.register(TelemetryWriter.shutdown)
@@ -1,23 +1,33 @@
 import asyncio
+import hashlib
+import json
 from datetime import datetime
 import time
 from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, BackgroundTasks, Header, Response
 from fastapi import HTTPException, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi_jwt_auth import AuthJWT
 from fastapi_sqlalchemy import db
 from pydantic import BaseModel
+from redis import asyncio as aioredis
 
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import asc
 
 from superagi.agent.task_queue import TaskQueue
+from superagi.config.config import get_config
 from superagi.helper.auth import check_auth
+from superagi.helper.feed_publisher import FeedPublisher, redis_url
 from superagi.helper.time_helper import get_time_difference
 from superagi.models.agent_execution_permission import AgentExecutionPermission
 from superagi.helper.feed_parser import parse_feed
 from superagi.models.agent_execution import AgentExecution
 from superagi.models.agent_execution_feed import AgentExecutionFeed
+from superagi.models.db import connect_db
 from superagi.lib.logger import logger
 from superagi.agent.types.agent_workflow_step_action_types import AgentWorkflowStepAction
 from superagi.models.workflows.agent_workflow_step import AgentWorkflowStep
@@ -148,46 +158,59 @@ def update_agent_execution_feed(agent_execution_feed_id: int,
     return db_agent_execution_feed
 
 
-@router.get("/get/execution/{agent_execution_id}")
-def get_agent_execution_feed(agent_execution_id: int,
-                                         Authorize: AuthJWT = Depends(check_auth)):
+TIME_AND_DATE_FEED = re.compile(r"The current time and date is\s(\w{3}\s\w{3}\s\s?\d{1,2}\s\d{2}:\d{2}:\d{2}\s\d{4})")
+
+
+def _feed_etag(session, agent_execution: AgentExecution, since_feed_id: Optional[int], limit: Optional[int]) -> str:
+    """Weak validator of the feed response, computed without loading the feeds."""
+    last_feed_id, feed_updated_at = session.query(func.max(AgentExecutionFeed.id),
+                                                  func.max(AgentExecutionFeed.updated_at)) \
+        .filter(AgentExecutionFeed.agent_execution_id == agent_execution.id).one()
+    permission_count, permission_updated_at = session.query(func.count(AgentExecutionPermission.id),
+                                                            func.max(AgentExecutionPermission.updated_at)) \
+        .filter(AgentExecutionPermission.agent_execution_id == agent_execution.id).one()
+    version = f"{agent_execution.id}:{agent_execution.status}:{agent_execution.last_shown_error_id}:{last_feed_id}:" \
+              f"{feed_updated_at}:" \
+              f"{permission_count}:{permission_updated_at}:{since_feed_id}:{limit}"
+    return f'W/"{hashlib.sha1(version.encode()).hexdigest()}"'
+
+
+def _build_execution_feed(session, agent_execution: AgentExecution, since_feed_id: Optional[int] = None,
+                          limit: Optional[int] = None) -> dict:
     """
-    Get agent execution feed with other execution details.
+    Builds the feed response of an agent execution, with the feeds after since_feed_id only.
 
     Args:
-        agent_execution_id (int): The ID of the agent execution.
+        session: The database session.
+        agent_execution (AgentExecution): The agent execution.
+        since_feed_id (int): Id of the last feed already known by the client.
+        limit (int): Maximum number of feeds returned.
 
     Returns:
-        dict: The agent execution status and feeds.
-
-    Raises:
-        HTTPException (Status Code=400): If the agent run is not found.
+        dict: The agent execution status, feeds, permissions, waiting period and error.
     """
+    query = session.query(AgentExecutionFeed).filter(AgentExecutionFeed.agent_execution_id == agent_execution.id)
+    if since_feed_id is not None:
+        query = query.filter(AgentExecutionFeed.id > since_feed_id)
+    query = query.order_by(asc(AgentExecutionFeed.id))
+    if limit is not None:
+        # one more row tells whether another page follows
+        query = query.limit(limit + 1)
+    feeds = query.all()
+    has_more = limit is not None and len(feeds) > limit
+    feeds = feeds[:limit] if has_more else feeds
+
+    final_feeds = [parse_feed(feed) for feed in feeds
+                   if feed.feed != "" and TIME_AND_DATE_FEED.search(feed.feed) is None]
 
-    agent_execution = db.session.query(AgentExecution).filter(AgentExecution.id == agent_execution_id).first()
-    if agent_execution is None:
-        raise HTTPException(status_code=400, detail="Agent Run not found!")
-    feeds = db.session.query(AgentExecutionFeed).filter_by(agent_execution_id=agent_execution_id).order_by(
-        asc(AgentExecutionFeed.created_at)).all()
-    # # parse json
-    final_feeds = []
     error = ""
-    for feed in feeds:
-        if feed.error_message:
-            if (agent_execution.last_shown_error_id is None) or (feed.id > agent_execution.last_shown_error_id):
-                #new error occured
-                error = feed.error_message
-                agent_execution.last_shown_error_id = feed.id
-                agent_execution.status = "ERROR_PAUSED"
-                db.session.commit()
-            if feed.id == agent_execution.last_shown_error_id and agent_execution.status == "ERROR_PAUSED":
-                error = feed.error_message
-        if feed.feed != "" and re.search(r"The current time and date is\s(\w{3}\s\w{3}\s\s?\d{1,2}\s\d{2}:\d{2}:\d{2}\s\d{4})",feed.feed) == None :
-            final_feeds.append(parse_feed(feed))
-
-    # get all permissions
-    execution_permissions = db.session.query(AgentExecutionPermission).\
-        filter_by(agent_execution_id=agent_execution_id). \
+    if agent_execution.status == "ERROR_PAUSED" and agent_execution.last_shown_error_id is not None:
+        error_feed = session.query(AgentExecutionFeed.error_message) \
+            .filter(AgentExecutionFeed.id == agent_execution.last_shown_error_id).first()
+        error = error_feed.error_message if error_feed is not None and error_feed.error_message else ""
+
+    execution_permissions = session.query(AgentExecutionPermission). \
+        filter_by(agent_execution_id=agent_execution.id). \
         order_by(asc(AgentExecutionPermission.created_at)).all()
 
     permissions = [
@@ -206,18 +229,114 @@ def get_agent_execution_feed(agent_execution_id: int,
     waiting_period = None
 
     if agent_execution.status == AgentWorkflowStepAction.WAIT_STEP.value:
-        workflow_step = AgentWorkflowStep.find_by_id(db.session, agent_execution.current_agent_step_id)
-        waiting_period = (AgentWorkflowStepWait.find_by_id(db.session, workflow_step.action_reference_id)).delay
+        workflow_step = AgentWorkflowStep.find_by_id(session, agent_execution.current_agent_step_id)
+        waiting_period = (AgentWorkflowStepWait.find_by_id(session, workflow_step.action_reference_id)).delay
 
     return {
         "status": agent_execution.status,
         "feeds": final_feeds,
         "permissions": permissions,
         "waiting_period": waiting_period,
-        "errors": error
+        "errors": error,
+        "last_feed_id": feeds[-1].id if feeds else since_feed_id,
+        "has_more": has_more
     }
 
 
+@router.get("/get/execution/{agent_execution_id}")
+def get_agent_execution_feed(agent_execution_id: int,
+                             since_feed_id: Optional[int] = None,
+                             limit: Optional[int] = None,
+                             if_none_match: Optional[str] = Header(None),
+                             Authorize: AuthJWT = Depends(check_auth)):
+    """
+    Get agent execution feed with other execution details. Clients polling the feed pass the
+    last_feed_id of the previous response as since_feed_id to only receive the new feeds, and the ETag
+    of the previous response as If-None-Match to get a 304 when nothing changed.
+
+    Args:
+        agent_execution_id (int): The ID of the agent execution.
+        since_feed_id (int): Only return the feeds created after this feed.
+        limit (int): Maximum number of feeds returned, all of them by default.
+
+    Returns:
+        dict: The agent execution status and feeds.
+
+    Raises:
+        HTTPException (Status Code=400): If the agent run is not found.
+    """
+
+    agent_execution = db.session.query(AgentExecution).filter(AgentExecution.id == agent_execution_id).first()
+    if agent_execution is None:
+        raise HTTPException(status_code=400, detail="Agent Run not found!")
+    if limit is not None:
+        limit = min(max(limit, 1), 1000)
+
+    etag = _feed_etag(db.session, agent_execution, since_feed_id, limit)
+    if isinstance(if_none_match, str) and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response = _build_execution_feed(db.session, agent_execution, since_feed_id, limit)
+    return JSONResponse(content=jsonable_encoder(response), headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+@router.get("/get/execution/{agent_execution_id}/stream")
+async def stream_agent_execution_feed(agent_execution_id: int,
+                                      since_feed_id: Optional[int] = None,
+                                      Authorize: AuthJWT = Depends(check_auth)):
+    """
+    Stream the feed of an agent execution as server-sent events. An event with the new feeds, in the
+    format of get/execution, is sent whenever the feed or the status of the execution changes.
+
+    Args:
+        agent_execution_id (int): The ID of the agent execution.
+        since_feed_id (int): Only stream the feeds created after this feed.
+
+    Returns:
+        StreamingResponse: The text/event-stream of feed updates.
+
+    Raises:
+        HTTPException (Status Code=400): If the agent run is not found.
+    """
+    if db.session.query(AgentExecution.id).filter(AgentExecution.id == agent_execution_id).first() is None:
+        raise HTTPException(status_code=400, detail="Agent Run not found!")
+
+    refresh_interval = float(get_config("FEED_STREAM_REFRESH_INTERVAL", 15))
+    Session = sessionmaker(bind=connect_db())
+
+    def next_update(last_feed_id, last_status):
+        with Session() as session:
+            agent_execution = session.query(AgentExecution).filter(AgentExecution.id == agent_execution_id).first()
+            if agent_execution is None:
+                return None
+            update = _build_execution_feed(session, agent_execution, last_feed_id)
+            if update["last_feed_id"] == last_feed_id and update["status"] == last_status:
+                return None
+            return jsonable_encoder(update)
+
+    async def events():
+        client = aioredis.Redis.from_url("redis://" + redis_url + "/0", decode_responses=True)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(FeedPublisher.channel(agent_execution_id))
+        last_feed_id, last_status = since_feed_id, None
+        try:
+            while True:
+                update = await asyncio.to_thread(next_update, last_feed_id, last_status)
+                if update is not None:
+                    last_feed_id, last_status = update["last_feed_id"], update["status"]
+                    yield f"id: {last_feed_id}\nevent: feed\ndata: {json.dumps(update)}\n\n"
+                else:
+                    yield ": keep-alive\n\n"
+                # woken by the next announcement, refreshed anyway in case one was missed
+                await pubsub.get_message(ignore_subscribe_messages=True, timeout=refresh_interval)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.close()
+            await client.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
 @router.get("/get/tasks/{agent_execution_id}")
 def get_execution_tasks(agent_execution_id: int,
                         Authorize: AuthJWT = Depends(check_auth)):
@@ -8,7 +8,7 @@ from pydantic import BaseModel
 
 from superagi.models.agent_execution import AgentExecution
 from superagi.models.agent_execution_permission import AgentExecutionPermission
-from superagi.worker import execute_agent
+import superagi.worker  # noqa: F401, registers the listener waking executions on answered permissions
 from fastapi import APIRouter
 
 from superagi.helper.auth import check_auth
@@ -151,8 +151,7 @@ def update_agent_execution_permission_status(agent_execution_permission_id: int,
         raise HTTPException(status_code=400, detail="Invalid Request status is required")
     agent_execution_permission.status = "APPROVED" if status else "REJECTED"
     agent_execution_permission.user_feedback = user_feedback.strip() if len(user_feedback.strip()) > 0 else None
+    # the execution is woken by the permission status listener once the change is committed
     db.session.commit()
 
-    execute_agent.delay(agent_execution_permission.agent_execution_id, datetime.now())
-
     return {"success": True}
@@ -4,6 +4,7 @@ from superagi.apm.analytics_helper import AnalyticsHelper
 from superagi.apm.event_handler import EventHandler
 from superagi.apm.tools_handler import ToolsHandler
 from superagi.apm.knowledge_handler import KnowledgeHandler
+from superagi.apm.step_trace_handler import StepTraceHandler
 from fastapi_jwt_auth import AuthJWT
 from fastapi_sqlalchemy import db
 import logging
@@ -53,6 +54,18 @@ def get_active_runs(organisation=Depends(get_user_organisation)):
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@router.get("/runs/{agent_execution_id}/traces", status_code=200)
+def get_run_traces(agent_execution_id: int, organisation=Depends(get_user_organisation)):
+    try:
+        return StepTraceHandler(session=db.session, organisation_id=organisation.id).get_execution_traces(agent_execution_id)
+    except Exception as e:
+        logging.error(f"Error while fetching run traces: {str(e)}")
+        if hasattr(e, 'status_code'):
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        else:
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
 @router.get("/tools/used", status_code=200)
 def get_tools_used(organisation=Depends(get_user_organisation)):
     try:
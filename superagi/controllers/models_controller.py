@@ -1,6 +1,7 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from superagi.helper.auth import check_auth, get_user_organisation
+from superagi.helper.model_registry import ModelRegistry
 from superagi.helper.models_helper import ModelsHelper
 from superagi.apm.call_log_helper import CallLogHelper
 from superagi.lib.logger import logger
@@ -37,7 +38,9 @@ class ModelName (BaseModel):
 @router.post("/store_api_keys", status_code=200)
 async def store_api_keys(request: ValidateAPIKeyRequest, organisation=Depends(get_user_organisation)):
     try:
-        return ModelsConfig.store_api_key(db.session, organisation.id, request.model_provider, request.model_api_key)
+        response = ModelsConfig.store_api_key(db.session, organisation.id, request.model_provider, request.model_api_key)
+        ModelRegistry.invalidate(organisation.id)
+        return response
     except Exception as e:
         logging.error(f"Error while storing API key: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -76,9 +79,11 @@ async def store_model(request: StoreModelRequest, organisation=Depends(get_user_
         #context_length = 4096
         logger.info(request)
         if 'context_length' in request.dict():
-            return Models.store_model_details(db.session, organisation.id, request.model_name, request.description, request.end_point, request.model_provider_id, request.token_limit, request.type, request.version, request.context_length)
+            response = Models.store_model_details(db.session, organisation.id, request.model_name, request.description, request.end_point, request.model_provider_id, request.token_limit, request.type, request.version, request.context_length)
         else:
-            return Models.store_model_details(db.session, organisation.id, request.model_name, request.description, request.end_point, request.model_provider_id, request.token_limit, request.type, request.version, 0)
+            response = Models.store_model_details(db.session, organisation.id, request.model_name, request.description, request.end_point, request.model_provider_id, request.token_limit, request.type, request.version, 0)
+        ModelRegistry.invalidate(organisation.id)
+        return response
     except Exception as e:
         logging.error(f"Error storing the Model Details: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
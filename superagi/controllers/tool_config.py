@@ -10,6 +10,7 @@ from superagi.models.tool_config import ToolConfig
 from superagi.models.toolkit import Toolkit
 from superagi.helper.encyption_helper import encrypt_data
 from superagi.helper.encyption_helper import decrypt_data, is_encrypted
+from superagi.helper.toolkit_config_cache import ToolkitConfigCache
 from superagi.types.key_type import ToolConfigKeyType
 import json
 
@@ -65,6 +66,7 @@ def update_tool_config(toolkit_name: str, configs: list, organisation: Organisat
                     # added encryption
                     tool_config.value = encrypt_data(value)
                     db.session.commit()
+        ToolkitConfigCache.invalidate(toolkit.id)
 
         return {"message": "Tool configs updated successfully"}
 
@@ -112,6 +114,7 @@ def create_or_update_tool_config(toolkit_name: str, tool_configs,
     
 
     db.session.commit()
+    ToolkitConfigCache.invalidate(toolkit.id)
     db.session.refresh(toolkit)
 
     return toolkit
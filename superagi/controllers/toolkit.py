@@ -16,6 +16,7 @@ from superagi.models.toolkit import Toolkit
 from superagi.types.common import GitHubLinkRequest
 from superagi.helper.tool_helper import compare_toolkit
 from superagi.helper.encyption_helper import decrypt_data, is_encrypted
+from superagi.helper.toolkit_config_cache import ToolkitConfigCache
 
 router = APIRouter()
 
@@ -158,7 +159,8 @@ def install_toolkit_from_marketplace(toolkit_name: str,
                            toolkit_id=db_toolkit.id)
     for config in toolkit['configs']:
         ToolConfig.add_or_update(session=db.session, toolkit_id=db_toolkit.id, key=config['key'], value=config['value'], key_type = config['key_type'], is_secret = config['is_secret'], is_required = config['is_required'])    
-    
+    ToolkitConfigCache.invalidate(db_toolkit.id)
+
     return {"message": "ToolKit installed successfully"}
 
 
@@ -365,3 +367,4 @@ def update_toolkit(toolkit_name: str, organisation: Organisation = Depends(get_u
 
     for tool_config_key in marketplace_toolkit["configs"]:
         ToolConfig.add_or_update(db.session, toolkit_id=update_toolkit.id, key=tool_config_key["key"], key_type = tool_config_key['key_type'], is_secret = tool_config_key['is_secret'], is_required = tool_config_key['is_required'])
+    ToolkitConfigCache.invalidate(update_toolkit.id)
@@ -12,6 +12,7 @@ from superagi.models.user import User
 from fastapi import APIRouter
 
 from superagi.helper.auth import check_auth, get_current_user
+from superagi.helper.model_registry import ModelRegistry
 from superagi.lib.logger import logger
 
 from superagi.models.models_config import ModelsConfig
@@ -85,6 +86,7 @@ def create_user(user: UserIn, Authorize: AuthJWT = Depends(check_auth)):
     
     # Adding local LLM configuration
     ModelsConfig.add_llm_config(db.session, organisation.id)
+    ModelRegistry.invalidate(organisation.id)
     
     return db_user
 
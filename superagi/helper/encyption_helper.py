@@ -53,11 +53,29 @@ def decrypt_data(encrypted_data):
     return decrypted_data.decode()
 
 
+def decrypt_if_encrypted(value):
+    """
+    Decrypts the given data if it was encrypted with the Fernet cipher suite, with a single
+    decryption instead of is_encrypted followed by decrypt_data.
+
+    Args:
+        value (str): The possibly encrypted data.
+
+    Returns:
+        str: The decrypted data, or the data as is when it is not encrypted.
+    """
+    try:
+        return cipher_suite.decrypt(value.encode()).decode()
+    except (InvalidToken, InvalidSignature):
+        return value
+    except (ValueError, TypeError, AttributeError):
+        return value
+
+
 def is_encrypted(value):
     #key = get_config("ENCRYPTION_KEY")
     try:
-        f = Fernet(key)
-        f.decrypt(value)
+        cipher_suite.decrypt(value)
         return True
     except (InvalidToken, InvalidSignature):
         return False
@@ -7,4 +7,8 @@ class ErrorHandler:
         execution = session.query(AgentExecution).filter(AgentExecution.id == agent_execution_id).first()
         agent_feed = AgentExecutionFeed(agent_execution_id=agent_execution_id, agent_id=agent_id, role="system", feed="", error_message=error_message, feed_group_id=execution.current_feed_group_id)
         session.add(agent_feed)
+        session.flush()
+        # pause the run on the error, the feed endpoint shows it without writing on reads
+        execution.last_shown_error_id = agent_feed.id
+        execution.status = "ERROR_PAUSED"
         session.commit()
\ No newline at end of file
@@ -0,0 +1,76 @@
+import redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from superagi.config.config import get_config
+from superagi.lib.logger import logger
+from superagi.models.agent_execution import AgentExecution
+
+redis_url = get_config('REDIS_URL') or "localhost:6379"
+
+
+class FeedPublisher:
+    """
+    Announces new agent execution feeds on a Redis pub/sub channel per agent execution, so that the feed
+    stream pushes them to the clients instead of clients polling the whole feed.
+
+    Executions whose feeds were inserted or whose status changed are collected on the session and
+    announced once the session commits, the message being the id of the agent execution.
+    """
+
+    CHANNEL_PREFIX = "agent_execution_feed:"
+
+    _redis = None
+
+    @classmethod
+    def _redis_client(cls):
+        if cls._redis is None:
+            cls._redis = redis.Redis.from_url("redis://" + redis_url + "/0", decode_responses=True)
+        return cls._redis
+
+    @classmethod
+    def channel(cls, agent_execution_id: int) -> str:
+        return cls.CHANNEL_PREFIX + str(agent_execution_id)
+
+    @classmethod
+    def announce_on_commit(cls, session, agent_execution_id: int):
+        """
+        Publishes the feed change of an agent execution once the session commits.
+
+        Args:
+            session: The session inserting the feed.
+            agent_execution_id (int): The agent execution id.
+        """
+        session.info.setdefault("feed_agent_execution_ids", set()).add(agent_execution_id)
+
+    @classmethod
+    def publish(cls, agent_execution_id: int):
+        """
+        Announces that the feed of an agent execution changed.
+
+        Args:
+            agent_execution_id (int): The agent execution id.
+        """
+        try:
+            cls._redis_client().publish(cls.channel(agent_execution_id), str(agent_execution_id))
+        except redis.RedisError as e:
+            # the stream falls back to its periodic refresh
+            logger.warning(f"Unable to publish feed of agent execution {agent_execution_id}: {e}")
+
+
+@event.listens_for(AgentExecution.status, "set")
+def announce_status_change(target, value, old_value, initiator):
+    session = object_session(target)
+    if value != old_value and session is not None and target.id is not None:
+        FeedPublisher.announce_on_commit(session, target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def publish_committed_feeds(session):
+    for agent_execution_id in session.info.pop("feed_agent_execution_ids", set()):
+        FeedPublisher.publish(agent_execution_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_feed_announcements(session):
+    session.info.pop("feed_agent_execution_ids", None)
@@ -1,7 +1,12 @@
 import base64
+import hashlib
 import re
+import threading
+import time
+from collections import OrderedDict
 
 import requests
+from requests.adapters import HTTPAdapter
 from superagi.lib.logger import logger
 from superagi.helper.resource_helper import ResourceHelper
 from superagi.models.agent import Agent
@@ -13,6 +18,23 @@ from datetime import timedelta, datetime
 import json
 
 class GithubHelper:
+    """
+    Client of the GitHub REST API used by the GitHub tools.
+
+    The requests of a process share pooled HTTP sessions. GET responses carrying an ETag are kept in
+    an in-process LRU cache of GITHUB_RESPONSE_CACHE_SIZE entries and revalidated with If-None-Match,
+    so that unchanged repository contents and pull requests are not downloaded again and do not count
+    against the rate limit. When GitHub reports the rate limit of an access token as exhausted, the
+    requests made with that token wait for its reset, for at most GITHUB_RATE_LIMIT_MAX_WAIT seconds,
+    and a rejected request is retried once.
+    """
+
+    _local = threading.local()
+    _lock = threading.Lock()
+    _responses = OrderedDict()
+    # reset time of the exhausted rate limits, keyed by the hash of the access token
+    _rate_limit_resets = {}
+
     def __init__(self, github_access_token, github_username):
         """
         Initializes the GithubHelper with the provided access token and username.
@@ -23,6 +45,95 @@ class GithubHelper:
         """
         self.github_access_token = github_access_token
         self.github_username = github_username
+        self._rate_limit_key = hashlib.sha256(str(github_access_token).encode()).hexdigest()
+
+    @classmethod
+    def _http_session(cls) -> requests.Session:
+        # requests sessions are not thread safe, each thread keeps its own connection pool
+        session = getattr(cls._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_maxsize=10))
+            cls._local.session = session
+        return session
+
+    def _wait_for_rate_limit(self):
+        wait = self._rate_limit_resets.get(self._rate_limit_key, 0) - time.time()
+        if wait > 0:
+            wait = min(wait, float(get_config("GITHUB_RATE_LIMIT_MAX_WAIT", 60)))
+            logger.warning(f"GitHub rate limit exhausted, waiting {wait:.0f} seconds")
+            time.sleep(wait)
+
+    def _update_rate_limit(self, response) -> bool:
+        """
+        Records the rate limit of the access token reported by a response.
+
+        Returns:
+            bool: True if the request was rejected because of the rate limit.
+        """
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        retry_after = response.headers.get("Retry-After")
+        if isinstance(retry_after, str) and response.status_code in (403, 429):
+            self._set_rate_limit_reset(time.time() + float(retry_after))
+            return True
+        if remaining == "0" and isinstance(reset, str):
+            self._set_rate_limit_reset(float(reset))
+            return response.status_code in (403, 429)
+        return False
+
+    def _set_rate_limit_reset(self, reset: float):
+        with self._lock:
+            now = time.time()
+            # forget the limits which are over
+            for key in [key for key, value in self._rate_limit_resets.items() if value <= now]:
+                del self._rate_limit_resets[key]
+            self._rate_limit_resets[self._rate_limit_key] = reset
+
+    @classmethod
+    def _cache_response(cls, key, response):
+        with cls._lock:
+            cls._responses[key] = response
+            cls._responses.move_to_end(key)
+            while len(cls._responses) > int(get_config("GITHUB_RESPONSE_CACHE_SIZE", 256)):
+                cls._responses.popitem(last=False)
+
+    def _request(self, method, url, headers=None, **kwargs):
+        """
+        Sends a request to the GitHub API through the shared session, revalidating cached GET responses
+        and backing off when the rate limit is exhausted.
+
+        Args:
+            method (str): The http method.
+            url (str): The url.
+            headers (dict): The request headers.
+
+        Returns:
+            requests.Response: The response, the cached one when GitHub reports it as not modified.
+        """
+        cache_key = None
+        cached = None
+        request_headers = headers
+        if method == "get":
+            # the token is part of the key since responses depend on the access rights
+            cache_key = (url, repr(kwargs.get("params")), repr(sorted((headers or {}).items(), key=str)))
+            cached = self._responses.get(cache_key)
+            if cached is not None:
+                request_headers = {**(headers or {}), "If-None-Match": cached.headers["ETag"]}
+
+        for attempt in range(2):
+            self._wait_for_rate_limit()
+            response = getattr(self._http_session(), method)(url, headers=request_headers, **kwargs)
+            if not self._update_rate_limit(response) or attempt == 1:
+                break
+
+        if cached is not None and response.status_code == 304:
+            self._cache_response(cache_key, cached)
+            return cached
+        if cache_key is not None and response.status_code == 200 \
+                and isinstance(response.headers.get("ETag"), str):
+            self._cache_response(cache_key, response)
+        return response
 
     def get_file_path(self, file_name, folder_path):
         """
@@ -58,7 +169,7 @@ class GithubHelper:
             "Authorization": f"Token {self.github_access_token}",
             "Accept": "application/vnd.github.v3+json"
         }
-        response = requests.get(url, headers=headers)
+        response = self._request("get", url, headers=headers)
         if response.status_code == 200:
             repository_data = response.json()
             return repository_data['private']
@@ -85,7 +196,7 @@ class GithubHelper:
         }
         file_path = self.get_file_path(file_name, folder_path)
         url = f'https://api.github.com/repos/{repository_owner}/{repository_name}/contents/{file_path}'
-        r = requests.get(url, headers=headers)
+        r = self._request("get", url, headers=headers)
         r.raise_for_status()
         data = r.json()
 
@@ -106,7 +217,7 @@ class GithubHelper:
             None
         """
         base_branch_url = f'https://api.github.com/repos/{repository_owner}/{repository_name}/branches/{base_branch}'
-        response = requests.get(base_branch_url, headers=headers)
+        response = self._request("get", base_branch_url, headers=headers)
         response_json = response.json()
         base_commit_sha = response_json['commit']['sha']
         head_branch_url = f'https://api.github.com/repos/{self.github_username}/{repository_name}/git/refs/heads/{head_branch}'
@@ -114,7 +225,7 @@ class GithubHelper:
             'sha': base_commit_sha,
             'force': True
         }
-        response = requests.patch(head_branch_url, json=data, headers=headers)
+        response = self._request("patch", head_branch_url, json=data, headers=headers)
         if response.status_code == 200:
             logger.info(
                 f'Successfully synced {self.github_username}:{head_branch} branch with {repository_owner}:{base_branch}')
@@ -135,7 +246,7 @@ class GithubHelper:
             int: Status code of the fork request.
         """
         fork_url = f'https://api.github.com/repos/{repository_owner}/{repository_name}/forks'
-        fork_response = requests.post(fork_url, headers=headers)
+        fork_response = self._request("post", fork_url, headers=headers)
         if fork_response.status_code == 202:
             logger.info('Fork created successfully.')
             self.sync_branch(repository_owner, repository_name, base_branch, base_branch, headers)
@@ -160,11 +271,11 @@ class GithubHelper:
         branch_url = f'https://api.github.com/repos/{self.github_username}/{repository_name}/git/refs'
         branch_params = {
             'ref': f'refs/heads/{head_branch}',
-            'sha': requests.get(
-                f'https://api.github.com/repos/{self.github_username}/{repository_name}/git/refs/heads/{base_branch}',
+            'sha': self._request(
+                "get", f'https://api.github.com/repos/{self.github_username}/{repository_name}/git/refs/heads/{base_branch}',
                 headers=headers).json()['object']['sha']
         }
-        branch_response = requests.post(branch_url, json=branch_params, headers=headers)
+        branch_response = self._request("post", branch_url, json=branch_params, headers=headers)
         if branch_response.status_code == 201:
             logger.info('Branch created successfully.')
         elif branch_response.status_code == 422:
@@ -196,7 +307,7 @@ class GithubHelper:
             'sha': self.get_sha(self.github_username, repository_name, file_name, folder_path),
             'branch': head_branch
         }
-        file_response = requests.delete(file_url, json=file_params, headers=headers)
+        file_response = self._request("delete", file_url, json=file_params, headers=headers)
         if file_response.status_code == 200:
             logger.info('File or folder delete successfully.')
         else:
@@ -230,7 +341,7 @@ class GithubHelper:
             'content': file_content,
             'branch': head_branch
         }
-        file_response = requests.put(file_url, json=file_params, headers=headers)
+        file_response = self._request("put", file_url, json=file_params, headers=headers)
         if file_response.status_code == 201:
             logger.info('File content uploaded successfully.')
         elif file_response.status_code == 422:
@@ -262,7 +373,7 @@ class GithubHelper:
             'head_repo': repository_name,  # required for cross repository only
             'base': base_branch
         }
-        pr_response = requests.post(pull_request_url, json=pull_request_params, headers=headers)
+        pr_response = self._request("post", pull_request_url, json=pull_request_params, headers=headers)
 
         if pr_response.status_code == 201:
             logger.info('Pull request created successfully.')
@@ -359,7 +470,7 @@ class GithubHelper:
             "Accept": "application/vnd.github.v3.diff",
         }
 
-        response = requests.get(pull_request_url, headers=headers)
+        response = self._request("get", pull_request_url, headers=headers)
 
         if response.status_code == 200:
             logger.info('Successfully fetched pull request content.')
@@ -386,7 +497,7 @@ class GithubHelper:
             "Authorization": f"token {self.github_access_token}" if self.github_access_token else None,
             "Content-Type": "application/json",
         }
-        response = requests.get(url, headers=headers)
+        response = self._request("get", url, headers=headers)
         if response.status_code == 200:
             commits = response.json()
             latest_commit = commits[-1]  # Assuming the last commit is the latest
@@ -424,7 +535,7 @@ class GithubHelper:
             "position": position,
             "body": comment_body
         }
-        response = requests.post(comments_url, headers=headers, json=data)
+        response = self._request("post", comments_url, headers=headers, json=data)
         if response.status_code == 201:
             logger.info('Successfully added line comment to pull request.')
             return response.json()
@@ -432,6 +543,43 @@ class GithubHelper:
             logger.warning(f'Failed to add line comment: {response.json()["message"]}')
             return None
 
+    def add_review_to_pull_request(self, repository_owner, repository_name, pull_request_number, commit_id,
+                                   comments, body=""):
+        """
+        Adds a review with line comments to a specific pull request from a GitHub repository, posting all
+        the comments in a single request.
+
+        :param repository_owner: owner
+        :param repository_name: repository name
+        :param pull_request_number: pull request id
+        :param commit_id: commit id
+        :param comments: list of comments with the path, position and body keys
+        :param body: review body
+
+        :return:
+        dict: Dictionary containing the review content or None if it could not be added.
+        """
+        reviews_url = f'https://api.github.com/repos/{repository_owner}/{repository_name}/pulls/{pull_request_number}/reviews'
+        headers = {
+            "Authorization": f"token {self.github_access_token}",
+            "Content-Type": "application/json",
+            "Accept": "application/vnd.github.v3+json"
+        }
+        data = {
+            "commit_id": commit_id,
+            "event": "COMMENT",
+            "comments": comments
+        }
+        if body:
+            data["body"] = body
+        response = self._request("post", reviews_url, headers=headers, json=data)
+        if response.status_code == 200:
+            logger.info('Successfully added review to pull request.')
+            return response.json()
+        else:
+            logger.warning(f'Failed to add review: {response.json()["message"]}')
+            return None
+
     def get_pull_requests_created_in_last_x_seconds(self, repository_owner, repository_name, x_seconds):
         """
         Gets the pull requests created in the last x seconds.
@@ -459,7 +607,7 @@ class GithubHelper:
             "Content-Type": "application/json",
         }
 
-        response = requests.get(url, headers=headers)
+        response = self._request("get", url, headers=headers)
 
         if response.status_code == 200:
             pull_request_urls = []
@@ -87,23 +87,9 @@ class GoogleSearchWrap:
             snippets, links, error_code = self.search_run(query)
 
         if links:
-            for i in range(0, self.num_extracts):
-                time.sleep(3)
-                content = ""
-                # content = self.extractor.extract_with_3k(links[i])
-                # attempts = 0
-                # while content == "" and attempts < 2:
-                #     attempts += 1
-                #     content = self.extractor.extract_with_3k(links[i])
-                content = self.extractor.extract_with_bs4(links[i])
+            for content in self.extractor.extract_all_with_bs4(links[:self.num_extracts], attempts=3):
                 max_length = len(' '.join(content.split(" ")[:500]))
-                content = content[:max_length]
-                attempts = 0
-                while content == "" and attempts < 2:
-                    attempts += 1
-                    content = self.extractor.extract_with_bs4(links[i])
-                    content = content[:max_length]
-                webpages.append(content)
+                webpages.append(content[:max_length])
         else:
             snippets = []
             links = []
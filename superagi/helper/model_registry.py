@@ -0,0 +1,168 @@
+import threading
+import time
+
+import redis
+from sqlalchemy.orm import sessionmaker
+
+from superagi.config.config import get_config
+from superagi.lib.logger import logger
+from superagi.models.models import Models
+from superagi.models.models_config import ModelsConfig
+
+redis_url = get_config('REDIS_URL') or "localhost:6379"
+
+
+class ModelRegistry:
+    """
+    In-process registry of the models of each organisation (token limit, provider, end point,
+    version and context length), loaded with a single query and shared by the token counter
+    and the llm factory.
+
+    An organisation entry is reloaded once it is older than MODEL_REGISTRY_TTL seconds or when
+    its version in Redis has been bumped by invalidate(), which every write of the models or their
+    api keys calls so that all api and worker processes pick up the change.
+    """
+
+    VERSION_KEY = "model_registry_version:{}"
+
+    _entries = {}
+    _lock = threading.Lock()
+    _redis = None
+    _invalidation_listeners = []
+
+    @classmethod
+    def ttl(cls) -> float:
+        return float(get_config("MODEL_REGISTRY_TTL", 300))
+
+    @classmethod
+    def _redis_client(cls):
+        if cls._redis is None:
+            cls._redis = redis.Redis.from_url("redis://" + redis_url + "/0", decode_responses=True)
+        return cls._redis
+
+    @classmethod
+    def _fetch_version(cls, organisation_id: int):
+        try:
+            return cls._redis_client().get(cls.VERSION_KEY.format(organisation_id))
+        except redis.RedisError as e:
+            logger.warning(f"Unable to fetch model registry version: {e}")
+            return None
+
+    @classmethod
+    def _load_models(cls, session, organisation_id: int) -> dict:
+        models = session.query(Models.model_name, Models.token_limit, Models.end_point, Models.version,
+                               Models.context_length, Models.model_provider_id, ModelsConfig.provider) \
+            .outerjoin(ModelsConfig, Models.model_provider_id == ModelsConfig.id) \
+            .filter(Models.org_id == organisation_id) \
+            .all()
+        return {model.model_name: {"model_name": model.model_name,
+                                   "token_limit": model.token_limit,
+                                   "end_point": model.end_point,
+                                   "version": model.version,
+                                   "context_length": model.context_length,
+                                   "model_provider_id": model.model_provider_id,
+                                   "provider": model.provider} for model in models}
+
+    @classmethod
+    def fetch_models(cls, session, organisation_id: int) -> dict:
+        """
+        Fetches the models of an organisation keyed by model name.
+
+        Args:
+            session: The database session, a new session is opened when None.
+            organisation_id (int): The organisation id.
+
+        Returns:
+            dict: The model details keyed by model name.
+        """
+        version = cls._fetch_version(organisation_id)
+        entry = cls._entries.get(organisation_id)
+        if entry is not None:
+            entry_version, loaded_at, models = entry
+            if entry_version == version and time.monotonic() - loaded_at < cls.ttl():
+                return models
+            if entry_version != version:
+                # invalidated by another process
+                cls._notify_invalidation(organisation_id)
+
+        try:
+            if session is None:
+                from superagi.models.db import connect_db
+                with sessionmaker(bind=connect_db())() as new_session:
+                    models = cls._load_models(new_session, organisation_id)
+            else:
+                models = cls._load_models(session, organisation_id)
+        except Exception as e:
+            logger.error(f"Unable to load the models of organisation {organisation_id}: {e}")
+            return {}
+        with cls._lock:
+            cls._entries[organisation_id] = (version, time.monotonic(), models)
+        return models
+
+    @classmethod
+    def fetch_model(cls, session, organisation_id: int, model_name: str):
+        """
+        Fetches the details of a model of an organisation.
+
+        Args:
+            session: The database session, a new session is opened when None.
+            organisation_id (int): The organisation id.
+            model_name (str): The model name.
+
+        Returns:
+            dict: The model details or None if the organisation has no such model.
+        """
+        return cls.fetch_models(session, organisation_id).get(model_name)
+
+    @classmethod
+    def fetch_model_tokens(cls, session, organisation_id: int) -> dict:
+        """
+        Fetches the token limit of every model of an organisation.
+
+        Args:
+            session: The database session, a new session is opened when None.
+            organisation_id (int): The organisation id.
+
+        Returns:
+            dict: The token limits keyed by model name.
+        """
+        return {model_name: model["token_limit"]
+                for model_name, model in cls.fetch_models(session, organisation_id).items()}
+
+    @classmethod
+    def add_invalidation_listener(cls, listener):
+        """
+        Registers a callable run with the organisation id, None for every organisation, whenever the
+        models of an organisation are invalidated in this or another process.
+
+        Args:
+            listener (callable): The listener.
+        """
+        cls._invalidation_listeners.append(listener)
+
+    @classmethod
+    def _notify_invalidation(cls, organisation_id):
+        for listener in cls._invalidation_listeners:
+            listener(organisation_id)
+
+    @classmethod
+    def invalidate(cls, organisation_id: int = None):
+        """
+        Drops the cached models of an organisation, or of every organisation, and bumps the
+        organisation version so that the other processes reload it as well.
+
+        Args:
+            organisation_id (int): The organisation id.
+        """
+        with cls._lock:
+            if organisation_id is None:
+                cls._entries.clear()
+            else:
+                cls._entries.pop(organisation_id, None)
+        cls._notify_invalidation(organisation_id)
+        if organisation_id is None:
+            return
+        try:
+            cls._redis_client().incr(cls.VERSION_KEY.format(organisation_id))
+        except redis.RedisError as e:
+            logger.warning(f"Unable to bump model registry version: {e}")
@@ -1,5 +1,7 @@
 from pathlib import Path
 
+from superagi.lib.logger import logger
+
 
 class PromptReader:
     @staticmethod
@@ -10,7 +12,7 @@ class PromptReader:
             file_content = f.read()
             f.close()
         except FileNotFoundError as e:
-            print(e.__str__())
+            logger.error(e.__str__())
             raise e
         return file_content
 
@@ -22,6 +24,6 @@ class PromptReader:
             file_content = f.read()
             f.close()
         except FileNotFoundError as e:
-            print(e.__str__())
+            logger.error(e.__str__())
             raise e
         return file_content
@@ -1,14 +1,28 @@
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
 from typing import List
 
 import tiktoken
 
 from superagi.types.common import BaseMessage
 from superagi.lib.logger import logger
-from superagi.models.models import Models
+from superagi.helper.model_registry import ModelRegistry
 from sqlalchemy.orm import Session
 
 
+MODEL_TOKENS_PER_MESSAGE = {"gpt-3.5-turbo-0301": 4, "gpt-4-0314": 3, "gpt-3.5-turbo": 4, "gpt-4": 3,
+                            "gpt-3.5-turbo-16k": 4, "gpt-4-32k": 3, "gpt-4-32k-0314": 3,
+                            "models/chat-bison-001": 4}
+DEFAULT_TOKENS_PER_MESSAGE = 4
+FEED_TOKEN_CACHE_SIZE = 100000
+
+
 class TokenCounter:
+    _encodings = {}
+    _feed_token_counts = OrderedDict()
+    _lock = threading.Lock()
 
     def __init__(self, session:Session=None, organisation_id: int=None):
         self.session = session
@@ -28,12 +42,40 @@ class TokenCounter:
             int: The token limit.
         """
         try:
-            model_token_limit_dict = (Models.fetch_model_tokens(self.session, self.organisation_id))
-            return model_token_limit_dict[model]
+            model_details = ModelRegistry.fetch_model(self.session, self.organisation_id, model)
+            if model_details is None:
+                raise KeyError(model)
+            return model_details["token_limit"]
         except KeyError:
             logger.warning("Warning: model not found. Using cl100k_base encoding.")
             return 8092
 
+    @classmethod
+    def get_encoding(cls, model: str = "gpt-3.5-turbo-0301"):
+        """
+        Function to return the tiktoken encoding of a model, encodings are built once per process.
+
+        Args:
+            model (str): The model or encoding name to return the encoding for.
+
+        Returns:
+            Encoding: The model encoding, cl100k_base if the model is unknown to tiktoken.
+        """
+        encoding = cls._encodings.get(model)
+        if encoding is not None:
+            return encoding
+        try:
+            if model in tiktoken.list_encoding_names():
+                encoding = tiktoken.get_encoding(model)
+            else:
+                encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            logger.warning("Warning: model not found. Using cl100k_base encoding.")
+            encoding = tiktoken.get_encoding("cl100k_base")
+        with cls._lock:
+            cls._encodings[model] = encoding
+        return encoding
+
     @staticmethod
     def count_message_tokens(messages: List[BaseMessage], model: str = "gpt-3.5-turbo-0301") -> int:
         """
@@ -49,27 +91,8 @@ class TokenCounter:
         Returns:
             int: The number of tokens in the messages.
         """
-        try:
-            default_tokens_per_message = 4
-            model_token_per_message_dict = {"gpt-3.5-turbo-0301": 4, "gpt-4-0314": 3, "gpt-3.5-turbo": 4, "gpt-4": 3,
-                                            "gpt-3.5-turbo-16k": 4, "gpt-4-32k": 3, "gpt-4-32k-0314": 3,
-                                            "models/chat-bison-001": 4}
-            encoding = tiktoken.encoding_for_model(model)
-        except KeyError:
-            logger.warning("Warning: model not found. Using cl100k_base encoding.")
-            encoding = tiktoken.get_encoding("cl100k_base")
-
-        if model in model_token_per_message_dict.keys():
-            tokens_per_message = model_token_per_message_dict[model]
-        else:
-            tokens_per_message = default_tokens_per_message
-
-        if tokens_per_message is None:
-            raise NotImplementedError(
-                f"num_tokens_from_messages() is not implemented for model {model}.\n"
-                " See https://github.com/openai/openai-python/blob/main/chatml.md for"
-                " information on how messages are converted to tokens."
-            )
+        encoding = TokenCounter.get_encoding(model)
+        tokens_per_message = MODEL_TOKENS_PER_MESSAGE.get(model, DEFAULT_TOKENS_PER_MESSAGE)
 
         num_tokens = 0
         for message in messages:
@@ -79,9 +102,72 @@ class TokenCounter:
             num_tokens += len(encoding.encode(message['content']))
 
         num_tokens += 3
-        print("tokens",num_tokens)
         return num_tokens
 
+    @staticmethod
+    def count_each_message_tokens(messages: List[BaseMessage], model: str = "gpt-3.5-turbo-0301") -> List[int]:
+        """
+        Function to count the tokens of every message of a list in one pass. Each count matches
+        count_message_tokens called with the message alone. Messages carrying a 'chat_id' are
+        memoized per process, so feeds are only tokenized once.
+
+        Args:
+            messages (List[BaseMessage]): The list of messages to count the tokens for.
+            model (str): The model to count the tokens for.
+
+        Returns:
+            List[int]: The number of tokens of each message.
+        """
+        encoding = TokenCounter.get_encoding(model)
+        tokens_per_message = MODEL_TOKENS_PER_MESSAGE.get(model, DEFAULT_TOKENS_PER_MESSAGE)
+        feed_token_counts = TokenCounter._feed_token_counts
+
+        counts = []
+        for message in messages:
+            if isinstance(message, str):
+                message = {'content': message}
+            key = (model, message['chat_id']) if message.get('chat_id') is not None else None
+            count = feed_token_counts.get(key) if key is not None else None
+            if count is None:
+                count = tokens_per_message + len(encoding.encode(message['content'])) + 3
+                if key is not None:
+                    with TokenCounter._lock:
+                        feed_token_counts[key] = count
+                        if len(feed_token_counts) > FEED_TOKEN_CACHE_SIZE:
+                            feed_token_counts.popitem(last=False)
+            counts.append(count)
+        return counts
+
+    @staticmethod
+    def find_history_split_index(token_counts: List[int], token_limit: int) -> int:
+        """
+        Function to find the index splitting a history into the messages which do not fit in the token
+        limit and the most recent messages which do, using a prefix sum over the counts.
+
+        Args:
+            token_counts (List[int]): The token count of each history message, oldest first.
+            token_limit (int): The token budget of the recent messages.
+
+        Returns:
+            int: The index of the first message which fits, 0 if the whole history fits.
+        """
+        suffix_sums = list(accumulate(reversed(token_counts)))
+        fitting_messages = bisect_right(suffix_sums, token_limit)
+        return len(token_counts) - fitting_messages
+
+    @staticmethod
+    def count_content_tokens(content: str) -> int:
+        """
+        Function to count the tokens of a message content without any per message overhead.
+
+        Args:
+            content (str): The content to count the tokens for.
+
+        Returns:
+            int: The number of tokens in the content.
+        """
+        return len(TokenCounter.get_encoding("cl100k_base").encode(content))
+
     @staticmethod
     def count_text_tokens(message: str) -> int:
         """
@@ -93,6 +179,6 @@ class TokenCounter:
         Returns:
             int: The number of tokens in the text.
         """
-        encoding = tiktoken.get_encoding("cl100k_base")
+        encoding = TokenCounter.get_encoding("cl100k_base")
         num_tokens = len(encoding.encode(message)) + 4
         return num_tokens
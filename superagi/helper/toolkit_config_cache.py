@@ -0,0 +1,94 @@
+import threading
+import time
+
+import redis
+
+from superagi.config.config import get_config
+from superagi.helper.encyption_helper import decrypt_if_encrypted
+from superagi.lib.logger import logger
+from superagi.models.tool_config import ToolConfig
+
+redis_url = get_config('REDIS_URL') or "localhost:6379"
+
+
+class ToolkitConfigCache:
+    """
+    In-process cache of the decrypted configuration of each toolkit, loaded with a single query
+    and shared by the tools of the toolkit.
+
+    A toolkit entry is reloaded once it is older than TOOLKIT_CONFIG_CACHE_TTL seconds or when its
+    version in Redis has been bumped by invalidate(), which the tool config and toolkit controllers
+    call on every write so that all api and worker processes pick up the change.
+    """
+
+    VERSION_KEY = "toolkit_config_version:{}"
+
+    _entries = {}
+    _lock = threading.Lock()
+    _redis = None
+
+    @classmethod
+    def ttl(cls) -> float:
+        return float(get_config("TOOLKIT_CONFIG_CACHE_TTL", 60))
+
+    @classmethod
+    def _redis_client(cls):
+        if cls._redis is None:
+            cls._redis = redis.Redis.from_url("redis://" + redis_url + "/0", decode_responses=True)
+        return cls._redis
+
+    @classmethod
+    def _fetch_version(cls, toolkit_id: int):
+        try:
+            return cls._redis_client().get(cls.VERSION_KEY.format(toolkit_id))
+        except redis.RedisError as e:
+            logger.warning(f"Unable to fetch toolkit config version: {e}")
+            return None
+
+    @classmethod
+    def _load_configs(cls, session, toolkit_id: int) -> dict:
+        configs = session.query(ToolConfig.key, ToolConfig.value).filter(ToolConfig.toolkit_id == toolkit_id).all()
+        return {config.key: decrypt_if_encrypted(config.value) for config in configs if config.value}
+
+    @classmethod
+    def fetch_configs(cls, session, toolkit_id: int) -> dict:
+        """
+        Fetches the decrypted configuration of a toolkit.
+
+        Args:
+            session: The database session.
+            toolkit_id (int): The toolkit id.
+
+        Returns:
+            dict: The configuration values keyed by config key, keys without a value are left out.
+        """
+        version = cls._fetch_version(toolkit_id)
+        entry = cls._entries.get(toolkit_id)
+        if entry is not None:
+            entry_version, loaded_at, configs = entry
+            if entry_version == version and time.monotonic() - loaded_at < cls.ttl():
+                return configs
+
+        configs = cls._load_configs(session, toolkit_id)
+        with cls._lock:
+            cls._entries[toolkit_id] = (version, time.monotonic(), configs)
+        return configs
+
+    @classmethod
+    def invalidate(cls, toolkit_id: int = None):
+        """
+        Drops the cached configuration of a toolkit, or of every toolkit, and bumps the toolkit
+        version so that the other processes reload it as well.
+
+        Args:
+            toolkit_id (int): The toolkit id.
+        """
+        with cls._lock:
+            if toolkit_id is None:
+                cls._entries.clear()
+                return
+            cls._entries.pop(toolkit_id, None)
+        try:
+            cls._redis_client().incr(cls.VERSION_KEY.format(toolkit_id))
+        except redis.RedisError as e:
+            logger.warning(f"Unable to bump toolkit config version: {e}")
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from urllib.parse import urlparse
+
+import redis
+import requests
+from requests.adapters import HTTPAdapter
+
+from superagi.config.config import get_config
+from superagi.lib.logger import logger
+
+redis_url = get_config('REDIS_URL') or "localhost:6379"
+
+
+class FetchResult:
+    """
+    Response of a web page fetch.
+
+    Attributes:
+        url (str): The fetched url.
+        status_code (int): The http status code, None if the request failed.
+        text (str): The body of the response.
+        etag (str): The ETag validator of the response.
+        last_modified (str): The Last-Modified validator of the response.
+    """
+
+    def __init__(self, url: str, status_code: Optional[int], text: str = "", etag: str = None,
+                 last_modified: str = None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class WebFetcher:
+    """
+    Fetches web pages for the search and scraper tools with pooled connections and a bounded thread
+    pool, caching the successful responses in Redis.
+
+    Requests to the same host are spaced by WEB_FETCH_HOST_INTERVAL seconds while different hosts are
+    fetched concurrently by up to WEB_FETCH_MAX_WORKERS threads. Cached responses are served for
+    WEB_FETCH_CACHE_TTL seconds, then revalidated with a conditional request when the response had an
+    ETag or Last-Modified validator.
+    """
+
+    CACHE_KEY = "web_fetch:{}"
+    # stale responses are kept this long for conditional requests
+    CACHE_RETENTION = 24 * 60 * 60
+    MAX_CACHED_LENGTH = 1024 * 1024
+
+    _redis = None
+    _local = threading.local()
+    _lock = threading.Lock()
+    _executor = None
+    _executor_pid = None
+    _host_next_fetch = {}
+
+    @classmethod
+    def max_workers(cls) -> int:
+        return int(get_config("WEB_FETCH_MAX_WORKERS", 4))
+
+    @classmethod
+    def host_interval(cls) -> float:
+        return float(get_config("WEB_FETCH_HOST_INTERVAL", 1))
+
+    @classmethod
+    def cache_ttl(cls) -> int:
+        return int(get_config("WEB_FETCH_CACHE_TTL", 3600))
+
+    @classmethod
+    def _redis_client(cls):
+        if cls._redis is None:
+            cls._redis = redis.Redis.from_url("redis://" + redis_url + "/0", decode_responses=True)
+        return cls._redis
+
+    @classmethod
+    def _http_session(cls) -> requests.Session:
+        # requests sessions are not thread safe, each fetching thread keeps its own connection pool
+        session = getattr(cls._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_maxsize=cls.max_workers()))
+            session.mount("https://", HTTPAdapter(pool_maxsize=cls.max_workers()))
+            cls._local.session = session
+        return session
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        # the pool threads do not survive the fork of the celery worker processes
+        if cls._executor is None or cls._executor_pid != os.getpid():
+            with cls._lock:
+                if cls._executor is None or cls._executor_pid != os.getpid():
+                    cls._executor = ThreadPoolExecutor(max_workers=cls.max_workers(),
+                                                       thread_name_prefix="web-fetcher")
+                    cls._executor_pid = os.getpid()
+        return cls._executor
+
+    @classmethod
+    def _wait_for_host(cls, url: str):
+        host = urlparse(url).netloc
+        with cls._lock:
+            now = time.monotonic()
+            start = max(now, cls._host_next_fetch.get(host, now))
+            cls._host_next_fetch[host] = start + cls.host_interval()
+            if len(cls._host_next_fetch) > 1000:
+                cls._host_next_fetch = {key: value for key, value in cls._host_next_fetch.items() if value > now}
+        if start > now:
+            time.sleep(start - now)
+
+    @classmethod
+    def _read_cache(cls, url: str) -> Optional[dict]:
+        if cls.cache_ttl() <= 0:
+            return None
+        try:
+            cached = cls._redis_client().get(cls.CACHE_KEY.format(hashlib.sha256(url.encode()).hexdigest()))
+            return json.loads(cached) if cached else None
+        except (redis.RedisError, ValueError) as e:
+            logger.warning(f"Unable to read cached response of {url}: {e}")
+            return None
+
+    @classmethod
+    def _write_cache(cls, result: FetchResult):
+        if cls.cache_ttl() <= 0 or len(result.text) > cls.MAX_CACHED_LENGTH:
+            return
+        entry = {"text": result.text, "etag": result.etag, "last_modified": result.last_modified,
+                 "fetched_at": time.time()}
+        try:
+            cls._redis_client().set(cls.CACHE_KEY.format(hashlib.sha256(result.url.encode()).hexdigest()),
+                                    json.dumps(entry), ex=max(cls.cache_ttl(), cls.CACHE_RETENTION))
+        except redis.RedisError as e:
+            logger.warning(f"Unable to cache response of {result.url}: {e}")
+
+    @classmethod
+    def fetch(cls, url: str, headers: dict = None, timeout: int = 10, attempts: int = 1) -> FetchResult:
+        """
+        Fetches a web page, from the cache when it holds a fresh response.
+
+        Args:
+            url (str): The url to fetch.
+            headers (dict): The request headers.
+            timeout (int): The request timeout in seconds.
+            attempts (int): The number of attempts when the request fails.
+
+        Returns:
+            FetchResult: The response, with a None status code if every attempt failed.
+        """
+        cached = cls._read_cache(url)
+        if cached is not None and time.time() - cached.get("fetched_at", 0) < cls.cache_ttl():
+            return FetchResult(url, 200, cached["text"], cached.get("etag"), cached.get("last_modified"))
+
+        headers = dict(headers or {})
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(attempts):
+            cls._wait_for_host(url)
+            try:
+                response = cls._http_session().get(url, headers=headers, timeout=timeout)
+            except requests.RequestException as e:
+                logger.error(f"Error while fetching {url} (attempt {attempt + 1}): {e}")
+                continue
+            if response.status_code == 304 and cached is not None:
+                result = FetchResult(url, 200, cached["text"], response.headers.get("ETag", cached.get("etag")),
+                                     response.headers.get("Last-Modified", cached.get("last_modified")))
+                cls._write_cache(result)
+                return result
+            result = FetchResult(url, response.status_code, response.text, response.headers.get("ETag"),
+                                 response.headers.get("Last-Modified"))
+            if response.status_code == 200:
+                cls._write_cache(result)
+            return result
+        return FetchResult(url, None)
+
+    @classmethod
+    def fetch_all(cls, urls: List[str], headers: dict = None, timeout: int = 10, attempts: int = 1) -> List[FetchResult]:
+        """
+        Fetches web pages concurrently.
+
+        Args:
+            urls (List[str]): The urls to fetch.
+            headers (dict): The request headers.
+            timeout (int): The request timeout in seconds.
+            attempts (int): The number of attempts when a request fails.
+
+        Returns:
+            List[FetchResult]: The responses, in the order of the urls.
+        """
+        executor = cls._get_executor()
+        futures = [executor.submit(cls.fetch, url, headers, timeout, attempts) for url in urls]
+        return [future.result() for future in futures]
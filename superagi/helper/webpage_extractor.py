@@ -10,6 +10,7 @@ from requests_html import HTMLSession
 import time
 import random
 from lxml import html
+from superagi.helper.web_fetcher import WebFetcher, FetchResult
 from superagi.lib.logger import logger
 
 USER_AGENTS = [
@@ -93,12 +94,24 @@ class WebpageExtractor:
         Returns:
             str: The extracted text.
         """
-        headers = {
-            "User-Agent": random.choice(USER_AGENTS)
-        }
+        return self._parse_with_bs4(WebFetcher.fetch(url, headers={"User-Agent": random.choice(USER_AGENTS)}))
 
+    def extract_all_with_bs4(self, urls, attempts=1):
+        """
+        Extract the text from webpages using the BeautifulSoup4 method, fetching them concurrently.
+
+        Args:
+            urls (list): The URLs of the webpages to extract from.
+            attempts (int): The number of attempts to fetch each webpage.
+
+        Returns:
+            list: The extracted texts, in the order of the URLs.
+        """
+        results = WebFetcher.fetch_all(urls, headers={"User-Agent": random.choice(USER_AGENTS)}, attempts=attempts)
+        return [self._parse_with_bs4(result) for result in results]
+
+    def _parse_with_bs4(self, response: FetchResult):
         try:
-            response = requests.get(url, headers=headers, timeout=10)
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
                 for tag in soup(['script', 'style', 'nav', 'footer', 'head', 'link', 'meta', 'noscript']):
@@ -117,6 +130,8 @@ class WebpageExtractor:
                 return content
             elif response.status_code == 404:
                 return f"Error: 404. Url is invalid or does not exist. Try with valid url..."
+            elif response.status_code is None:
+                return ""
             else:
                 logger.error(f"Error while extracting text from HTML (bs4): {response.status_code}")
                 return f"Error while extracting text from HTML (bs4): {response.status_code}"
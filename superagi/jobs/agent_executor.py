@@ -3,20 +3,21 @@ from datetime import datetime, timedelta
 from sqlalchemy.orm import sessionmaker
 from superagi.llms.local_llm import LocalLLM
 
-import superagi.worker
 from superagi.agent.agent_iteration_step_handler import AgentIterationStepHandler
 from superagi.agent.agent_tool_step_handler import AgentToolStepHandler
 from superagi.agent.agent_workflow_step_wait_handler import AgentWaitStepHandler
+from superagi.agent.task_queue import TaskQueue
 from superagi.agent.types.wait_step_status import AgentWorkflowStepWaitStatus
 from superagi.apm.event_handler import EventHandler
+from superagi.apm.step_tracer import StepTracer
+from superagi.jobs.execution_context import ExecutionContextCache
+from superagi.jobs.step_scheduler import StepScheduler
 from superagi.config.config import get_config
-from superagi.lib.logger import logger
+from superagi.lib.logger import logger, log_context
 from superagi.llms.google_palm import GooglePalm
 from superagi.llms.hugging_face import HuggingFace
-from superagi.llms.llm_model_factory import get_model
 from superagi.llms.replicate import Replicate
 from superagi.models.agent import Agent
-from superagi.models.agent_config import AgentConfiguration
 from superagi.models.agent_execution import AgentExecution
 from superagi.models.db import connect_db
 from superagi.models.workflows.agent_workflow_step import AgentWorkflowStep
@@ -36,11 +37,13 @@ Session = sessionmaker(bind=engine)
 
 class AgentExecutor:
 
-    def execute_next_step(self, agent_execution_id):
-        global engine
-        # try:
-        engine.dispose()
+    def execute_next_step(self, agent_execution_id, queue_wait_ms=None):
+        with log_context(agent_execution_id=agent_execution_id):
+            self.__execute_next_step(agent_execution_id, queue_wait_ms)
+
+    def __execute_next_step(self, agent_execution_id, queue_wait_ms=None):
         session = Session()
+        StepTracer.start(agent_execution_id, queue_wait_ms=queue_wait_ms)
         try:
             agent_execution = session.query(AgentExecution).filter(AgentExecution.id == agent_execution_id).first()
             '''Avoiding running old agent executions'''
@@ -49,83 +52,83 @@ class AgentExecutor:
                 return
 
             agent = session.query(Agent).filter(Agent.id == agent_execution.agent_id).first()
-            agent_config = Agent.fetch_configuration(session, agent.id)
             if agent.is_deleted or (
                     agent_execution.status != AgentExecutionStatus.RUNNING.value and agent_execution.status != AgentExecutionStatus.WAITING_FOR_PERMISSION.value):
                 logger.error(f"Agent execution stopped. {agent.id}: {agent_execution.status}")
-                return
-
-            organisation = Agent.find_org_by_agent_id(session, agent_id=agent.id)
-            if self._check_for_max_iterations(session, organisation.id, agent_config, agent_execution_id):
-                logger.error(f"Agent execution stopped. Max iteration exceeded. {agent.id}: {agent_execution.status}")
+                ExecutionContextCache.invalidate(agent_execution_id=agent_execution_id)
+                TaskQueue(str(agent_execution_id)).expire()
                 return
 
             try:
-                model_config = AgentConfiguration.get_model_api_key(session, agent_execution.agent_id,
-                                                                    agent_config["model"])
-                model_api_key = model_config['api_key']
-                model_llm_source = model_config['provider']
+                context = ExecutionContextCache.get_or_build(session, agent.id, agent_execution_id,
+                                                             build_memory=AgentExecutor.build_memory)
             except Exception as e:
                 logger.info(f"Unable to get model config...{e}")
                 return
 
-            try:
-                memory = None
-                if "OpenAI" in model_llm_source:
-                    vector_store_type = VectorStoreType.get_vector_store_type(get_config("LTM_DB", "Redis"))
-                    memory = VectorFactory.get_vector_storage(vector_store_type, "super-agent-index1",
-                                                              AgentExecutor.get_embedding(model_llm_source,
-                                                                                          model_api_key))
-            except Exception as e:
-                logger.info(f"Unable to setup the connection...{e}")
-                memory = None
+            if self._check_for_max_iterations(session, context.organisation_id, context.agent_config,
+                                              agent_execution_id):
+                logger.error(f"Agent execution stopped. Max iteration exceeded. {agent.id}: {agent_execution.status}")
+                ExecutionContextCache.invalidate(agent_execution_id=agent_execution_id)
+                TaskQueue(str(agent_execution_id)).expire()
+                return
 
             agent_workflow_step = session.query(AgentWorkflowStep).filter(
                 AgentWorkflowStep.id == agent_execution.current_agent_step_id).first()
+            StepTracer.set_step(agent.id, agent_workflow_step.action_type)
             try:
-                self.__execute_workflow_step(agent, agent_config, agent_execution_id, agent_workflow_step, memory,
-                                             model_api_key, organisation, session)
+                with log_context(agent_workflow_step_id=agent_workflow_step.id):
+                    self.__execute_workflow_step(agent, context, agent_workflow_step, session)
 
             except Exception as e:
                 logger.info("Exception in executing the step: {}".format(e))
-                superagi.worker.execute_agent.apply_async((agent_execution_id, datetime.now()), countdown=15)
+                ExecutionContextCache.invalidate(agent_execution_id=agent_execution_id)
+                StepScheduler.schedule_retry(agent_execution_id)
                 return
 
             agent_execution = session.query(AgentExecution).filter(AgentExecution.id == agent_execution_id).first()
-            if agent_execution.status == "COMPLETED" or agent_execution.status == "WAITING_FOR_PERMISSION":
-                logger.info("Agent Execution is completed or waiting for permission")
-                session.close()
+            if agent_execution.status in (AgentExecutionStatus.COMPLETED.value,
+                                          AgentExecutionStatus.WAITING_FOR_PERMISSION.value,
+                                          AgentExecutionStatus.WAIT_STEP.value):
+                # permission and wait steps are resumed by StepScheduler once they are over
+                logger.info(f"Agent Execution is {agent_execution.status}")
+                if agent_execution.status == AgentExecutionStatus.COMPLETED.value:
+                    ExecutionContextCache.invalidate(agent_execution_id=agent_execution_id)
+                    TaskQueue(str(agent_execution_id)).expire()
                 return
-            superagi.worker.execute_agent.apply_async((agent_execution_id, datetime.now()), countdown=2)
-            # superagi.worker.execute_agent.delay(agent_execution_id, datetime.now())
+            StepScheduler.schedule_next_step(agent_execution_id)
         finally:
+            # the step session is closed without committing, the trace is stored through its own session
             session.close()
-            engine.dispose()
+            StepTracer.finish(Session)
 
-    def __execute_workflow_step(self, agent, agent_config, agent_execution_id, agent_workflow_step, memory,
-                                model_api_key, organisation, session):
+    def __execute_workflow_step(self, agent, context, agent_workflow_step, session):
         logger.info("Executing Workflow step : ", agent_workflow_step.action_type)
         if agent_workflow_step.action_type == AgentWorkflowStepAction.TOOL.value:
-            tool_step_handler = AgentToolStepHandler(session,
-                                                     llm=get_model(model=agent_config["model"], api_key=model_api_key,
-                                                                   organisation_id=organisation.id)
-                                                     , agent_id=agent.id, agent_execution_id=agent_execution_id,
-                                                     memory=memory)
+            tool_step_handler = AgentToolStepHandler(session, llm=context.llm, agent_id=agent.id,
+                                                     agent_execution_id=context.agent_execution_id,
+                                                     memory=context.memory, runtime_config=context.runtime_config)
             tool_step_handler.execute_step()
         elif agent_workflow_step.action_type == AgentWorkflowStepAction.ITERATION_WORKFLOW.value:
-            iteration_step_handler = AgentIterationStepHandler(session,
-                                                               llm=get_model(model=agent_config["model"],
-                                                                             api_key=model_api_key,
-                                                                             organisation_id=organisation.id)
-                                                               , agent_id=agent.id,
-                                                               agent_execution_id=agent_execution_id, memory=memory)
-            print(get_model(model=agent_config["model"], api_key=model_api_key, organisation_id=organisation.id))
+            iteration_step_handler = AgentIterationStepHandler(session, llm=context.llm, agent_id=agent.id,
+                                                               agent_execution_id=context.agent_execution_id,
+                                                               memory=context.memory,
+                                                               runtime_config=context.runtime_config)
             iteration_step_handler.execute_step()
         elif agent_workflow_step.action_type == AgentWorkflowStepAction.WAIT_STEP.value:
             (AgentWaitStepHandler(session=session, agent_id=agent.id,
-                                  agent_execution_id=agent_execution_id)
+                                  agent_execution_id=context.agent_execution_id)
              .execute_step())
 
+    @classmethod
+    def build_memory(cls, model_llm_source, model_api_key):
+        """Builds the long term memory store, only OpenAI embeddings are supported for now."""
+        if "OpenAI" not in model_llm_source:
+            return None
+        vector_store_type = VectorStoreType.get_vector_store_type(get_config("LTM_DB", "Redis"))
+        return VectorFactory.get_vector_storage(vector_store_type, "super-agent-index1",
+                                                AgentExecutor.get_embedding(model_llm_source, model_api_key))
+
     @classmethod
     def get_embedding(cls, model_source, model_api_key):
         if "OpenAI" in model_source:
@@ -150,37 +153,62 @@ class AgentExecutor:
                                                         'name': db_agent_execution.name,
                                                         'tokens_consumed': db_agent_execution.num_of_tokens,
                                                         "calls": db_agent_execution.num_of_calls},
-                                                       db_agent_execution.agent_id, organisation_id)
+                                                       db_agent_execution.agent_id, organisation_id, buffered=True)
             session.commit()
             logger.info("ITERATION_LIMIT_CROSSED")
             return True
         return False
 
     def execute_waiting_workflows(self):
-        """Check if wait time of wait workflow step is over and can be resumed."""
+        """
+        Check if wait time of wait workflow step is over and can be resumed. Wait steps are normally
+        resumed from the StepScheduler queue, this sweep picks up the ones missing from it.
+        """
 
         session = Session()
         waiting_agent_executions = session.query(AgentExecution).filter(
             AgentExecution.status == AgentExecutionStatus.WAIT_STEP.value,
         ).all()
         for agent_execution in waiting_agent_executions:
-            workflow_step = session.query(AgentWorkflowStep).filter(
-                AgentWorkflowStep.id == agent_execution.current_agent_step_id).first()
-            step_wait = AgentWorkflowStepWait.find_by_id(session, workflow_step.action_reference_id)
-            if step_wait is not None:
-                wait_time = step_wait.delay if not None else 0
-                logger.info(f"Agent Execution ID: {agent_execution.id}")
-                logger.info(f"Wait time: {wait_time}")
-                logger.info(f"Wait begin time: {step_wait.wait_begin_time}")
-                logger.info(f"Current time: {datetime.now()}")
-                logger.info(f"Wait Difference : {(datetime.now() - step_wait.wait_begin_time).total_seconds()}")
-                if ((datetime.now() - step_wait.wait_begin_time).total_seconds() > wait_time
-                        and step_wait.status == AgentWorkflowStepWaitStatus.WAITING.value):
-                    agent_execution.status = AgentExecutionStatus.RUNNING.value
-                    step_wait.status = AgentWorkflowStepWaitStatus.COMPLETED.value
-                    session.commit()
-                    session.flush()
-                    AgentWaitStepHandler(session=session, agent_id=agent_execution.agent_id,
-                                         agent_execution_id=agent_execution.id).handle_next_step()
-                    execute_agent.delay(agent_execution.id, datetime.now())
-        session.close()
\ No newline at end of file
+            self._resume_wait_step(session, agent_execution)
+        session.close()
+
+    def execute_due_wait_steps(self):
+        """Resume the agent executions whose wait step is due according to the StepScheduler queue."""
+
+        agent_execution_ids = StepScheduler.pop_due_wait_steps()
+        if not agent_execution_ids:
+            return
+        session = Session()
+        try:
+            agent_executions = session.query(AgentExecution).filter(
+                AgentExecution.id.in_(agent_execution_ids),
+                AgentExecution.status == AgentExecutionStatus.WAIT_STEP.value,
+            ).all()
+            for agent_execution in agent_executions:
+                self._resume_wait_step(session, agent_execution)
+        finally:
+            session.close()
+
+    def _resume_wait_step(self, session, agent_execution):
+        workflow_step = session.query(AgentWorkflowStep).filter(
+            AgentWorkflowStep.id == agent_execution.current_agent_step_id).first()
+        step_wait = AgentWorkflowStepWait.find_by_id(session, workflow_step.action_reference_id)
+        if step_wait is None:
+            return
+        wait_time = step_wait.delay or 0
+        wait_difference = (datetime.now() - step_wait.wait_begin_time).total_seconds()
+        logger.info(f"Agent Execution ID: {agent_execution.id}, wait time: {wait_time}, "
+                    f"wait difference: {wait_difference}")
+        if wait_difference < wait_time:
+            # the queue clock may run slightly ahead of the database one
+            StepScheduler.schedule_wait_step(agent_execution.id, wait_time - wait_difference)
+            return
+        if step_wait.status == AgentWorkflowStepWaitStatus.WAITING.value:
+            agent_execution.status = AgentExecutionStatus.RUNNING.value
+            step_wait.status = AgentWorkflowStepWaitStatus.COMPLETED.value
+            session.commit()
+            session.flush()
+            AgentWaitStepHandler(session=session, agent_id=agent_execution.agent_id,
+                                 agent_execution_id=agent_execution.id).handle_next_step()
+            execute_agent.delay(agent_execution.id, datetime.now())
\ No newline at end of file
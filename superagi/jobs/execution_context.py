@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import OrderedDict
+
+from superagi.agent.agent_runtime_config import AgentRuntimeConfig
+from superagi.config.config import get_config
+from superagi.lib.logger import logger
+
+
+class AgentExecutionContext:
+    """
+    Warm state of an agent execution which is reused across the steps executed by a worker process.
+
+    Attributes:
+        agent_id (int): The agent id.
+        agent_execution_id (int): The agent execution id.
+        organisation_id (int): The organisation id of the agent.
+        agent_config (dict): The parsed agent configuration.
+        model_api_key (str): The api key of the configured model.
+        model_llm_source (str): The provider of the configured model.
+        llm (BaseLlm): The llm client used by the execution.
+        memory (VectorStore): The long term memory store, None if not available.
+        fingerprint (tuple): Version of the agent configuration the context was built from.
+        runtime_config (AgentRuntimeConfig): The configuration snapshot shared by the step handlers.
+        created_at (float): Monotonic time at which the context was built.
+    """
+
+    def __init__(self, agent_id: int, agent_execution_id: int, organisation_id: int, agent_config: dict,
+                 model_api_key: str, model_llm_source: str, llm=None, memory=None, fingerprint=None,
+                 runtime_config: AgentRuntimeConfig = None):
+        self.agent_id = agent_id
+        self.agent_execution_id = agent_execution_id
+        self.organisation_id = organisation_id
+        self.agent_config = agent_config
+        self.model_api_key = model_api_key
+        self.model_llm_source = model_llm_source
+        self.llm = llm
+        self.memory = memory
+        self.fingerprint = fingerprint
+        self.runtime_config = runtime_config
+        self.created_at = time.monotonic()
+
+    def is_expired(self, ttl: float) -> bool:
+        return time.monotonic() - self.created_at > ttl
+
+
+class ExecutionContextCache:
+    """
+    Per worker process cache of AgentExecutionContext objects keyed by agent execution id.
+
+    A cached context is reused as long as the configuration fingerprint is unchanged and the
+    context is younger than EXECUTION_CONTEXT_TTL seconds. Memory stores are shared between executions
+    using the same embedding provider and api key, so that index setup happens once per process.
+    """
+
+    _contexts = OrderedDict()
+    _memory_stores = {}
+    _lock = threading.RLock()
+
+    @classmethod
+    def ttl(cls) -> float:
+        return float(get_config("EXECUTION_CONTEXT_TTL", 600))
+
+    @classmethod
+    def max_size(cls) -> int:
+        return int(get_config("EXECUTION_CONTEXT_MAX_SIZE", 256))
+
+    @classmethod
+    def fetch_config_fingerprint(cls, session, agent_id: int, agent_execution_id: int = None):
+        """
+        Fetches a cheap version marker of the agent and execution configuration.
+
+        Args:
+            session: The database session.
+            agent_id (int): The agent id.
+            agent_execution_id (int): The agent execution id.
+
+        Returns:
+            tuple: The version of the configuration, see AgentRuntimeConfig.fetch_version.
+        """
+        return AgentRuntimeConfig.fetch_version(session, agent_id, agent_execution_id)
+
+    @classmethod
+    def get(cls, session, agent_id: int, agent_execution_id: int):
+        """
+        Returns the cached context of the agent execution if it is still valid.
+
+        Args:
+            session: The database session.
+            agent_id (int): The agent id.
+            agent_execution_id (int): The agent execution id.
+
+        Returns:
+            AgentExecutionContext: The cached context or None.
+        """
+        with cls._lock:
+            context = cls._contexts.get(agent_execution_id)
+        if context is None:
+            return None
+        if context.agent_id != agent_id or context.is_expired(cls.ttl()) \
+                or context.fingerprint != cls.fetch_config_fingerprint(session, agent_id, agent_execution_id):
+            cls.invalidate(agent_execution_id=agent_execution_id)
+            return None
+        with cls._lock:
+            cls._contexts.move_to_end(agent_execution_id)
+        return context
+
+    @classmethod
+    def put(cls, context: AgentExecutionContext):
+        with cls._lock:
+            cls._contexts[context.agent_execution_id] = context
+            cls._contexts.move_to_end(context.agent_execution_id)
+            while len(cls._contexts) > cls.max_size():
+                cls._contexts.popitem(last=False)
+
+    @classmethod
+    def get_or_build(cls, session, agent_id: int, agent_execution_id: int, build_memory=None):
+        """
+        Returns a valid context for the agent execution, building a new one when needed.
+
+        Args:
+            session: The database session.
+            agent_id (int): The agent id.
+            agent_execution_id (int): The agent execution id.
+            build_memory (callable): Builds the memory store from (model_llm_source, model_api_key).
+
+        Returns:
+            AgentExecutionContext: The execution context.
+        """
+        context = cls.get(session, agent_id, agent_execution_id)
+        if context is not None:
+            return context
+
+        fingerprint = cls.fetch_config_fingerprint(session, agent_id, agent_execution_id)
+        runtime_config = AgentRuntimeConfig.build(session, agent_id, agent_execution_id, version=fingerprint)
+        model_api_key = runtime_config.model_api_key
+        model_llm_source = runtime_config.model_provider
+
+        from superagi.llms.llm_model_factory import get_model
+        llm = get_model(model=runtime_config.model, api_key=model_api_key,
+                        organisation_id=runtime_config.organisation_id)
+        memory = cls.get_memory(model_llm_source, model_api_key, build_memory) if build_memory else None
+
+        context = AgentExecutionContext(agent_id=agent_id, agent_execution_id=agent_execution_id,
+                                        organisation_id=runtime_config.organisation_id,
+                                        agent_config=runtime_config.agent_config,
+                                        model_api_key=model_api_key, model_llm_source=model_llm_source,
+                                        llm=llm, memory=memory, fingerprint=fingerprint,
+                                        runtime_config=runtime_config)
+        cls.put(context)
+        return context
+
+    @classmethod
+    def get_memory(cls, model_llm_source: str, model_api_key: str, build_memory):
+        """
+        Returns the memory store shared by executions using the same provider and api key.
+
+        Args:
+            model_llm_source (str): The model provider.
+            model_api_key (str): The model api key.
+            build_memory (callable): Builds the memory store from (model_llm_source, model_api_key).
+
+        Returns:
+            VectorStore: The memory store or None if it could not be set up.
+        """
+        key = (model_llm_source, model_api_key)
+        with cls._lock:
+            if key in cls._memory_stores:
+                return cls._memory_stores[key]
+        try:
+            memory = build_memory(model_llm_source, model_api_key)
+        except Exception as e:
+            logger.info(f"Unable to setup the connection...{e}")
+            return None
+        if memory is not None:
+            with cls._lock:
+                cls._memory_stores[key] = memory
+        return memory
+
+    @classmethod
+    def invalidate(cls, agent_execution_id: int = None, agent_id: int = None):
+        """
+        Drops cached contexts of an agent execution, of all executions of an agent, or everything.
+
+        Args:
+            agent_execution_id (int): The agent execution id.
+            agent_id (int): The agent id.
+        """
+        with cls._lock:
+            if agent_execution_id is None and agent_id is None:
+                cls._contexts.clear()
+                cls._memory_stores.clear()
+                return
+            for execution_id in list(cls._contexts.keys()):
+                context = cls._contexts[execution_id]
+                if execution_id == agent_execution_id or (agent_id is not None and context.agent_id == agent_id):
+                    del cls._contexts[execution_id]
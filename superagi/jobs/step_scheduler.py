@@ -0,0 +1,96 @@
+import time
+from datetime import datetime
+
+import redis
+
+from superagi.config.config import get_config
+from superagi.lib.logger import logger
+
+redis_url = get_config('REDIS_URL') or "localhost:6379"
+
+
+class StepScheduler:
+    """
+    Schedules the steps of agent executions on the execute_agent task.
+
+    The next step is chained as soon as the previous one finishes, permission blocked executions are
+    woken when the permission is answered and wait steps are kept in a Redis sorted set scored by the
+    time at which they are due, which the worker beat drains every WAIT_STEP_POLL_INTERVAL seconds.
+    """
+
+    WAIT_STEP_QUEUE = "agent_execution_wait_steps"
+
+    _redis = None
+
+    @classmethod
+    def _redis_client(cls):
+        if cls._redis is None:
+            cls._redis = redis.Redis.from_url("redis://" + redis_url + "/0", decode_responses=True)
+        return cls._redis
+
+    @classmethod
+    def schedule_next_step(cls, agent_execution_id: int):
+        """
+        Enqueues the next step of an agent execution, delayed by AGENT_STEP_DELAY seconds (none by default).
+
+        Args:
+            agent_execution_id (int): The agent execution id.
+        """
+        from superagi.worker import execute_agent
+        countdown = float(get_config("AGENT_STEP_DELAY", 0))
+        execute_agent.apply_async((agent_execution_id, datetime.now()), countdown=countdown or None)
+
+    @classmethod
+    def schedule_retry(cls, agent_execution_id: int):
+        """
+        Enqueues the failed step of an agent execution again after AGENT_STEP_RETRY_DELAY seconds.
+
+        Args:
+            agent_execution_id (int): The agent execution id.
+        """
+        from superagi.worker import execute_agent
+        countdown = float(get_config("AGENT_STEP_RETRY_DELAY", 15))
+        execute_agent.apply_async((agent_execution_id, datetime.now()), countdown=countdown)
+
+    @classmethod
+    def wake(cls, agent_execution_id: int):
+        """
+        Resumes an agent execution which was blocked, e.g. on a permission.
+
+        Args:
+            agent_execution_id (int): The agent execution id.
+        """
+        from superagi.worker import execute_agent
+        execute_agent.delay(agent_execution_id, datetime.now())
+
+    @classmethod
+    def schedule_wait_step(cls, agent_execution_id: int, delay: float):
+        """
+        Adds an agent execution to the wait step queue.
+
+        Args:
+            agent_execution_id (int): The agent execution id.
+            delay (float): The wait time in seconds.
+        """
+        try:
+            cls._redis_client().zadd(cls.WAIT_STEP_QUEUE, {str(agent_execution_id): time.time() + (delay or 0)})
+        except redis.RedisError as e:
+            # execute_waiting_workflows picks the execution up on its next sweep
+            logger.error(f"Unable to schedule wait step of {agent_execution_id}: {e}")
+
+    @classmethod
+    def pop_due_wait_steps(cls, now: float = None) -> list:
+        """
+        Removes and returns the agent executions whose wait step is over. An execution is returned to a
+        single caller even when several workers drain the queue concurrently.
+
+        Args:
+            now (float): The current epoch time, defaults to time.time().
+
+        Returns:
+            list: The agent execution ids.
+        """
+        client = cls._redis_client()
+        due_ids = client.zrangebyscore(cls.WAIT_STEP_QUEUE, 0, now or time.time())
+        return [int(agent_execution_id) for agent_execution_id in due_ids
+                if client.zrem(cls.WAIT_STEP_QUEUE, agent_execution_id)]
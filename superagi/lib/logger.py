@@ -1,23 +1,87 @@
+import contextvars
+import json
 import logging
-import inspect
+import os
+from contextlib import contextmanager
 
+# Correlation ids, e.g. the agent execution and the workflow step, added to the records of the current context.
+_log_context = contextvars.ContextVar("log_context", default={})
 
-class CustomLogRecord(logging.LogRecord):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
 
-        frame = inspect.currentframe().f_back
-        while frame:
-            if frame.f_globals['__name__'] != __name__ and frame.f_globals['__name__'] != 'logging':
-                break
-            frame = frame.f_back
+@contextmanager
+def log_context(**fields):
+    """
+    Adds correlation ids to the log records emitted in the block.
 
-        if frame:
-            self.filename = frame.f_code.co_filename
-            self.lineno = frame.f_lineno
-        else:
-            self.filename = "unknown"
-            self.lineno = 0
+    Args:
+        **fields: The ids, e.g. agent_execution_id.
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class LogMessage:
+    """
+    Message of a record logged with extra args, joined with spaces only when a handler formats it.
+    """
+
+    __slots__ = ("message", "args")
+
+    def __init__(self, message, args):
+        self.message = message
+        self.args = args
+
+    def __str__(self):
+        return " ".join(str(part) for part in (self.message,) + self.args)
+
+
+def truncate_message(message: str, max_length: int) -> str:
+    if max_length <= 0 or len(message) <= max_length:
+        return message
+    return f"{message[:max_length]}... [{len(message) - max_length} characters omitted]"
+
+
+class ContextFilter(logging.Filter):
+    """Adds the correlation ids of the current context to the records."""
+
+    def filter(self, record):
+        record.context = _log_context.get()
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self, max_message_length=0, **kwargs):
+        super().__init__(**kwargs)
+        self.max_message_length = max_message_length
+
+    def formatMessage(self, record):
+        record.message = truncate_message(record.message, self.max_message_length)
+        return super().formatMessage(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats the records as JSON lines carrying the correlation ids of the context they were logged in."""
+
+    def __init__(self, max_message_length=0, **kwargs):
+        super().__init__(**kwargs)
+        self.max_message_length = max_message_length
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "message": truncate_message(record.getMessage(), self.max_message_length),
+        }
+        entry.update(getattr(record, "context", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
 
 
 class SingletonMeta(type):
@@ -31,49 +95,65 @@ class SingletonMeta(type):
 
 
 class Logger(metaclass=SingletonMeta):
-    def __init__(self, logger_name='Super AGI', log_level=logging.DEBUG):
+    """
+    Logger of the application, configured from the environment:
+
+    LOG_LEVEL: the minimum level, DEBUG by default.
+    LOG_FORMAT: "text" or "json", JSON lines including the ids set with log_context.
+    LOG_MAX_MESSAGE_LENGTH: messages longer than this, e.g. prompts and tool responses, are truncated.
+        0 disables the truncation.
+
+    Disabled levels return before any message is built, extra args are joined to the message only when
+    a handler formats the record.
+    """
+
+    def __init__(self, logger_name='Super AGI', log_level=None):
         if not hasattr(self, 'logger'):
+            log_level = log_level or os.getenv("LOG_LEVEL", "DEBUG").upper()
+            max_message_length = int(os.getenv("LOG_MAX_MESSAGE_LENGTH", 0))
             self.logger = logging.getLogger(logger_name)
             self.logger.setLevel(log_level)
-            self.logger.makeRecord = self._make_custom_log_record
 
             console_handler = logging.StreamHandler()
             console_handler.setLevel(log_level)
+            console_handler.addFilter(ContextFilter())
 
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S %Z')
+            if os.getenv("LOG_FORMAT", "text").lower() == "json":
+                formatter = JsonFormatter(max_message_length=max_message_length, datefmt='%Y-%m-%dT%H:%M:%S%z')
+            else:
+                formatter = TextFormatter(
+                    max_message_length=max_message_length,
+                    fmt='%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
+                    datefmt='%Y-%m-%d %H:%M:%S %Z')
 
             console_handler.setFormatter(formatter)
             self.logger.addHandler(console_handler)
 
-    def _make_custom_log_record(self, name, level, fn, lno, msg, args, exc_info, func=None, extra=None, sinfo=None):
-        return CustomLogRecord(name, level, fn, lno, msg, args, exc_info, func=func, extra=extra, sinfo=sinfo)
+    def _log(self, level, message, args):
+        if not self.logger.isEnabledFor(level):
+            return
+        if args:
+            message = LogMessage(message, args)
+        # stacklevel 3 reports the caller of the debug, info... methods instead of this module
+        self.logger.log(level, message, stacklevel=3)
+
+    def isEnabledFor(self, level) -> bool:
+        return self.logger.isEnabledFor(level)
 
     def debug(self, message, *args):
-        self.logger.debug(message)
-        if args:
-            self.logger.debug(*args)
+        self._log(logging.DEBUG, message, args)
 
     def info(self, message, *args):
-        self.logger.info(message)
-        if args:
-            self.logger.info(*args)
+        self._log(logging.INFO, message, args)
 
     def warning(self, message, *args):
-        self.logger.warning(message)
-        if args:
-            self.logger.warning(*args)
+        self._log(logging.WARNING, message, args)
 
     def error(self, message, *args):
-        self.logger.error(message)
-        if args:
-            self.logger.error(*args)
+        self._log(logging.ERROR, message, args)
 
     def critical(self, message, *args):
-        self.logger.critical(message)
-        if args:
-            self.logger.critical(*args)
+        self._log(logging.CRITICAL, message, args)
 
 
 logger = Logger('Super AGI')
@@ -1,11 +1,26 @@
 from abc import ABC, abstractmethod
 
+from superagi.llms.utils.async_pool import AsyncLlmPool
+
 
 class BaseLlm(ABC):
     @abstractmethod
     def chat_completion(self, prompt):
         pass
 
+    async def achat_completion(self, messages, *args, **kwargs):
+        """
+        Async version of chat_completion. Providers without a native async client run the blocking
+        call in a thread, bounded by the concurrency limit of the provider.
+
+        Args:
+            messages (list): The messages.
+
+        Returns:
+            dict: The response.
+        """
+        return await AsyncLlmPool.run_in_thread(self.get_source(), self.chat_completion, messages, *args, **kwargs)
+
     @abstractmethod
     def get_source(self):
         pass
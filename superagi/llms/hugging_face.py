@@ -4,6 +4,7 @@ import json
 from superagi.config.config import get_config
 from superagi.lib.logger import logger
 from superagi.llms.base_llm import BaseLlm
+from superagi.llms.utils.async_pool import AsyncLlmPool
 from superagi.llms.utils.huggingface_utils.tasks import Tasks, TaskParameters
 from superagi.llms.utils.huggingface_utils.public_endpoints import ACCOUNT_VERIFICATION_URL
 
@@ -25,6 +26,7 @@ class HuggingFace(BaseLlm):
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
+        self.session = requests.Session()
 
     def get_source(self):
             return "hugging face"
@@ -77,33 +79,58 @@ class HuggingFace(BaseLlm):
             dict: The response.
         """
         try:
-            if isinstance(messages, list):
-                messages = messages[0]["content"] + "\nThe response in json schema:"
-            params = self.task_params
-            if self.task == Tasks.TEXT_GENERATION:
-                params["max_new_tokens"] = max_tokens
-            params['return_full_text'] = False
-            payload = {
-                "inputs": messages,
-                "parameters": self.task_params,
-                "options": {
-                    "use_cache": False,
-                    "wait_for_model": True,
-                }
-            }
-            response = requests.post(self.end_point, headers=self.headers, data=json.dumps(payload))
+            payload = self._build_payload(messages, max_tokens)
+            response = self.session.post(self.end_point, headers=self.headers, data=json.dumps(payload))
             completion = json.loads(response.content.decode("utf-8"))
-            logger.info(f"{completion=}")
-            if self.task == Tasks.TEXT_GENERATION:
-                content = completion[0]["generated_text"]
-            else:
-                content = completion[0]["answer"]
+            return self._parse_completion(completion)
+        except Exception as exception:
+            logger.error(f"HF Exception: {exception}")
+            return {"error": "ERROR_HUGGINGFACE", "message": "HuggingFace Inference exception", "details": exception}
 
-            return {"response": completion, "content": content}
+    async def achat_completion(self, messages, max_tokens=get_config("MAX_MODEL_TOKEN_LIMIT")):
+        """
+        Call the HuggingFace inference API through the pooled async HTTP session.
+        Args:
+            messages (list): The messages.
+            max_tokens (int): The maximum number of tokens.
+        Returns:
+            dict: The response.
+        """
+        try:
+            payload = self._build_payload(messages, max_tokens)
+            async with AsyncLlmPool.get_semaphore(self.get_source()):
+                async with AsyncLlmPool.get_session().post(self.end_point, headers=self.headers,
+                                                           data=json.dumps(payload)) as response:
+                    completion = json.loads((await response.read()).decode("utf-8"))
+            return self._parse_completion(completion)
         except Exception as exception:
             logger.error(f"HF Exception: {exception}")
             return {"error": "ERROR_HUGGINGFACE", "message": "HuggingFace Inference exception", "details": exception}
 
+    def _build_payload(self, messages, max_tokens):
+        if isinstance(messages, list):
+            messages = messages[0]["content"] + "\nThe response in json schema:"
+        params = dict(self.task_params)
+        if self.task == Tasks.TEXT_GENERATION:
+            params["max_new_tokens"] = max_tokens
+        params['return_full_text'] = False
+        return {
+            "inputs": messages,
+            "parameters": params,
+            "options": {
+                "use_cache": False,
+                "wait_for_model": True,
+            }
+        }
+
+    def _parse_completion(self, completion):
+        logger.info(f"{completion=}")
+        if self.task == Tasks.TEXT_GENERATION:
+            content = completion[0]["generated_text"]
+        else:
+            content = completion[0]["answer"]
+        return {"response": completion, "content": content}
+
     def verify_end_point(self):
         data = json.dumps({"inputs": "validating end_point"})
         response = requests.post(self.end_point, headers=self.headers, data=data)
@@ -1,44 +1,76 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from superagi.config.config import get_config
+from superagi.helper.model_registry import ModelRegistry
+from superagi.lib.logger import logger
 from superagi.llms.google_palm import GooglePalm
 from superagi.llms.local_llm import LocalLLM
 from superagi.llms.openai import OpenAi
 from superagi.llms.replicate import Replicate
 from superagi.llms.hugging_face import HuggingFace
-from superagi.models.models_config import ModelsConfig
-from superagi.models.models import Models
-from sqlalchemy.orm import sessionmaker
-from superagi.models.db import connect_db
+
+
+# LRU of the llm clients, keyed by organisation first so that the clients of an organisation are
+# dropped when its models are invalidated.
+_model_pool = OrderedDict()
+_model_pool_lock = threading.Lock()
+
+
+def _clear_model_pool(organisation_id=None):
+    with _model_pool_lock:
+        if organisation_id is None:
+            _model_pool.clear()
+            return
+        for pool_key in [pool_key for pool_key in _model_pool if pool_key[0] == organisation_id]:
+            del _model_pool[pool_key]
+
+
+ModelRegistry.add_invalidation_listener(_clear_model_pool)
 
 
 def get_model(organisation_id, api_key, model="gpt-3.5-turbo", **kwargs):
-    print("Fetching model details from database...")
-    engine = connect_db()
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    """
+    Returns the llm client of a model, shared by every caller asking for the same organisation, model,
+    api key and parameters so that clients and their http sessions are reused across steps and tools.
+    """
+    model_instance = ModelRegistry.fetch_model(None, organisation_id, model)
+    try:
+        pool_key = (organisation_id, model, hashlib.sha256(str(api_key).encode()).hexdigest(),
+                    model_instance["provider"], model_instance["end_point"], model_instance["version"],
+                    model_instance["context_length"], tuple(sorted(kwargs.items())))
+        hash(pool_key)
+    except TypeError:
+        return _build_model(model_instance, api_key, **kwargs)
 
-    model_instance = session.query(Models).filter(Models.org_id == organisation_id, Models.model_name == model).first()
-    response = session.query(ModelsConfig.provider).filter(ModelsConfig.org_id == organisation_id,
-                                                                   ModelsConfig.id == model_instance.model_provider_id).first()
-    provider_name = response.provider
+    with _model_pool_lock:
+        llm = _model_pool.get(pool_key)
+        if llm is not None:
+            _model_pool.move_to_end(pool_key)
+            return llm
+        llm = _build_model(model_instance, api_key, **kwargs)
+        if llm is not None:
+            _model_pool[pool_key] = llm
+            while len(_model_pool) > int(get_config("MODEL_POOL_SIZE", 64)):
+                _model_pool.popitem(last=False)
+    return llm
 
-    session.close()
 
+def _build_model(model_instance, api_key, **kwargs):
+    provider_name = model_instance["provider"]
     if provider_name == 'OpenAI':
-        print("Provider is OpenAI")
-        return OpenAi(model=model_instance.model_name, api_key=api_key, **kwargs)
+        return OpenAi(model=model_instance["model_name"], api_key=api_key, **kwargs)
     elif provider_name == 'Replicate':
-        print("Provider is Replicate")
-        return Replicate(model=model_instance.model_name, version=model_instance.version, api_key=api_key, **kwargs)
+        return Replicate(model=model_instance["model_name"], version=model_instance["version"], api_key=api_key, **kwargs)
     elif provider_name == 'Google Palm':
-        print("Provider is Google Palm")
-        return GooglePalm(model=model_instance.model_name, api_key=api_key, **kwargs)
+        return GooglePalm(model=model_instance["model_name"], api_key=api_key, **kwargs)
     elif provider_name == 'Hugging Face':
-        print("Provider is Hugging Face")
-        return HuggingFace(model=model_instance.model_name, end_point=model_instance.end_point, api_key=api_key, **kwargs)
+        return HuggingFace(model=model_instance["model_name"], end_point=model_instance["end_point"], api_key=api_key, **kwargs)
     elif provider_name == 'Local LLM':
-        print("Provider is Local LLM")
-        return LocalLLM(model=model_instance.model_name, context_length=model_instance.context_length)
+        return LocalLLM(model=model_instance["model_name"], context_length=model_instance["context_length"])
     else:
-        print('Unknown provider.')
+        logger.error(f"Unknown provider: {provider_name}")
 
 def build_model_with_api_key(provider_name, api_key):
     if provider_name.lower() == 'openai':
@@ -52,4 +84,4 @@ def build_model_with_api_key(provider_name, api_key):
     elif provider_name.lower() == 'local llm':
         return LocalLLM(api_key=api_key)
     else:
-        print('Unknown provider.')
\ No newline at end of file
+        logger.error(f"Unknown provider: {provider_name}")
\ No newline at end of file
@@ -6,6 +6,7 @@ from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_ra
 from superagi.config.config import get_config
 from superagi.lib.logger import logger
 from superagi.llms.base_llm import BaseLlm
+from superagi.llms.utils.async_pool import AsyncLlmPool
 
 MAX_RETRY_ATTEMPTS = 5
 MIN_WAIT = 30 # Seconds
@@ -39,8 +40,9 @@ class OpenAi(BaseLlm):
         self.presence_penalty = presence_penalty
         self.number_of_results = number_of_results
         self.api_key = api_key
+        self.api_base = get_config("OPENAI_API_BASE", "https://api.openai.com/v1")
         openai.api_key = api_key
-        openai.api_base = get_config("OPENAI_API_BASE", "https://api.openai.com/v1")
+        openai.api_base = self.api_base
 
     def get_source(self):
         return "openai"
@@ -83,36 +85,85 @@ class OpenAi(BaseLlm):
         """
         try:
             # openai.api_key = get_config("OPENAI_API_KEY")
-            response = openai.ChatCompletion.create(
-                n=self.number_of_results,
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                max_tokens=max_tokens,
-                top_p=self.top_p,
-                frequency_penalty=self.frequency_penalty,
-                presence_penalty=self.presence_penalty
-            )
+            response = openai.ChatCompletion.create(**self._completion_params(messages, max_tokens))
             content = response.choices[0].message["content"]
             return {"response": response, "content": content}
-        except RateLimitError as api_error:
-            logger.info("OpenAi RateLimitError:", api_error)
-            raise RateLimitError(str(api_error))
-        except Timeout as timeout_error:
-            logger.info("OpenAi Timeout:", timeout_error)
-            raise Timeout(str(timeout_error))
-        except TryAgain as try_again_error:
-            logger.info("OpenAi TryAgain:", try_again_error)
-            raise TryAgain(str(try_again_error))
-        except AuthenticationError as auth_error:
-            logger.info("OpenAi AuthenticationError:", auth_error)
-            return {"error": "ERROR_AUTHENTICATION", "message": "Authentication error please check the api keys: "+str(auth_error)}
-        except InvalidRequestError as invalid_request_error:
-            logger.info("OpenAi InvalidRequestError:", invalid_request_error)
-            return {"error": "ERROR_INVALID_REQUEST", "message": "Openai invalid request error: "+str(invalid_request_error)}
         except Exception as exception:
-            logger.info("OpenAi Exception:", exception)
-            return {"error": "ERROR_OPENAI", "message": "Open ai exception: "+str(exception)}
+            return self._handle_exception(exception)
+
+    @retry(
+        retry=(
+            retry_if_exception_type(RateLimitError) |
+            retry_if_exception_type(Timeout) |
+            retry_if_exception_type(TryAgain)
+        ),
+        stop=stop_after_attempt(MAX_RETRY_ATTEMPTS), # Maximum number of retry attempts
+        wait=wait_random_exponential(min=MIN_WAIT, max=MAX_WAIT),
+        before_sleep=lambda retry_state: logger.info(f"{retry_state.outcome.exception()} (attempt {retry_state.attempt_number})"),
+        retry_error_callback=custom_retry_error_callback
+    )
+    async def achat_completion(self, messages, max_tokens=get_config("MAX_MODEL_TOKEN_LIMIT")):
+        """
+        Call the OpenAI chat completion API without blocking the event loop. Requests go through
+        the pooled HTTP session of the loop and are bounded by the openai concurrency limit.
+
+        Args:
+            messages (list): The messages.
+            max_tokens (int): The maximum number of tokens.
+
+        Returns:
+            dict: The response.
+        """
+        try:
+            async with AsyncLlmPool.get_semaphore(self.get_source()):
+                openai.aiosession.set(AsyncLlmPool.get_session())
+                response = await openai.ChatCompletion.acreate(**self._completion_params(messages, max_tokens))
+            content = response.choices[0].message["content"]
+            return {"response": response, "content": content}
+        except Exception as exception:
+            return self._handle_exception(exception)
+
+    def _completion_params(self, messages, max_tokens):
+        return dict(
+            n=self.number_of_results,
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=max_tokens,
+            top_p=self.top_p,
+            frequency_penalty=self.frequency_penalty,
+            presence_penalty=self.presence_penalty,
+            api_key=self.api_key,
+            api_base=self.api_base
+        )
+
+    def _handle_exception(self, exception):
+        """
+        Re-raises the retryable errors and maps the others to an error response.
+
+        Args:
+            exception (Exception): The exception raised by the completion call.
+
+        Returns:
+            dict: The error response.
+        """
+        if isinstance(exception, RateLimitError):
+            logger.info("OpenAi RateLimitError:", exception)
+            raise RateLimitError(str(exception))
+        if isinstance(exception, Timeout):
+            logger.info("OpenAi Timeout:", exception)
+            raise Timeout(str(exception))
+        if isinstance(exception, TryAgain):
+            logger.info("OpenAi TryAgain:", exception)
+            raise TryAgain(str(exception))
+        if isinstance(exception, AuthenticationError):
+            logger.info("OpenAi AuthenticationError:", exception)
+            return {"error": "ERROR_AUTHENTICATION", "message": "Authentication error please check the api keys: "+str(exception)}
+        if isinstance(exception, InvalidRequestError):
+            logger.info("OpenAi InvalidRequestError:", exception)
+            return {"error": "ERROR_INVALID_REQUEST", "message": "Openai invalid request error: "+str(exception)}
+        logger.info("OpenAi Exception:", exception)
+        return {"error": "ERROR_OPENAI", "message": "Open ai exception: "+str(exception)}
 
     def verify_access_key(self):
         """
@@ -0,0 +1,109 @@
+import asyncio
+import functools
+import threading
+import weakref
+
+import aiohttp
+
+from superagi.config.config import get_config
+
+# Providers which can not serve concurrent completions from one process.
+DEFAULT_CONCURRENCY_LIMITS = {"Local LLM": 1}
+
+
+class AsyncLlmPool:
+    """
+    Shared async resources of the llm clients: one pooled aiohttp session and one semaphore per
+    provider for each running event loop.
+
+    The size of the HTTP pool is read from LLM_HTTP_POOL_SIZE and the number of in-flight
+    completions of a provider from LLM_CONCURRENCY_LIMITS (a mapping of provider source to limit),
+    falling back to LLM_MAX_CONCURRENCY.
+    """
+
+    _sessions = weakref.WeakKeyDictionary()
+    _semaphores = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    @classmethod
+    def pool_size(cls) -> int:
+        return int(get_config("LLM_HTTP_POOL_SIZE", 100))
+
+    @classmethod
+    def concurrency_limit(cls, source: str) -> int:
+        """
+        Returns the maximum number of in-flight completions of a provider.
+
+        Args:
+            source (str): The provider source as returned by BaseLlm.get_source.
+
+        Returns:
+            int: The concurrency limit.
+        """
+        limits = get_config("LLM_CONCURRENCY_LIMITS") or {}
+        if isinstance(limits, dict) and source in limits:
+            return int(limits[source])
+        if source in DEFAULT_CONCURRENCY_LIMITS:
+            return DEFAULT_CONCURRENCY_LIMITS[source]
+        return int(get_config("LLM_MAX_CONCURRENCY", 100))
+
+    @classmethod
+    def get_session(cls) -> aiohttp.ClientSession:
+        """
+        Returns the pooled HTTP session of the running event loop, creating it on first use.
+
+        Returns:
+            aiohttp.ClientSession: The session.
+        """
+        loop = asyncio.get_running_loop()
+        with cls._lock:
+            session = cls._sessions.get(loop)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(limit=cls.pool_size())
+                session = aiohttp.ClientSession(connector=connector)
+                cls._sessions[loop] = session
+        return session
+
+    @classmethod
+    def get_semaphore(cls, source: str) -> asyncio.Semaphore:
+        """
+        Returns the semaphore bounding the in-flight completions of a provider on the running loop.
+
+        Args:
+            source (str): The provider source.
+
+        Returns:
+            asyncio.Semaphore: The semaphore.
+        """
+        loop = asyncio.get_running_loop()
+        with cls._lock:
+            semaphores = cls._semaphores.setdefault(loop, {})
+            if source not in semaphores:
+                semaphores[source] = asyncio.Semaphore(cls.concurrency_limit(source))
+            return semaphores[source]
+
+    @classmethod
+    async def run_in_thread(cls, source: str, func, *args, **kwargs):
+        """
+        Runs a blocking call of a provider in the default executor under the provider limit.
+
+        Args:
+            source (str): The provider source.
+            func (callable): The blocking call.
+
+        Returns:
+            The result of the call.
+        """
+        async with cls.get_semaphore(source):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    @classmethod
+    async def close(cls):
+        """Closes the HTTP session of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with cls._lock:
+            session = cls._sessions.pop(loop, None)
+            cls._semaphores.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, Text, String, asc
-from sqlalchemy.orm import Session
+from sqlalchemy import Column, Integer, Text, String, asc, desc, event, func
+from sqlalchemy.orm import Session, object_session
 
+from superagi.helper.feed_publisher import FeedPublisher
+from superagi.helper.token_counter import TokenCounter
 from superagi.models.agent_execution import AgentExecution
 from superagi.models.base_model import DBBaseModel
 
@@ -16,6 +18,7 @@ class AgentExecutionFeed(DBBaseModel):
         feed (str): The feed content.
         role (str): The role of the feed entry. Possible values: 'system', 'user', or 'assistant'.
         extra_info (str): Additional information related to the feed entry.
+        token_count (int): The number of tokens of the feed content, populated on insert.
     """
 
     __tablename__ = 'agent_execution_feeds'
@@ -28,6 +31,7 @@ class AgentExecutionFeed(DBBaseModel):
     extra_info = Column(String)
     feed_group_id = Column(String)
     error_message = Column(String)
+    token_count = Column(Integer)
 
     def __repr__(self):
         """
@@ -55,15 +59,109 @@ class AgentExecutionFeed(DBBaseModel):
         return ""
 
     @classmethod
-    def fetch_agent_execution_feeds(cls, session, agent_execution_id: int):
+    def fetch_agent_execution_feeds(cls, session, agent_execution_id: int, limit: int = None):
         agent_execution = AgentExecution.find_by_id(session, agent_execution_id)
-        agent_feeds = session.query(AgentExecutionFeed.role, AgentExecutionFeed.feed, AgentExecutionFeed.id) \
+        query = session.query(AgentExecutionFeed.role, AgentExecutionFeed.feed, AgentExecutionFeed.id) \
             .filter(AgentExecutionFeed.agent_execution_id == agent_execution_id,
                     AgentExecutionFeed.feed_group_id == agent_execution.current_feed_group_id) \
-            .order_by(asc(AgentExecutionFeed.created_at)) \
-            .all()
+            .order_by(asc(AgentExecutionFeed.created_at))
         # return entire feed if it is not default feed. Default feed has prompt in the first 2 entries.
-        if agent_execution.current_feed_group_id != "DEFAULT":
-            return agent_feeds
-        else:
-            return agent_feeds[2:]
+        if agent_execution.current_feed_group_id == "DEFAULT":
+            query = query.offset(2)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    @classmethod
+    def _history_feeds(cls, session, agent_execution_id: int, tokens_per_message: int, until_feed_id: int = None):
+        # feeds of the current feed group with their position and estimated token count
+        agent_execution = AgentExecution.find_by_id(session, agent_execution_id)
+        skipped_feeds = 2 if agent_execution.current_feed_group_id == "DEFAULT" else 0
+        message_tokens = func.coalesce(AgentExecutionFeed.token_count, func.length(AgentExecutionFeed.feed) / 4, 0) \
+            + tokens_per_message + 3
+
+        feeds = session.query(AgentExecutionFeed.id, AgentExecutionFeed.role, AgentExecutionFeed.feed,
+                              AgentExecutionFeed.created_at, message_tokens.label("message_tokens"),
+                              func.row_number().over(order_by=(asc(AgentExecutionFeed.created_at),
+                                                               asc(AgentExecutionFeed.id))).label("position")) \
+            .filter(AgentExecutionFeed.agent_execution_id == agent_execution_id,
+                    AgentExecutionFeed.feed_group_id == agent_execution.current_feed_group_id)
+        if until_feed_id is not None:
+            feeds = feeds.filter(AgentExecutionFeed.id <= until_feed_id)
+        return feeds.subquery(), skipped_feeds
+
+    @classmethod
+    def fetch_agent_execution_feeds_window(cls, session, agent_execution_id: int, token_limit: int,
+                                           tokens_per_message: int = 4, until_feed_id: int = None,
+                                           after_feed_id: int = None):
+        """
+        Fetches the most recent feeds of the current feed group which fit in the token limit. The running
+        token total is computed in the database, so only the fitting tail of the feed is loaded.
+
+        Args:
+            session: The database session.
+            agent_execution_id (int): The agent execution id.
+            token_limit (int): The token budget of the returned feeds.
+            tokens_per_message (int): The per message token overhead of the model.
+            until_feed_id (int): Only consider feeds up to this feed id.
+            after_feed_id (int): Only consider feeds after this feed id.
+
+        Returns:
+            tuple: The fitting feeds (role, feed, id) ordered by creation time and the id of the most
+                recent feed which did not fit, None if every feed fits.
+        """
+        feeds, skipped_feeds = cls._history_feeds(session, agent_execution_id, tokens_per_message, until_feed_id)
+
+        history = session.query(feeds.c.id, feeds.c.role, feeds.c.feed, feeds.c.created_at, feeds.c.message_tokens,
+                                func.sum(feeds.c.message_tokens).over(
+                                    order_by=(desc(feeds.c.created_at), desc(feeds.c.id))).label("cumulative_tokens")) \
+            .filter(feeds.c.position > skipped_feeds)
+        if after_feed_id is not None:
+            history = history.filter(feeds.c.id > after_feed_id)
+        history = history.subquery()
+
+        # keep the feeds fitting in the limit plus the first one overflowing it, which marks the split point
+        rows = session.query(history.c.role, history.c.feed, history.c.id, history.c.cumulative_tokens) \
+            .filter(history.c.cumulative_tokens - history.c.message_tokens <= token_limit) \
+            .order_by(asc(history.c.created_at), asc(history.c.id)) \
+            .all()
+
+        if rows and rows[0].cumulative_tokens > token_limit:
+            return rows[1:], rows[0].id
+        return rows, None
+
+    @classmethod
+    def fetch_agent_execution_feeds_range(cls, session, agent_execution_id: int, after_feed_id: int = None,
+                                          until_feed_id: int = None, tokens_per_message: int = 4):
+        """
+        Fetches the feeds of the current feed group between two feed ids.
+
+        Args:
+            session: The database session.
+            agent_execution_id (int): The agent execution id.
+            after_feed_id (int): Only fetch feeds after this feed id.
+            until_feed_id (int): Only fetch feeds up to this feed id.
+            tokens_per_message (int): The per message token overhead of the model.
+
+        Returns:
+            list: The feeds (role, feed, id, message_tokens) ordered by creation time.
+        """
+        feeds, skipped_feeds = cls._history_feeds(session, agent_execution_id, tokens_per_message, until_feed_id)
+        query = session.query(feeds.c.role, feeds.c.feed, feeds.c.id, feeds.c.message_tokens) \
+            .filter(feeds.c.position > skipped_feeds)
+        if after_feed_id is not None:
+            query = query.filter(feeds.c.id > after_feed_id)
+        return query.order_by(asc(feeds.c.created_at), asc(feeds.c.id)).all()
+
+
+@event.listens_for(AgentExecutionFeed, "before_insert")
+def populate_token_count(mapper, connection, target):
+    if target.token_count is None:
+        target.token_count = TokenCounter.count_content_tokens(target.feed or "")
+
+
+@event.listens_for(AgentExecutionFeed, "after_insert")
+def collect_feed_announcement(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and target.agent_execution_id is not None:
+        FeedPublisher.announce_on_commit(session, target.agent_execution_id)
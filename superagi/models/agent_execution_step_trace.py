@@ -0,0 +1,63 @@
+from sqlalchemy import Column, Integer, String, Float, Index
+from sqlalchemy.dialects.postgresql import JSONB
+
+from superagi.models.base_model import DBBaseModel
+
+
+class AgentExecutionStepTrace(DBBaseModel):
+    """
+    Timing of a single agent execution step.
+
+    Attributes:
+        id (Integer): The primary key of the trace.
+        agent_execution_id (Integer): The agent execution the step belongs to.
+        agent_id (Integer): The agent id.
+        step_type (String): The action type of the workflow step.
+        queue_wait_ms (Float): Time between the step being due and picked up by a worker.
+        total_ms (Float): Wall time of the step.
+        db_ms (Float): Time spent in database queries.
+        llm_ms (Float): Time spent waiting on llm completions.
+        tool_ms (Float): Time spent handling the llm output, tool execution included.
+        embedding_ms (Float): Time spent waiting on the embedding models.
+        tokens (Integer): Tokens consumed by the step.
+        spans (JSONB): Duration and count of every span recorded during the step, keyed by span name.
+    """
+    __tablename__ = 'agent_execution_step_traces'
+
+    id = Column(Integer, primary_key=True)
+    agent_execution_id = Column(Integer, nullable=False)
+    agent_id = Column(Integer)
+    step_type = Column(String)
+    queue_wait_ms = Column(Float)
+    total_ms = Column(Float)
+    db_ms = Column(Float)
+    llm_ms = Column(Float)
+    tool_ms = Column(Float)
+    embedding_ms = Column(Float)
+    tokens = Column(Integer)
+    spans = Column(JSONB)
+
+    __table_args__ = (Index("ix_aest_agent_execution_id", "agent_execution_id"),)
+
+    def __repr__(self):
+        return f"AgentExecutionStepTrace(id={self.id}, agent_execution_id={self.agent_execution_id}, " \
+               f"step_type={self.step_type}, total_ms={self.total_ms})"
+
+    @classmethod
+    def fetch_by_execution_id(cls, session, agent_execution_id: int, limit: int = 500):
+        """
+        Fetches the most recent step traces of an agent execution in chronological order.
+
+        Args:
+            session: The database session.
+            agent_execution_id (int): The agent execution id.
+            limit (int): The maximum number of traces.
+
+        Returns:
+            list: The step traces.
+        """
+        traces = session.query(AgentExecutionStepTrace) \
+            .filter(AgentExecutionStepTrace.agent_execution_id == agent_execution_id) \
+            .order_by(AgentExecutionStepTrace.id.desc()) \
+            .limit(limit).all()
+        return list(reversed(traces))
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint, Index
+
+from superagi.models.base_model import DBBaseModel
+
+
+class AnalyticsAgent(DBBaseModel):
+    """
+    Agent as seen by the analytics, maintained from the agent_created events.
+
+    Attributes:
+        id (Integer): The primary key.
+        org_id (Integer): The ID of the organisation.
+        agent_id (Integer): The ID of the agent.
+        agent_name (String): The name of the agent.
+        model (String): The model of the agent.
+    """
+    __tablename__ = 'analytics_agents'
+
+    id = Column(Integer, primary_key=True)
+    org_id = Column(Integer, nullable=False)
+    agent_id = Column(Integer, nullable=False)
+    agent_name = Column(String)
+    model = Column(String)
+
+    __table_args__ = (UniqueConstraint("agent_id", name="uq_analytics_agents_agent_id"),
+                      Index("ix_analytics_agents_org_id", "org_id"))
+
+    def __repr__(self):
+        return f"AnalyticsAgent(id={self.id}, agent_id={self.agent_id}, agent_name={self.agent_name}, " \
+               f"model={self.model})"
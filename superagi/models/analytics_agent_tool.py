@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+
+from superagi.models.base_model import DBBaseModel
+
+
+class AnalyticsAgentTool(DBBaseModel):
+    """
+    Number of times an agent used a tool, maintained from the tool_used events.
+
+    Attributes:
+        id (Integer): The primary key.
+        org_id (Integer): The ID of the organisation.
+        agent_id (Integer): The ID of the agent.
+        tool_name (String): The name of the tool.
+        calls (Integer): Number of times the tool was used.
+    """
+    __tablename__ = 'analytics_agent_tools'
+
+    id = Column(Integer, primary_key=True)
+    org_id = Column(Integer, nullable=False)
+    agent_id = Column(Integer, nullable=False)
+    tool_name = Column(String, nullable=False)
+    calls = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (UniqueConstraint("org_id", "agent_id", "tool_name", name="uq_analytics_agent_tools_agent_tool"),)
+
+    def __repr__(self):
+        return f"AnalyticsAgentTool(id={self.id}, agent_id={self.agent_id}, tool_name={self.tool_name}, " \
+               f"calls={self.calls})"
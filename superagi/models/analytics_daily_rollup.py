@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Date, Float, UniqueConstraint, Index
+
+from superagi.models.base_model import DBBaseModel
+
+
+class AnalyticsDailyRollup(DBBaseModel):
+    """
+    Totals of the runs of an agent ended on a day.
+
+    Attributes:
+        id (Integer): The primary key.
+        org_id (Integer): The ID of the organisation.
+        agent_id (Integer): The ID of the agent.
+        model (String): The model of the agent.
+        day (Date): The day the runs ended, in UTC.
+        runs (Integer): Number of runs ended.
+        tokens (Integer): Tokens consumed by the runs.
+        calls (Integer): Llm calls made by the runs.
+        run_time (Float): Summed duration in seconds of the runs whose start is known.
+        timed_runs (Integer): Number of runs included in run_time.
+    """
+    __tablename__ = 'analytics_daily_rollups'
+
+    id = Column(Integer, primary_key=True)
+    org_id = Column(Integer, nullable=False)
+    agent_id = Column(Integer, nullable=False)
+    model = Column(String)
+    day = Column(Date, nullable=False)
+    runs = Column(Integer, nullable=False, default=0)
+    tokens = Column(Integer, nullable=False, default=0)
+    calls = Column(Integer, nullable=False, default=0)
+    run_time = Column(Float, nullable=False, default=0)
+    timed_runs = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (UniqueConstraint("org_id", "agent_id", "day", name="uq_analytics_daily_rollups_agent_day"),
+                      Index("ix_analytics_daily_rollups_org_id_day", "org_id", "day"))
+
+    def __repr__(self):
+        return f"AnalyticsDailyRollup(id={self.id}, agent_id={self.agent_id}, day={self.day}, runs={self.runs})"
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, Index
+
+from superagi.models.base_model import DBBaseModel
+
+
+class AnalyticsRun(DBBaseModel):
+    """
+    Agent execution as seen by the analytics, started by its run_created event and ended by its
+    run_completed or run_iteration_limit_crossed event.
+
+    Attributes:
+        id (Integer): The primary key.
+        org_id (Integer): The ID of the organisation.
+        agent_id (Integer): The ID of the agent.
+        agent_execution_id (Integer): The ID of the agent execution.
+        name (String): The name of the agent execution.
+        started_at (DateTime): Time of the run_created event.
+        ended_at (DateTime): Time of the end event, None while the run is active.
+        tokens (Integer): Tokens consumed by the run.
+        calls (Integer): Llm calls made by the run.
+    """
+    __tablename__ = 'analytics_runs'
+
+    id = Column(Integer, primary_key=True)
+    org_id = Column(Integer, nullable=False)
+    agent_id = Column(Integer)
+    agent_execution_id = Column(Integer, nullable=False)
+    name = Column(String)
+    started_at = Column(DateTime)
+    ended_at = Column(DateTime)
+    tokens = Column(Integer, nullable=False, default=0)
+    calls = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (UniqueConstraint("agent_execution_id", name="uq_analytics_runs_agent_execution_id"),
+                      Index("ix_analytics_runs_org_id_agent_id", "org_id", "agent_id"),
+                      Index("ix_analytics_runs_org_id_ended_at", "org_id", "ended_at"))
+
+    def __repr__(self):
+        return f"AnalyticsRun(id={self.id}, agent_execution_id={self.agent_execution_id}, name={self.name}, " \
+               f"ended_at={self.ended_at})"
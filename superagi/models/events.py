@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Sequence
+from sqlalchemy import Column, Integer, String, DateTime, Sequence, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from superagi.models.base_model import DBBaseModel
 from sqlalchemy.ext.declarative import declarative_base
@@ -16,6 +16,7 @@ class Event(DBBaseModel):
         event_property (JSONB): The JSON object representing additional attributes of the event.
         agent_id (Integer): The ID of the agent.
         org_id (Integer): The ID of the organisation.
+        agent_execution_id (Integer): The ID of the agent execution, copied from event_property.
     """
     __tablename__ = 'events'
 
@@ -25,6 +26,10 @@ class Event(DBBaseModel):
     event_property = Column(JSONB, nullable=True)
     agent_id = Column(Integer, nullable=True)
     org_id = Column(Integer, nullable=True)
+    agent_execution_id = Column(Integer, nullable=True)
+
+    __table_args__ = (Index("ix_events_agent_execution_id", "agent_execution_id"),
+                      Index("ix_events_org_id_event_name", "org_id", "event_name"))
 
     def __repr__(self):
         """
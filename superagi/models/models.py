@@ -178,6 +178,8 @@ class Models(DBBaseModel):
                 else:
                     model_api_key = decrypt_data(configurations.value)
                     model_details = ModelsConfig.store_api_key(session, organisation_id, "OpenAI", model_api_key)
+                    from superagi.helper.model_registry import ModelRegistry
+                    ModelRegistry.invalidate(organisation_id)
         except Exception as e:
             logging.error(f"Exception has been raised while checking API Key:: {e}")
 
@@ -13,10 +13,10 @@ from superagi.types.model_source_types import ModelSourceType
 class ResourceSummarizer:
     """Class to summarize a resource."""
 
-    def __init__(self, session, agent_id: int, model: str):
+    def __init__(self, session, agent_id: int, model: str, organisation_id: int = None):
         self.session = session
         self.agent_id = agent_id
-        self.organisation_id = self.__get_organisation_id()
+        self.organisation_id = organisation_id if organisation_id is not None else self.__get_organisation_id()
         self.model = model
 
     def __get_organisation_id(self):
@@ -78,7 +78,6 @@ class ResourceSummarizer:
         self.session.commit()
 
     def fetch_or_create_agent_resource_summary(self, default_summary: str):
-        print(self.__get_model_source())
         if ModelSourceType.GooglePalm.value in self.__get_model_source():
             return
         self.generate_agent_summary(generate_all=True)
@@ -1,7 +1,6 @@
 import json
 import requests
 from typing import Type, Optional,Union
-import time
 from superagi.helper.error_handler import ErrorHandler
 from superagi.lib.logger import logger
 from pydantic import BaseModel, Field
@@ -90,13 +89,15 @@ class DuckDuckGoSearchTool(BaseTool):
         """
 
         results=[]                                                                          #array to store objects with keys :{"title":snippet , "body":webpage content, "links":link URL}
-        i = 0
-        
-        for webpage in webpages:
-            results.append({"title": search_results[i]["title"], "body": webpage, "links": search_results[i]["href"]})
-            i += 1
-            if TokenCounter.count_text_tokens(json.dumps(results)) > 3000:
-                break    
+        tokens = 0
+
+        for i, webpage in enumerate(webpages):
+            result = {"title": search_results[i]["title"], "body": webpage, "links": search_results[i]["href"]}
+            results.append(result)
+            # the results are counted one by one instead of serializing all of them every time
+            tokens += TokenCounter.count_text_tokens(json.dumps(result))
+            if tokens > 3000:
+                break
 
         return results
 
@@ -111,19 +112,14 @@ class DuckDuckGoSearchTool(BaseTool):
         """
 
         webpages=[]                                                                         #webpages array for storing the contents extracted from the links
-        
+
         if links:
-            for i in range(0, MAX_LINKS_TO_SCRAPE):                                         #using first 3 (Value of MAX_LINKS_TO_SCRAPE) links
-                time.sleep(3)
-                content = WebpageExtractor().extract_with_bs4(links[i])                     #takes in the link and returns content extracted from Webpage extractor
-                max_length = len(' '.join(content.split(" ")[:500]))    
-                content = content[:max_length]                                              #formatting the content
-                attempts = 0
-                while content == "" and attempts < WEBPAGE_EXTRACTOR_MAX_ATTEMPTS:
-                    attempts += 1
-                    content = WebpageExtractor().extract_with_bs4(links[i])
-                    content = content[:max_length]
-                webpages.append(content)
+            # the first links (Value of MAX_LINKS_TO_SCRAPE) are fetched concurrently
+            contents = WebpageExtractor().extract_all_with_bs4(links[:MAX_LINKS_TO_SCRAPE],
+                                                               attempts=WEBPAGE_EXTRACTOR_MAX_ATTEMPTS + 1)
+            for content in contents:
+                max_length = len(' '.join(content.split(" ")[:500]))
+                webpages.append(content[:max_length])                                       #formatting the content
 
         return webpages
 
@@ -1,13 +1,17 @@
 import ast
+from concurrent.futures import ThreadPoolExecutor
 from typing import Type, Optional
 
 from pydantic import BaseModel, Field
+
+from superagi.config.config import get_config
 from superagi.helper.error_handler import ErrorHandler
 
 from superagi.helper.github_helper import GithubHelper
 from superagi.helper.json_cleaner import JsonCleaner
 from superagi.helper.prompt_reader import PromptReader
 from superagi.helper.token_counter import TokenCounter
+from superagi.lib.logger import logger
 from superagi.llms.base_llm import BaseLlm
 from superagi.models.agent import Agent
 from superagi.models.agent_execution import AgentExecution
@@ -74,23 +78,73 @@ class GithubReviewPullRequest(BaseTool):
             model_token_limit = TokenCounter(session=self.toolkit_config.session,
                                        organisation_id=organisation.id).token_limit(self.llm.get_model())
             pull_request_arr_parts = self.split_pull_request_content_into_multiple_parts(model_token_limit, pull_request_arr)
-            for content in pull_request_arr_parts:
-                self.run_code_review(github_helper, content, latest_commit_id, organisation, pull_request_number,
-                                     repository_name, repository_owner)
+
+            # the parts are reviewed concurrently and all their comments are posted as one review
+            comments = []
+            with ThreadPoolExecutor(max_workers=int(get_config("GITHUB_REVIEW_MAX_WORKERS", 4))) as executor:
+                results = executor.map(lambda content: self.run_code_review(content, model_token_limit),
+                                       pull_request_arr_parts)
+                for content, result in zip(pull_request_arr_parts, results):
+                    comments.extend(self.get_review_comments(content, result))
+
+            if comments and not self.post_review_comments(github_helper, repository_owner, repository_name,
+                                                          pull_request_number, latest_commit_id, comments):
+                return f"Error: Unable to add comments to the pull request {pull_request_number}"
             return "Added comments to the pull request:" + str(pull_request_number)
         except Exception as err:
             return f"Error: Unable to add comments to the pull request {err}"
 
-    def run_code_review(self, github_helper, content, latest_commit_id, organisation, pull_request_number,
-                        repository_name, repository_owner):
+    def post_review_comments(self, github_helper, repository_owner, repository_name, pull_request_number,
+                             commit_id, comments):
+        """
+        Posts the comments as one review. GitHub rejects the whole review when one of the comments is
+        rejected, in which case the comments are posted one by one.
+
+        Returns:
+            The number of comments posted.
+        """
+        if github_helper.add_review_to_pull_request(repository_owner, repository_name, pull_request_number,
+                                                    commit_id, comments) is not None:
+            return len(comments)
+
+        logger.warning("Review rejected, adding the comments one by one")
+        posted = 0
+        for comment in comments:
+            if github_helper.add_line_comment_to_pull_request(repository_owner, repository_name,
+                                                              pull_request_number, commit_id, comment["path"],
+                                                              comment["position"], comment["body"]) is not None:
+                posted += 1
+        return posted
+
+    def run_code_review(self, content, model_token_limit: int):
+        """
+        Reviews a part of the pull request diff with the llm. Runs in the review threads, so it does not
+        use the database session.
+
+        Args:
+            content: The part of the pull request diff.
+            model_token_limit: The token limit of the model.
+
+        Returns:
+            The llm response.
+        """
         prompt = PromptReader.read_tools_prompt(__file__, "code_review.txt")
         prompt = prompt.replace("{{DIFF_CONTENT}}", content)
         messages = [{"role": "system", "content": prompt}]
         total_tokens = TokenCounter.count_message_tokens(messages, self.llm.get_model())
-        token_limit = TokenCounter(session=self.toolkit_config.session,
-                                   organisation_id=organisation.id).token_limit(self.llm.get_model())
-        result = self.llm.chat_completion(messages, max_tokens=(token_limit - total_tokens - 100))
-        
+        return self.llm.chat_completion(messages, max_tokens=(model_token_limit - total_tokens - 100))
+
+    def get_review_comments(self, content, result):
+        """
+        Converts the llm review of a part of the pull request diff to review comments.
+
+        Args:
+            content: The part of the pull request diff.
+            result: The llm response.
+
+        Returns:
+            The review comments with their position in the diff.
+        """
         if 'error' in result and result['message'] is not None:
             ErrorHandler.handle_openai_errors(self.toolkit_config.session, self.agent_id, self.agent_execution_id, result['message'])
         response = result["content"]
@@ -99,36 +153,55 @@ class GithubReviewPullRequest(BaseTool):
         response = JsonCleaner.extract_json_section(response)
         comments = ast.literal_eval(response)
 
-        # Add comments in the pull request
+        review_comments = []
         for comment in comments['comments']:
-            line_number = self.get_exact_line_number(content, comment["file_path"], comment["line"])
-            github_helper.add_line_comment_to_pull_request(repository_owner, repository_name, pull_request_number,
-                                                           latest_commit_id, comment["file_path"], line_number,
-                                                           comment["comment"])
+            if comment["file_path"] not in content:
+                logger.warning(f"Skipping review comment on {comment['file_path']}, file not in the reviewed diff")
+                continue
+            position = self.get_exact_line_number(content, comment["file_path"], comment["line"])
+            if position is None:
+                logger.warning(f"Skipping review comment on {comment['file_path']}:{comment['line']}, "
+                               f"line not in the diff")
+                continue
+            review_comments.append({"path": comment["file_path"], "position": position, "body": comment["comment"]})
+        return review_comments
 
     def split_pull_request_content_into_multiple_parts(self, model_token_limit: int, pull_request_arr):
+        model = self.llm.get_model()
+        file_diffs = ["diff --git" + part for part in pull_request_arr if part.strip()]
+        # each file diff is tokenized once, without the overhead of a message
+        message_tokens = TokenCounter.count_message_tokens([{"role": "user", "content": ""}], model)
+        diff_tokens = [count - message_tokens for count in TokenCounter.count_each_message_tokens(
+            [{"role": "user", "content": file_diff} for file_diff in file_diffs], model)]
+
+        # we are using 60% of the model token limit
+        max_part_tokens = model_token_limit * 0.6 - message_tokens
         pull_request_arr_parts = []
         current_part = ""
-        for part in pull_request_arr:
-            total_tokens = TokenCounter.count_message_tokens([{"role": "user", "content": current_part}],
-                                                             self.llm.get_model())
-            # we are using 60% of the model token limit
-            if total_tokens >= model_token_limit * 0.6:
-                # Add the current part to pull_request_arr_parts and reset current_sum and current_part
+        current_tokens = 0
+        for file_diff, tokens in zip(file_diffs, diff_tokens):
+            if current_part and current_tokens + tokens > max_part_tokens:
                 pull_request_arr_parts.append(current_part)
-                current_part = "diff --git" + part
-            else:
-                current_part += "diff --git" + part
+                current_part = ""
+                current_tokens = 0
+            current_part += file_diff
+            current_tokens += tokens
 
         pull_request_arr_parts.append(current_part)
         return pull_request_arr_parts
 
     def get_exact_line_number(self, diff_content, file_path, line_number):
         last_content = diff_content[diff_content.index(file_path):]
-        last_content = last_content[last_content.index('@@'):]
-        return self.find_position_in_diff(last_content, line_number)
+        hunk_start = last_content.find('@@')
+        if hunk_start == -1:
+            return None
+        return self.find_position_in_diff(last_content[hunk_start:], line_number)
 
     def find_position_in_diff(self, diff_content, target_line):
+        """
+        Returns the position of the target line in the hunks of the file diff the content starts with,
+        or None when the line is not in its hunks.
+        """
         # Split the diff by lines and initialize variables
         diff_lines = diff_content.split('\n')
         position = 0
@@ -136,14 +209,20 @@ class GithubReviewPullRequest(BaseTool):
 
         # Loop through each line in the diff
         for line in diff_lines:
+            if line.startswith('diff --git'):
+                # The hunks of the next file start here
+                break
             position += 1  # Increment position for each line
             if line.startswith('@@'):
                 # Reset the current file line number when encountering a new hunk
                 current_file_line_number = int(line.split('+')[1].split(',')[0]) - 1
-            elif not line.startswith('-'):
-                # Increment the current file line number for lines that are not deletions
+                if current_file_line_number >= target_line:
+                    # The target line is between the hunks, it is not part of the diff
+                    return None
+            elif line.startswith(('+', ' ')):
+                # Increment the current file line number for added and context lines
                 current_file_line_number += 1
             if current_file_line_number >= target_line:
                 # Return the position when the target line number is reached
                 return position
-        return position
+        return None
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 
 class BaseEmbedding(ABC):
@@ -6,3 +7,24 @@ class BaseEmbedding(ABC):
     @abstractmethod
     def get_embedding(self, text):
         pass
+
+    def get_embeddings(self, texts: List[str]):
+        """
+        Embeds a list of texts. Models without a batch endpoint embed one text at a time.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            List[List[float]]: The embeddings in the order of the texts.
+
+        Raises:
+            ValueError: If the embedding of a text failed.
+        """
+        embeddings = []
+        for text in texts:
+            embedding = self.get_embedding(text)
+            if isinstance(embedding, dict) and "error" in embedding:
+                raise ValueError(f"Error in embedding model {embedding['error']}")
+            embeddings.append(embedding)
+        return embeddings
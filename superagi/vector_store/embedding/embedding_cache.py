@@ -0,0 +1,249 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+import redis
+
+from superagi.config.config import get_config
+from superagi.lib.logger import logger
+
+redis_url = get_config('REDIS_URL') or "localhost:6379"
+
+# Seconds during which a failing backend is skipped before it is tried again.
+BACKEND_RETRY_INTERVAL = 30
+
+
+class RedisEmbeddingStore:
+    """Embeddings shared by all processes, evicted by an idle timeout refreshed on every hit."""
+
+    KEY = "embedding:{}:{}"
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.client = redis.Redis.from_url("redis://" + redis_url + "/0")
+
+    def get_many(self, keys: List[tuple]) -> List[Optional[bytes]]:
+        redis_keys = [self.KEY.format(*key) for key in keys]
+        pipe = self.client.pipeline()
+        for redis_key in redis_keys:
+            pipe.getex(redis_key, ex=self.ttl)
+        return pipe.execute()
+
+    def put_many(self, items: dict):
+        pipe = self.client.pipeline()
+        for key, value in items.items():
+            pipe.set(self.KEY.format(*key), value, ex=self.ttl)
+        pipe.execute()
+
+
+class DiskEmbeddingStore:
+    """Embeddings kept in a local sqlite file, evicting the least recently used ones."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS embeddings "
+                                "(key TEXT PRIMARY KEY, vector BLOB, last_used REAL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)")
+        self.connection.commit()
+
+    def get_many(self, keys: List[tuple]) -> List[Optional[bytes]]:
+        db_keys = [":".join(key) for key in keys]
+        with self.lock:
+            rows = {}
+            for db_key in db_keys:
+                row = self.connection.execute("SELECT vector FROM embeddings WHERE key = ?", (db_key,)).fetchone()
+                if row is not None:
+                    rows[db_key] = row[0]
+            now = time.time()
+            self.connection.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                        [(now, db_key) for db_key in rows])
+            self.connection.commit()
+        return [rows.get(db_key) for db_key in db_keys]
+
+    def put_many(self, items: dict):
+        now = time.time()
+        with self.lock:
+            self.connection.executemany("INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                                        [(":".join(key), value, now) for key, value in items.items()])
+            count = self.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                self.connection.execute("DELETE FROM embeddings WHERE key IN "
+                                        "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                                        (count - self.max_entries,))
+            self.connection.commit()
+
+
+class EmbeddingCache:
+    """
+    Content addressed cache of embeddings keyed by (model, sha256(text)), shared by the agent memory,
+    the knowledge search and every other user of the embedding models.
+
+    Lookups go through an in-process LRU holding up to EMBEDDING_CACHE_MEMORY_BYTES of packed float32
+    vectors and then through the backend selected by EMBEDDING_CACHE_BACKEND: "redis" (default), "disk"
+    or "none". Hits and misses are counted per process and returned by stats().
+    """
+
+    _memory = OrderedDict()
+    _memory_bytes = 0
+    _dimensions = {}
+    _backend = None
+    _backend_retry_at = 0
+    _hits = 0
+    _misses = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def memory_limit(cls) -> int:
+        # every prefork worker keeps its own LRU, 16 MiB hold about 2,700 ada-002 vectors
+        return int(get_config("EMBEDDING_CACHE_MEMORY_BYTES", 16 * 1024 * 1024))
+
+    @classmethod
+    def _get_backend(cls):
+        if cls._backend is not None or time.monotonic() < cls._backend_retry_at:
+            return cls._backend
+        backend_type = str(get_config("EMBEDDING_CACHE_BACKEND", "redis")).lower()
+        try:
+            if backend_type == "redis":
+                cls._backend = RedisEmbeddingStore(int(get_config("EMBEDDING_CACHE_TTL", 7 * 24 * 3600)))
+            elif backend_type == "disk":
+                path = get_config("EMBEDDING_CACHE_PATH",
+                                  os.path.join(tempfile.gettempdir(), "superagi_embedding_cache.sqlite3"))
+                cls._backend = DiskEmbeddingStore(path, int(get_config("EMBEDDING_CACHE_MAX_ENTRIES", 100000)))
+        except Exception as e:
+            logger.warning(f"Unable to setup the embedding cache backend: {e}")
+            cls._backend_retry_at = time.monotonic() + BACKEND_RETRY_INTERVAL
+        return cls._backend
+
+    @classmethod
+    def _backend_call(cls, method: str, *args):
+        backend = cls._get_backend()
+        if backend is None:
+            return None
+        try:
+            return getattr(backend, method)(*args)
+        except (redis.RedisError, sqlite3.Error) as e:
+            logger.warning(f"Embedding cache backend unavailable: {e}")
+            cls._backend = None
+            cls._backend_retry_at = time.monotonic() + BACKEND_RETRY_INTERVAL
+            return None
+
+    @staticmethod
+    def build_key(model: str, text: str) -> tuple:
+        return str(model), hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def get_many(cls, model: str, texts: List[str]) -> List[Optional[list]]:
+        """
+        Fetches the cached embeddings of texts.
+
+        Args:
+            model (str): The embedding model.
+            texts (List[str]): The texts.
+
+        Returns:
+            List[Optional[list]]: The embeddings in the order of the texts, None for a miss.
+        """
+        keys = [cls.build_key(model, text) for text in texts]
+        results = [None] * len(keys)
+        backend_indices = []
+        with cls._lock:
+            for i, key in enumerate(keys):
+                value = cls._memory.get(key)
+                if value is None:
+                    backend_indices.append(i)
+                else:
+                    cls._memory.move_to_end(key)
+                    results[i] = np.frombuffer(value, dtype=np.float32).tolist()
+
+        if backend_indices:
+            values = cls._backend_call("get_many", [keys[i] for i in backend_indices]) or []
+            found = {}
+            for i, value in zip(backend_indices, values):
+                if value is not None:
+                    results[i] = np.frombuffer(value, dtype=np.float32).tolist()
+                    found[keys[i]] = value
+            cls._remember(found)
+
+        with cls._lock:
+            hits = sum(result is not None for result in results)
+            cls._hits += hits
+            cls._misses += len(results) - hits
+        return results
+
+    @classmethod
+    def put_many(cls, model: str, texts: List[str], embeddings: List[list]):
+        """
+        Stores the embeddings of texts.
+
+        Args:
+            model (str): The embedding model.
+            texts (List[str]): The texts.
+            embeddings (List[list]): The embeddings of the texts.
+        """
+        items = {cls.build_key(model, text): np.asarray(embedding, dtype=np.float32).tobytes()
+                 for text, embedding in zip(texts, embeddings)}
+        cls._remember(items)
+        cls._backend_call("put_many", items)
+
+    @classmethod
+    def _remember(cls, items: dict):
+        # vectors are kept packed, a list of python floats takes about 8 times the memory
+        with cls._lock:
+            for key, value in items.items():
+                previous = cls._memory.pop(key, None)
+                if previous is not None:
+                    cls._memory_bytes -= len(previous)
+                cls._memory[key] = value
+                cls._memory_bytes += len(value)
+            while cls._memory and cls._memory_bytes > cls.memory_limit():
+                _, value = cls._memory.popitem(last=False)
+                cls._memory_bytes -= len(value)
+
+    @classmethod
+    def get_dimension(cls, embedding_model) -> Optional[int]:
+        """
+        Returns the dimension of the vectors of an embedding model, embedding a sample text only
+        the first time a model is seen.
+
+        Args:
+            embedding_model: The embedding model.
+
+        Returns:
+            int: The dimension or None if the model returned an error.
+        """
+        model = getattr(embedding_model, "model", None)
+        if model in cls._dimensions:
+            return cls._dimensions[model]
+        embedding = embedding_model.get_embedding("sample")
+        if isinstance(embedding, dict) and "error" in embedding:
+            logger.error(f"Error in embedding model {embedding}")
+            return None
+        with cls._lock:
+            cls._dimensions[model] = len(embedding)
+        return cls._dimensions[model]
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            total = cls._hits + cls._misses
+            return {"hits": cls._hits, "misses": cls._misses,
+                    "hit_rate": cls._hits / total if total else 0.0,
+                    "memory_entries": len(cls._memory), "memory_bytes": cls._memory_bytes}
+
+    @classmethod
+    def clear(cls):
+        """Clears the in-process entries and metrics, the backend is left untouched."""
+        with cls._lock:
+            cls._memory.clear()
+            cls._memory_bytes = 0
+            cls._dimensions.clear()
+            cls._hits = 0
+            cls._misses = 0
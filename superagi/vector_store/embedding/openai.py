@@ -1,7 +1,18 @@
+from typing import List
+
 import openai
 
+from superagi.apm.step_tracer import StepTracer, EMBEDDING_SPAN
+from superagi.config.config import get_config
+from superagi.helper.token_counter import TokenCounter
+from superagi.vector_store.embedding.base import BaseEmbedding
+from superagi.vector_store.embedding.embedding_cache import EmbeddingCache
+
+MAX_BATCH_SIZE = 2048  # Maximum number of inputs accepted by the embeddings endpoint
+MAX_BATCH_TOKENS = 100000
 
-class OpenAiEmbedding:
+
+class OpenAiEmbedding(BaseEmbedding):
     def __init__(self, api_key, model="text-embedding-ada-002"):
         self.model = model
         self.api_key = api_key
@@ -19,13 +30,81 @@ class OpenAiEmbedding:
 
                
     def get_embedding(self, text):
+        cached_embedding = EmbeddingCache.get_many(self.model, [text])[0]
+        if cached_embedding is not None:
+            return cached_embedding
         try:
             # openai.api_key = get_config("OPENAI_API_KEY")
-            response = openai.Embedding.create(
-                api_key=self.api_key,
-                input=[text],
-                engine=self.model
-            )
-            return response['data'][0]['embedding']
+            with StepTracer.span(EMBEDDING_SPAN):
+                response = openai.Embedding.create(
+                    api_key=self.api_key,
+                    input=[text],
+                    engine=self.model
+                )
+            embedding = response['data'][0]['embedding']
+            EmbeddingCache.put_many(self.model, [text], [embedding])
+            return embedding
         except Exception as exception:
             return {"error": exception}
+
+    def get_embeddings(self, texts: List[str]):
+        """
+        Embeds a list of texts with one request per batch of texts missing from the embedding cache.
+        Batches are limited to MAX_BATCH_SIZE texts and EMBEDDING_BATCH_TOKEN_LIMIT tokens.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            List[List[float]]: The embeddings in the order of the texts.
+
+        Raises:
+            Exception: The error of the embeddings endpoint when a batch fails. The batches embedded before
+                are kept in the embedding cache.
+        """
+        embeddings = EmbeddingCache.get_many(self.model, texts)
+        missing_texts = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+        if not missing_texts:
+            return embeddings
+        new_embeddings = []
+        for batch in self.split_batches(missing_texts):
+            with StepTracer.span(EMBEDDING_SPAN):
+                response = openai.Embedding.create(
+                    api_key=self.api_key,
+                    input=batch,
+                    engine=self.model
+                )
+            data = sorted(response['data'], key=lambda item: item['index'])
+            batch_embeddings = [item['embedding'] for item in data]
+            EmbeddingCache.put_many(self.model, batch, batch_embeddings)
+            new_embeddings.extend(batch_embeddings)
+        new_embeddings = dict(zip(missing_texts, new_embeddings))
+        return [embedding if embedding is not None else new_embeddings[text]
+                for text, embedding in zip(texts, embeddings)]
+
+    @classmethod
+    def split_batches(cls, texts: List[str]) -> List[List[str]]:
+        """
+        Splits texts into consecutive batches that fit the request limits of the embeddings endpoint.
+
+        Args:
+            texts (List[str]): The texts to split.
+
+        Returns:
+            List[List[str]]: The batches.
+        """
+        token_limit = int(get_config("EMBEDDING_BATCH_TOKEN_LIMIT", MAX_BATCH_TOKENS))
+        batches = []
+        batch = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = TokenCounter.count_content_tokens(text)
+            if batch and (len(batch) >= MAX_BATCH_SIZE or batch_tokens + tokens > token_limit):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
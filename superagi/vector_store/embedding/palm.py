@@ -1,15 +1,24 @@
 import openai
 import google.generativeai as palm
 
+from superagi.apm.step_tracer import StepTracer, EMBEDDING_SPAN
+from superagi.vector_store.embedding.base import BaseEmbedding
+from superagi.vector_store.embedding.embedding_cache import EmbeddingCache
 
-class PalmEmbedding:
+
+class PalmEmbedding(BaseEmbedding):
     def __init__(self, api_key, model="models/embedding-gecko-001"):
         self.model = model
         self.api_key = api_key
 
     def get_embedding(self, text):
+        cached_embedding = EmbeddingCache.get_many(self.model, [text])[0]
+        if cached_embedding is not None:
+            return cached_embedding
         try:
-            response = palm.generate_embeddings(model=self.model, text=text)
+            with StepTracer.span(EMBEDDING_SPAN):
+                response = palm.generate_embeddings(model=self.model, text=text)
+            EmbeddingCache.put_many(self.model, [text], [response['embedding']])
             return response['embedding']
         except Exception as exception:
             return {"error": exception}
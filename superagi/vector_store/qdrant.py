@@ -129,7 +129,7 @@ class Qdrant(VectorStore):
         if embedding is not None and text is not None:
             raise ValueError("Only provide embedding or text")
         if text is not None:
-            embedding = self.__get_embeddings(text)[0]
+            embedding = self.__get_embeddings([text])[0]
 
         if metadata is not None:
             filter_conditions = []
@@ -205,10 +205,7 @@ class Qdrant(VectorStore):
     ) -> List[List[float]]:
         """Return embeddings for a list of texts using the embedding model."""
         if self.embedding_model is not None:
-            query_vectors = []
-            for text in texts:
-                query_vector = self.embedding_model.get_embedding(text)
-                query_vectors.append(query_vector)
+            query_vectors = self.embedding_model.get_embeddings(list(texts))
         else:
             raise ValueError("Embedding model is not set")
         
@@ -13,12 +13,18 @@ from superagi.config.config import get_config
 from superagi.lib.logger import logger
 from superagi.vector_store.base import VectorStore
 from superagi.vector_store.document import Document
+from superagi.vector_store.embedding.embedding_cache import EmbeddingCache
 
 DOC_PREFIX = "doc:"
 
 CONTENT_KEY = "content"
 METADATA_KEY = "metadata"
 VECTOR_SCORE_KEY = "vector_score"
+# Metadata fields stored as TAG fields so that filtered KNN queries are resolved by the index.
+INDEXED_METADATA_FIELDS = ("agent_execution_id", "agent_id")
+PIPELINE_BATCH_SIZE = 500
+# Set once the documents written before the TAG fields existed have them filled from their metadata.
+TAG_FIELDS_BACKFILLED_KEY = "vector_index_tag_fields_backfilled:{}"
 
 
 class Redis(VectorStore):
@@ -34,6 +40,9 @@ class Redis(VectorStore):
 
     DEFAULT_ESCAPED_CHARS = r"[,.<>{}\[\]\\\"\':;!@#$%^&*()\-+=~\/ ]"
 
+    # Indexes known to exist with the current schema, keyed by (redis url, index name).
+    _existing_indexes = set()
+
     def __init__(self, index: Any, embedding_model: Any):
         """
         Args:
@@ -41,7 +50,8 @@ class Redis(VectorStore):
         embedding_model: An instance of a BaseEmbedding model.
         vector_group_id: vector group id used to index similar vectors.
         """
-        redis_url = get_config('REDIS_URL')
+        redis_url = get_config('REDIS_URL') or "localhost:6379"
+        self.redis_url = redis_url
         self.redis_client = redis.Redis.from_url("redis://" + redis_url + "/0", decode_responses=True)
         # self.redis_client = redis.Redis(host=redis_host, port=redis_port)
         self.index = index
@@ -60,19 +70,28 @@ class Redis(VectorStore):
                   embeddings: Optional[List[List[float]]] = None,
                   ids: Optional[list[str]] = None,
                   **kwargs: Any) -> List[str]:
-        pipe = self.redis_client.pipeline()
+        pipe = self.redis_client.pipeline(transaction=False)
         prefix = DOC_PREFIX + str(self.index)
         keys = []
+        texts = list(texts)
+        if embeddings is None:
+            embeddings = self.embedding_model.get_embeddings(texts)
         for i, text in enumerate(texts):
             id = ids[i] if ids else self.build_redis_key(prefix)
             metadata = metadatas[i] if metadatas else {}
-            embedding = self.embedding_model.get_embedding(text)
+            embedding = embeddings[i]
             embedding_arr = np.array(embedding, dtype=np.float32)
 
-            pipe.hset(id, mapping={CONTENT_KEY: text, self.vector_key: embedding_arr.tobytes(),
-                                   METADATA_KEY: json.dumps(metadata)})
+            mapping = {CONTENT_KEY: text, self.vector_key: embedding_arr.tobytes(),
+                       METADATA_KEY: json.dumps(metadata)}
+            for field in INDEXED_METADATA_FIELDS:
+                if metadata.get(field) is not None:
+                    mapping[field] = str(metadata[field])
+            pipe.hset(id, mapping=mapping)
 
             keys.append(id)
+            if len(pipe) >= PIPELINE_BATCH_SIZE:
+                pipe.execute()
         pipe.execute()
         return keys
 
@@ -115,41 +134,150 @@ class Redis(VectorStore):
         
 
     def _convert_to_redis_filters(self, metadata: Optional[dict] = None) -> str:
-        if metadata is not None or len(metadata) == 0:
+        if not metadata:
             return "*"
         filter_strings = []
         for key in metadata.keys():
+            if key not in INDEXED_METADATA_FIELDS:
+                logger.warning(f"Ignoring filter on {key}, only {INDEXED_METADATA_FIELDS} are indexed")
+                continue
             filter_string = "@%s:{%s}" % (key, self.escape_token(str(metadata[key])))
             filter_strings.append(filter_string)
+        if not filter_strings:
+            return "*"
 
-        joined_filter_strings = " & ".join(filter_strings)
+        joined_filter_strings = " ".join(filter_strings)
         return f"({joined_filter_strings})"
 
+    @classmethod
+    def vector_index_attributes(cls) -> tuple:
+        """
+        Returns the vector index algorithm and its attributes from the config. REDIS_VECTOR_INDEX_TYPE
+        selects FLAT or HNSW, the latter tuned by REDIS_HNSW_M, REDIS_HNSW_EF_CONSTRUCTION and
+        REDIS_HNSW_EF_RUNTIME.
+
+        Returns:
+            tuple: The algorithm and the attributes other than the dimension.
+        """
+        algorithm = str(get_config("REDIS_VECTOR_INDEX_TYPE", "HNSW")).upper()
+        attributes = {"TYPE": "FLOAT32", "DISTANCE_METRIC": "COSINE"}
+        if algorithm == "HNSW":
+            attributes.update({"M": int(get_config("REDIS_HNSW_M", 16)),
+                               "EF_CONSTRUCTION": int(get_config("REDIS_HNSW_EF_CONSTRUCTION", 200)),
+                               "EF_RUNTIME": int(get_config("REDIS_HNSW_EF_RUNTIME", 10))})
+        return algorithm, attributes
+
     def create_index(self):
+        """
+        Creates the index if it does not exist. An existing index gets the metadata TAG fields it lacks
+        and its documents are backfilled with them. When its vector algorithm differs from
+        REDIS_VECTOR_INDEX_TYPE, the index is rebuilt over the same documents if REDIS_VECTOR_INDEX_REBUILD
+        is set and kept as it is with a warning otherwise.
+        """
+        index_key = (self.redis_url, self.index)
+        if index_key in Redis._existing_indexes:
+            return
         try:
             # check to see if index exists
-            temp = self.redis_client.ft(self.index).info()
-            logger.info(temp)
+            index_info = self.redis_client.ft(self.index).info()
             logger.info("Index already exists!")
-        except:
-            vector_dimensions = self.embedding_model.get_embedding("sample")
-            # schema
-            schema = (
-                TagField("tag"),  # Tag Field Name
-                VectorField(self.vector_key,  # Vector Field Name
-                            "FLAT", {  # Vector Index Type: FLAT or HNSW
-                                "TYPE": "FLOAT32",  # FLOAT32 or FLOAT64
-                                "DIM": len(vector_dimensions),  # Number of Vector Dimensions
-                                "DISTANCE_METRIC": "COSINE",  # Vector Search Distance Metric
-                            }
-                            )
-            )
+        except redis.ResponseError:
+            self._create_index()
+        else:
+            if not self._rebuild_if_algorithm_changed(index_info):
+                self._add_missing_tag_fields(index_info)
+        self._backfill_tag_fields()
+        Redis._existing_indexes.add(index_key)
+
+    def _create_index(self):
+        algorithm, attributes = self.vector_index_attributes()
+        attributes["DIM"] = EmbeddingCache.get_dimension(self.embedding_model)
+        # schema
+        schema = (
+            TagField("tag"),  # Tag Field Name
+            *[TagField(field) for field in INDEXED_METADATA_FIELDS],
+            VectorField(self.vector_key, algorithm, attributes)
+        )
+
+        # index Definition
+        definition = IndexDefinition(prefix=[DOC_PREFIX], index_type=IndexType.HASH)
 
-            # index Definition
-            definition = IndexDefinition(prefix=[DOC_PREFIX], index_type=IndexType.HASH)
+        # create Index
+        self.redis_client.ft(self.index).create_index(fields=schema, definition=definition)
 
-            # create Index
-            self.redis_client.ft(self.index).create_index(fields=schema, definition=definition)
+    @staticmethod
+    def _index_attributes(index_info: dict) -> List[dict]:
+        return [{str(name).lower(): value for name, value in zip(attribute[::2], attribute[1::2])}
+                for attribute in index_info.get("attributes", [])]
+
+    def _rebuild_if_algorithm_changed(self, index_info: dict) -> bool:
+        """
+        Compares the vector algorithm of an existing index with the configured one.
+
+        Returns:
+            bool: True if the index was rebuilt.
+        """
+        algorithm, _ = self.vector_index_attributes()
+        current_algorithm = next((str(attribute.get("algorithm")).upper()
+                                  for attribute in self._index_attributes(index_info)
+                                  if str(attribute.get("identifier")) == self.vector_key
+                                  and attribute.get("algorithm") is not None), None)
+        if current_algorithm is None or current_algorithm == algorithm:
+            return False
+        if str(get_config("REDIS_VECTOR_INDEX_REBUILD", False)).lower() not in ("true", "1"):
+            logger.warning(f"Index {self.index} uses {current_algorithm} instead of {algorithm}, "
+                           f"set REDIS_VECTOR_INDEX_REBUILD to rebuild it")
+            return False
+        logger.info(f"Rebuilding index {self.index} from {current_algorithm} to {algorithm}")
+        # the documents are kept and indexed again in the background by redis
+        self.redis_client.ft(self.index).dropindex(delete_documents=False)
+        self._create_index()
+        return True
+
+    def _add_missing_tag_fields(self, index_info: dict):
+        """Adds the metadata TAG fields to an index created before they were introduced."""
+        indexed_fields = {str(attribute.get("identifier")) for attribute in self._index_attributes(index_info)}
+        missing_fields = [field for field in INDEXED_METADATA_FIELDS if field not in indexed_fields]
+        if missing_fields:
+            logger.info(f"Adding {missing_fields} to index {self.index}")
+            for field in missing_fields:
+                self.redis_client.ft(self.index).alter_schema_add([TagField(field)])
+
+    def _backfill_tag_fields(self):
+        """
+        Fills the metadata TAG fields of the documents written before they were introduced from their
+        metadata, so that the filtered queries keep finding them. Runs once per index.
+        """
+        backfilled_key = TAG_FIELDS_BACKFILLED_KEY.format(self.index)
+        if self.redis_client.get(backfilled_key):
+            return
+        keys = []
+        for key in self.redis_client.scan_iter(match=DOC_PREFIX + "*", count=PIPELINE_BATCH_SIZE):
+            keys.append(key)
+            if len(keys) >= PIPELINE_BATCH_SIZE:
+                self._backfill_documents(keys)
+                keys = []
+        if keys:
+            self._backfill_documents(keys)
+        self.redis_client.set(backfilled_key, "1")
+
+    def _backfill_documents(self, keys: List[str]):
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hmget(key, METADATA_KEY, *INDEXED_METADATA_FIELDS)
+        values = pipe.execute()
+        for key, (metadata, *fields) in zip(keys, values):
+            if metadata is None or all(field is not None for field in fields):
+                continue
+            try:
+                metadata = json.loads(metadata)
+            except ValueError:
+                continue
+            mapping = {field: str(metadata[field]) for field in INDEXED_METADATA_FIELDS
+                       if isinstance(metadata, dict) and metadata.get(field) is not None}
+            if mapping:
+                pipe.hset(key, mapping=mapping)
+        pipe.execute()
 
     def escape_token(self, value: str) -> str:
         """
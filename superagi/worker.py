@@ -8,6 +8,7 @@ from superagi.lib.logger import logger
 
 from datetime import timedelta
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from superagi.config.config import get_config
 from superagi.helper.agent_schedule_helper import AgentScheduleHelper
@@ -17,7 +18,10 @@ from superagi.models.db import connect_db
 from superagi.types.model_source_types import ModelSourceType
 
 from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from superagi.jobs.step_scheduler import StepScheduler
 from superagi.models.agent_execution import AgentExecution
+from superagi.models.agent_execution_permission import AgentExecutionPermission
 from superagi.helper.webhook_manager import WebHookManager
 
 redis_url = get_config('REDIS_URL', 'super__redis:6379')
@@ -34,18 +38,66 @@ beat_schedule = {
         'task': 'initialize-schedule-agent',
         'schedule': timedelta(minutes=5),
     },
+    'execute_due_wait_steps': {
+        'task': 'execute_due_wait_steps',
+        'schedule': timedelta(seconds=int(get_config('WAIT_STEP_POLL_INTERVAL', 5))),
+    },
     'execute_waiting_workflows': {
         'task': 'execute_waiting_workflows',
-        'schedule': timedelta(minutes=2),
+        'schedule': timedelta(minutes=10),
     },
 }
 app.conf.beat_schedule = beat_schedule
 
+@worker_process_init.connect
+def reset_db_connection_pool(**kwargs):
+    """Drop connections inherited from the parent process so that every forked worker owns its pool."""
+    from superagi.models import db
+    if db.engine is not None:
+        db.engine.dispose()
+
+
+@worker_process_shutdown.connect
+def flush_telemetry(**kwargs):
+    """Store the buffered events and call logs, forked workers exit without running atexit handlers."""
+    from superagi.apm.telemetry_writer import TelemetryWriter
+    TelemetryWriter.shutdown()
+
+
 @event.listens_for(AgentExecution.status, "set")
 def agent_status_change(target, val,old_val,initiator):
     if not hasattr(sys, '_called_from_test'):
         webhook_callback.delay(target.id,val,old_val)
 
+@event.listens_for(AgentExecutionPermission.status, "set")
+def agent_execution_permission_status_change(target, val, old_val, initiator):
+    """Remember the execution blocked on an answered permission, it is woken once the answer is committed."""
+    if val in ("APPROVED", "REJECTED") and val != old_val:
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault("answered_permission_executions", set()).add(target.agent_execution_id)
+
+
+@event.listens_for(Session, "after_commit")
+def wake_permission_blocked_executions(session):
+    agent_execution_ids = session.info.pop("answered_permission_executions", set())
+    if hasattr(sys, '_called_from_test'):
+        return
+    for agent_execution_id in agent_execution_ids:
+        StepScheduler.wake(agent_execution_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_permission_wakeups(session):
+    session.info.pop("answered_permission_executions", None)
+
+@app.task(name="execute_due_wait_steps")
+def execute_due_wait_steps():
+    """Resume the executions whose wait step is over."""
+
+    from superagi.jobs.agent_executor import AgentExecutor
+    AgentExecutor().execute_due_wait_steps()
+
 @app.task(name="execute_waiting_workflows", autoretry_for=(Exception,), retry_backoff=2, max_retries=5)
 def execute_waiting_workflows():
     """Check if wait time of wait workflow step is over and can be resumed."""
@@ -67,9 +119,11 @@ def initialize_schedule_agent_task():
 def execute_agent(agent_execution_id: int, time):
     """Execute an agent step in background."""
     from superagi.jobs.agent_executor import AgentExecutor
+    from superagi.apm.step_tracer import StepTracer
+    queue_wait_ms = StepTracer.queue_wait_ms(time, execute_agent.request.eta)
     handle_tools_import()
-    logger.info("Execute agent:" + str(time) + "," + str(agent_execution_id))
-    AgentExecutor().execute_next_step(agent_execution_id=agent_execution_id)
+    logger.info("Execute agent:", time, agent_execution_id)
+    AgentExecutor().execute_next_step(agent_execution_id=agent_execution_id, queue_wait_ms=queue_wait_ms)
 
 
 @app.task(name="summarize_resource", autoretry_for=(Exception,), retry_backoff=2, max_retries=5,serializer='pickle')
@@ -97,7 +151,7 @@ def summarize_resource(agent_id: int, resource_id: int):
     else:
         documents = ResourceManager(str(agent_id)).create_llama_document(file_path)
 
-    logger.info("Summarize resource:" + str(agent_id) + "," + str(resource_id))
+    logger.info("Summarize resource:", agent_id, resource_id)
     resource_summarizer = ResourceSummarizer(session=session, agent_id=agent_id, model=agent_config["model"])
     resource_summarizer.add_to_vector_store_and_create_summary(resource_id=resource_id,
                                                                documents=documents)
@@ -41,14 +41,16 @@ class TestWeaviate(unittest.TestCase):
         self.embedding_model.get_embedding.assert_called_once_with('query')
 
     def test_add_texts(self):
-        self.embedding_model.get_embedding.return_value = 'vector'
+        self.embedding_model.get_embeddings.return_value = ['vector1', 'vector2']
         self.weaviateVectorStore.add_embeddings_to_vector_db = Mock()
         texts = ['text1', 'text2']
         result = self.weaviateVectorStore.add_texts(texts)
         self.assertEqual(len(result), 2)    # We expect to get 2 IDs.
         self.assertTrue(isinstance(result[0], str))    # The IDs should be strings.
-        self.embedding_model.get_embedding.assert_has_calls([call(texts[0]), call(texts[1])])
-        self.assertEqual(self.weaviateVectorStore.add_embeddings_to_vector_db.call_count, 2)
+        self.embedding_model.get_embeddings.assert_called_once_with(texts)
+        self.weaviateVectorStore.add_embeddings_to_vector_db.assert_called_once_with(
+            {"ids": result, "data_object": [{'text_field': 'text1'}, {'text_field': 'text2'}],
+             "vectors": ['vector1', 'vector2']})
 
     def test_add_embeddings_to_vector_db(self):
         embeddings = {'ids': ['id1', 'id2'], 'data_object': [{'field': 'value1'}, {'field': 'value2'}], 'vectors': ['v1', 'v2']}
@@ -1,7 +1,12 @@
 import pytest
 from unittest.mock import patch, Mock
 
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
 from superagi.agent.agent_message_builder import AgentLlmMessageBuilder
+from superagi.models.agent_execution import AgentExecution
+from superagi.models.agent_execution_config import AgentExecutionConfiguration
 from superagi.models.agent_execution_feed import AgentExecutionFeed
 
 
@@ -41,41 +46,125 @@ def test_build_agent_messages(mock_get_config, mock_token_limit):
         assert feed_obj.feed == messages[i]["content"]
         assert feed_obj.role == messages[i]["role"]
 
-@patch('superagi.models.agent_execution_config.AgentExecutionConfiguration.fetch_value')
-@patch('superagi.models.agent_execution_config.AgentExecutionConfiguration.add_or_update_agent_execution_config')
 @patch('superagi.agent.agent_message_builder.AgentLlmMessageBuilder._build_prompt_for_recursive_ltm_summary_using_previous_ltm_summary')
 @patch('superagi.agent.agent_message_builder.AgentLlmMessageBuilder._build_prompt_for_ltm_summary')
-@patch('superagi.helper.token_counter.TokenCounter.count_text_tokens')
-@patch('superagi.helper.token_counter.TokenCounter.token_limit')
-def test_build_ltm_summary(mock_token_limit, mock_count_text_tokens, mock_build_prompt_for_ltm_summary,
-                           mock_build_prompt_for_recursive_ltm_summary, mock_add_or_update_agent_execution_config,
-                           mock_fetch_value):
+def test_summarize_block(mock_build_prompt_for_ltm_summary, mock_build_prompt_for_recursive_ltm_summary):
     mock_session = Mock()
     llm = Mock()
-    llm_model = Mock()
-    agent_id = 1
-    agent_execution_id = 1
-
-    builder = AgentLlmMessageBuilder(mock_session, llm, llm_model, agent_id, agent_execution_id)
+    builder = AgentLlmMessageBuilder(mock_session, llm, Mock(), 1, 1)
 
-    past_messages = [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi"}]
-    output_token_limit = 100
-
-    mock_token_limit.return_value = 1000
-    mock_count_text_tokens.return_value = 200
+    block = [{"role": "user", "content": "Hello", "chat_id": 3}, {"role": "assistant", "content": "Hi", "chat_id": 4}]
     mock_build_prompt_for_ltm_summary.return_value = "ltm_summary_prompt"
     mock_build_prompt_for_recursive_ltm_summary.return_value = "recursive_ltm_summary_prompt"
-    mock_fetch_value.return_value = Mock(value="ltm_summary")
     llm.chat_completion.return_value = {"content": "ltm_summary"}
 
-    ltm_summary = builder._build_ltm_summary(past_messages, output_token_limit)
+    assert builder._summarize_block(None, block, 100, 1000) == "ltm_summary"
+    llm.chat_completion.assert_called_once_with([{"role": "system", "content": "You are GPT Prompt writer"},
+                                                 {"role": "assistant", "content": "ltm_summary_prompt"}])
 
-    assert ltm_summary == "ltm_summary"
+    assert builder._summarize_block("previous", block, 100, 1000) == "ltm_summary"
+    assert llm.chat_completion.call_args.args[0][1]["content"] == "recursive_ltm_summary_prompt"
 
-    mock_add_or_update_agent_execution_config.assert_called_once()
 
-    llm.chat_completion.assert_called_once_with([{"role": "system", "content": "You are GPT Prompt writer"},
-                                                 {"role": "assistant", "content": "ltm_summary_prompt"}])
+@pytest.fixture
+def feed_session():
+    engine = create_engine("sqlite://")
+    tables = [AgentExecution.__table__, AgentExecutionFeed.__table__, AgentExecutionConfiguration.__table__]
+    AgentExecution.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    with patch('superagi.helper.feed_publisher.FeedPublisher.publish'):
+        session.add(AgentExecution(id=1, agent_id=1, current_feed_group_id="DEFAULT"))
+        for role in ("system", "user"):
+            session.add(AgentExecutionFeed(agent_execution_id=1, agent_id=1, feed="prompt", role=role,
+                                           feed_group_id="DEFAULT", token_count=1))
+        session.commit()
+    yield session
+    session.close()
+
+
+def add_feed(session, content, feed_group_id="DEFAULT"):
+    session.add(AgentExecutionFeed(agent_execution_id=1, agent_id=1, feed=content, role="assistant",
+                                   feed_group_id=feed_group_id, token_count=3))
+    session.commit()
+
+
+@patch('superagi.helper.feed_publisher.FeedPublisher.publish')
+@patch('superagi.models.agent.Agent.find_org_by_agent_id')
+@patch('superagi.agent.agent_message_builder.get_config', return_value=4)
+@patch('superagi.agent.agent_message_builder.AgentLlmMessageBuilder._build_prompt_for_recursive_ltm_summary_using_previous_ltm_summary')
+@patch('superagi.agent.agent_message_builder.AgentLlmMessageBuilder._build_prompt_for_ltm_summary')
+def test_build_history_summarizes_evicted_feeds_in_blocks(mock_build_prompt_for_ltm_summary,
+                                                          mock_build_prompt_for_recursive_ltm_summary,
+                                                          mock_get_config, mock_find_org_by_agent_id, mock_publish,
+                                                          feed_session):
+    llm = Mock()
+    llm.chat_completion.side_effect = [{"content": "summary 1"}, {"content": "summary 2"}]
+    builder = AgentLlmMessageBuilder(feed_session, llm, "gpt-4", 1, 1)
+    # every feed takes 3 + 3 + 3 tokens with the per message overhead of gpt-4, 5 feeds fit in 45 tokens
+    for index in range(6):
+        add_feed(feed_session, f"feed {index}")
+
+    ltm_summary, current_messages = builder._build_history(45, 100, 8000)
+
+    # one feed overflows, a whole block of 4 feeds is evicted
+    assert ltm_summary == "summary 1"
+    assert [message["content"] for message in current_messages] == ["feed 4", "feed 5"]
+    past_messages = mock_build_prompt_for_ltm_summary.call_args.kwargs["past_messages"]
+    assert [message["content"] for message in past_messages] == [f"feed {index}" for index in range(4)]
+
+    for index in range(6, 9):
+        add_feed(feed_session, f"feed {index}")
+        ltm_summary, current_messages = builder._build_history(45, 100, 8000)
+        assert ltm_summary == "summary 1"
+    assert llm.chat_completion.call_count == 1
+
+    add_feed(feed_session, "feed 9")
+    ltm_summary, current_messages = builder._build_history(45, 100, 8000)
+    assert ltm_summary == "summary 2"
+    assert [message["content"] for message in current_messages] == ["feed 8", "feed 9"]
+    past_messages = mock_build_prompt_for_recursive_ltm_summary.call_args.kwargs["past_messages"]
+    assert [message["content"] for message in past_messages] == [f"feed {index}" for index in range(4, 8)]
+    assert mock_build_prompt_for_recursive_ltm_summary.call_args.kwargs["previous_ltm_summary"] == "summary 1"
+
+
+
+@patch('superagi.helper.feed_publisher.FeedPublisher.publish')
+@patch('superagi.models.agent.Agent.find_org_by_agent_id')
+@patch('superagi.agent.agent_message_builder.get_config', return_value=4)
+@patch('superagi.agent.agent_message_builder.AgentLlmMessageBuilder._build_prompt_for_recursive_ltm_summary_using_previous_ltm_summary')
+@patch('superagi.agent.agent_message_builder.AgentLlmMessageBuilder._build_prompt_for_ltm_summary')
+def test_build_history_ignores_summary_of_previous_feed_group(mock_build_prompt_for_ltm_summary,
+                                                              mock_build_prompt_for_recursive_ltm_summary,
+                                                              mock_get_config, mock_find_org_by_agent_id,
+                                                              mock_publish, feed_session):
+    llm = Mock()
+    llm.chat_completion.side_effect = [{"content": "summary 1"}, {"content": "task summary"}]
+    builder = AgentLlmMessageBuilder(feed_session, llm, "gpt-4", 1, 1)
+    for index in range(6):
+        add_feed(feed_session, f"feed {index}")
+    assert builder._build_history(45, 100, 8000)[0] == "summary 1"
+
+    # the queue starts the next task in a new feed group
+    feed_session.query(AgentExecution).filter(AgentExecution.id == 1).update({"current_feed_group_id": "GROUP_1"})
+    feed_session.commit()
+    for index in range(2):
+        add_feed(feed_session, f"task feed {index}", feed_group_id="GROUP_1")
+
+    ltm_summary, current_messages = builder._build_history(45, 100, 8000)
+
+    assert ltm_summary is None
+    assert [message["content"] for message in current_messages] == ["task feed 0", "task feed 1"]
+
+    for index in range(2, 6):
+        add_feed(feed_session, f"task feed {index}", feed_group_id="GROUP_1")
+    ltm_summary, current_messages = builder._build_history(45, 100, 8000)
+
+    assert ltm_summary == "task summary"
+    mock_build_prompt_for_recursive_ltm_summary.assert_not_called()
+    past_messages = mock_build_prompt_for_ltm_summary.call_args.kwargs["past_messages"]
+    assert [message["content"] for message in past_messages] == [f"task feed {index}" for index in range(4)]
+    assert AgentExecutionConfiguration.fetch_value(feed_session, 1, "ltm_summary_feed_group_id").value == "GROUP_1"
+
 
 @patch('superagi.helper.prompt_reader.PromptReader.read_agent_prompt')
 def test_build_prompt_for_ltm_summary(mock_read_agent_prompt):
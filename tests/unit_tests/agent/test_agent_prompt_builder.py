@@ -82,4 +82,20 @@ def test_replace_task_based_variables(mock_count_message_tokens):
     assert "task3" in result
     assert "task3" in result
     assert "response1" in result
-    assert "response2" in result
\ No newline at end of file
+    assert "response2" in result
+
+def test_generate_tool_string_renders_args_schema_once():
+    class CachedTool(BaseTool):
+        name: str = "Cached Tool"
+        description: str = "A tool"
+
+        def _execute(self, query: str):
+            return query
+
+    with patch('superagi.agent.agent_prompt_builder.json.dumps', return_value='{"query": {}}') as mock_dumps:
+        first = AgentPromptBuilder._generate_tool_string(CachedTool())
+        second = AgentPromptBuilder._generate_tool_string(CachedTool(description="Another tool"))
+
+    assert first == '"Cached Tool": A tool, args json schema: {"query": {}}'
+    assert second == '"Cached Tool": Another tool, args json schema: {"query": {}}'
+    assert mock_dumps.call_count == 1
@@ -0,0 +1,64 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from superagi.agent.agent_runtime_config import AgentRuntimeConfig
+from superagi.models.agent import Agent
+from superagi.models.agent_config import AgentConfiguration
+from superagi.models.agent_execution_config import AgentExecutionConfiguration
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    tables = [AgentConfiguration.__table__, AgentExecutionConfiguration.__table__]
+    AgentConfiguration.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_build_merges_agent_execution_and_model_config():
+    organisation = MagicMock()
+    organisation.id = 7
+    with patch.object(Agent, 'fetch_configuration', return_value={"model": "gpt-4", "goal": ["agent goal"]}), \
+            patch.object(AgentExecutionConfiguration, 'fetch_configuration', return_value={"tools": [1, 2]}), \
+            patch.object(Agent, 'find_org_by_agent_id', return_value=organisation), \
+            patch.object(AgentConfiguration, 'get_model_api_key',
+                         return_value={"api_key": "key", "provider": "OpenAI"}) as get_model_api_key:
+        runtime_config = AgentRuntimeConfig.build(MagicMock(), 1, 10, version=("v",))
+
+    get_model_api_key.assert_called_once()
+    assert runtime_config.organisation_id == 7
+    assert runtime_config.model == "gpt-4"
+    assert runtime_config.model_api_key == "key"
+    assert runtime_config.model_provider == "OpenAI"
+    assert runtime_config.goal == ["agent goal"]
+    assert runtime_config.tools == [1, 2]
+    assert runtime_config.version == ("v",)
+
+
+def test_fetch_version_changes_with_step_config_only(session):
+    session.add(AgentConfiguration(agent_id=1, key="model", value="gpt-4"))
+    session.add(AgentExecutionConfiguration(agent_execution_id=10, key="goal", value="['goal']"))
+    session.commit()
+    version = AgentRuntimeConfig.fetch_version(session, 1, 10)
+    assert version[1] == 1
+    assert version[3] == 1
+
+    session.add(AgentExecutionConfiguration(agent_execution_id=10, key="ltm_summary", value="summary"))
+    session.commit()
+    assert AgentRuntimeConfig.fetch_version(session, 1, 10) == version
+
+    session.add(AgentExecutionConfiguration(agent_execution_id=10, key="tools", value="[1]"))
+    session.commit()
+    assert AgentRuntimeConfig.fetch_version(session, 1, 10)[3] == 2
+
+
+def test_config_values_are_parsed_as_literals():
+    assert AgentExecutionConfiguration.eval_agent_config("goal", "['a', 'b']") == ['a', 'b']
+    assert Agent.eval_agent_config("tools", "(1, 2)") == [1, 2]
+    with pytest.raises(ValueError):
+        AgentExecutionConfiguration.eval_agent_config("goal", "__import__('os').getcwd()")
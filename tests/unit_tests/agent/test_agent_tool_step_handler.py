@@ -239,10 +239,10 @@ def test_handle_wait_for_permission_approved(handler):
 
     handler.session.query.return_value.filter.return_value.first.return_value = agent_execution_permission
     handler._handle_next_step = Mock()
-    AgentWorkflowStep.fetch_next_step = Mock(return_value=next_step)
 
     # Act
-    result = handler._handle_wait_for_permission(agent_execution, workflow_step)
+    with patch.object(AgentWorkflowStep, 'fetch_next_step', return_value=next_step):
+        result = handler._handle_wait_for_permission(agent_execution, workflow_step)
 
     # Assert
     assert result == False
@@ -264,10 +264,10 @@ def test_handle_wait_for_permission_denied(handler):
 
     handler.session.query.return_value.filter.return_value.first.return_value = agent_execution_permission
     handler._handle_next_step = Mock()
-    AgentWorkflowStep.fetch_next_step = Mock(return_value=next_step)
 
     # Act
-    result = handler._handle_wait_for_permission(agent_execution, workflow_step)
+    with patch.object(AgentWorkflowStep, 'fetch_next_step', return_value=next_step):
+        result = handler._handle_wait_for_permission(agent_execution, workflow_step)
 
     # Assert
     assert result == False
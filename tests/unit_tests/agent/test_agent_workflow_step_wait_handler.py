@@ -6,6 +6,7 @@ import pytest
 from superagi.models.agent_execution import AgentExecution
 from superagi.models.workflows.agent_workflow_step import AgentWorkflowStep
 from superagi.agent.agent_workflow_step_wait_handler import AgentWaitStepHandler
+from superagi.jobs.step_scheduler import StepScheduler
 
 
 # Mock datetime.now() for testing
@@ -45,10 +46,12 @@ def test_handle_next_step_complete(mock_fetch_next_step, mock_find_by_id, mock_g
 
 
 # Test cases
+@patch.object(StepScheduler, 'schedule_wait_step')
 @patch.object(AgentExecution, 'get_agent_execution_from_id')
 @patch.object(AgentWorkflowStep, 'find_by_id')
 @patch.object(AgentWorkflowStep, 'fetch_next_step')
-def test_execute_step(mock_fetch_next_step, mock_find_by_id, mock_get_agent_execution_from_id):
+def test_execute_step(mock_fetch_next_step, mock_find_by_id, mock_get_agent_execution_from_id,
+                      mock_schedule_wait_step):
     mock_session = MagicMock()
     mock_agent_execution = MagicMock(current_agent_step_id=1, status="WAIT_STEP")
     mock_step_wait = MagicMock(status="WAITING")
@@ -64,4 +67,6 @@ def test_execute_step(mock_fetch_next_step, mock_find_by_id, mock_get_agent_exec
     # Assertions
     assert mock_step_wait.status == "WAITING"
     assert mock_agent_execution.status == "WAIT_STEP"
-    mock_session.commit.assert_called_once()
\ No newline at end of file
+    mock_session.commit.assert_called_once()
+    mock_schedule_wait_step.assert_called_once()
+    assert mock_schedule_wait_step.call_args.args[0] == 2
\ No newline at end of file
@@ -3,7 +3,7 @@ from unittest.mock import Mock, patch, MagicMock
 
 from superagi.agent.common_types import ToolExecutorResponse
 from superagi.agent.output_handler import ToolOutputHandler, TaskOutputHandler, ReplaceTaskOutputHandler
-from superagi.agent.output_parser import AgentSchemaOutputParser, AgentGPTAction
+from superagi.agent.output_parser import AgentSchemaOutputParser, AgentGPTAction, AgentReply
 from superagi.agent.task_queue import TaskQueue
 from superagi.agent.tool_executor import ToolExecutor
 from superagi.helper.json_cleaner import JsonCleaner
@@ -40,7 +40,7 @@ def test_tool_output_handle(parse_mock, execute_mock, get_completed_tasks_mock,
 
     # Assert
     assert response.status == "PENDING"
-    parse_mock.assert_called_with(assistant_reply)
+    assert parse_mock.call_args[0][0].text == assistant_reply
     assert session_mock.add.call_count == 2
 
 
@@ -72,6 +72,27 @@ def test_add_text_to_memory(TokenTextSplitter_mock):
     memory_mock.add_texts.assert_called_once_with(["This is a task.", "Task completed."], [{"agent_execution_id": agent_execution_id}, {"agent_execution_id": agent_execution_id}])  
 
 
+@patch.object(AgentSchemaOutputParser, 'parse')
+def test_tool_output_handle_parses_the_reply_once(parse_mock):
+    agent_config = {"agent_id": 22, "permission_type": "RESTRICTED"}
+    assistant_reply = '{"thoughts": {"text": "thinking"}, "tool": {"name": "someAction", "args": {"a": true}}}'
+    handler = ToolOutputHandler(11, agent_config, [], None)
+    session_mock = MagicMock()
+    handler._check_for_completion = Mock(return_value=Mock(status='PENDING', result="result"))
+
+    with patch('superagi.agent.output_handler.ToolExecutor') as tool_executor_mock, \
+            patch('superagi.agent.output_parser.AgentReply.decode', wraps=AgentReply.decode) as decode_mock:
+        parse_mock.side_effect = lambda reply: AgentGPTAction(name=reply.data["tool"]["name"],
+                                                              args=reply.data["tool"]["args"])
+        tool_executor_mock.return_value.execute.return_value = Mock(retry=False, result="result")
+        handler.handle(session_mock, assistant_reply)
+
+    decode_mock.assert_called_once_with(assistant_reply)
+    assert parse_mock.call_count == 2
+    tool_executor_mock.return_value.execute.assert_called_once_with(session_mock, "someAction", {"a": True})
+    assert session_mock.add.call_args_list[0][0][0].feed == assistant_reply
+
+
 @patch('superagi.models.agent_execution_permission.AgentExecutionPermission')
 def test_tool_handler_check_permission_in_restricted_mode(op_mock):
     # Mock the session
@@ -99,16 +120,16 @@ def test_tool_handler_check_permission_in_restricted_mode(op_mock):
 
 # Test for TaskOutputHandler
 @patch.object(TaskQueue, 'add_task')
-@patch.object(TaskQueue, 'get_tasks')
+@patch.object(TaskQueue, 'task_count')
 @patch.object(JsonCleaner, 'extract_json_array_section')
-def test_task_output_handle_method(extract_json_array_section_mock, get_tasks_mock, add_task_mock):
+def test_task_output_handle_method(extract_json_array_section_mock, task_count_mock, add_task_mock):
     # Arrange
     agent_execution_id = 1
     agent_config = {"agent_id": 2}
     assistant_reply = '["task1", "task2", "task3"]'
     tasks = ["task1", "task2", "task3"]
     extract_json_array_section_mock.return_value = str(tasks)
-    get_tasks_mock.return_value = tasks
+    task_count_mock.return_value = len(tasks)
     handler = TaskOutputHandler(agent_execution_id, agent_config)
 
     # Mock session
@@ -121,23 +142,23 @@ def test_task_output_handle_method(extract_json_array_section_mock, get_tasks_mo
     extract_json_array_section_mock.assert_called_once_with(assistant_reply)
     assert add_task_mock.call_count == len(tasks)
     assert session_mock.add.call_count == len(tasks)
-    get_tasks_mock.assert_called_once()
+    task_count_mock.assert_called_once()
     assert response.status == "PENDING"
 
 
 # Test for ReplaceTaskOutputHandler
 @patch.object(TaskQueue, 'clear_tasks')
 @patch.object(TaskQueue, 'add_task')
-@patch.object(TaskQueue, 'get_tasks')
+@patch.object(TaskQueue, 'task_count')
 @patch.object(JsonCleaner, 'extract_json_array_section')
-def test_handle_method(extract_json_array_section_mock, get_tasks_mock, add_task_mock, clear_tasks_mock):
+def test_handle_method(extract_json_array_section_mock, task_count_mock, add_task_mock, clear_tasks_mock):
     # Arrange
     agent_execution_id = 1
     agent_config = {}
     assistant_reply = '["task1", "task2", "task3"]'
     tasks = ["task1", "task2", "task3"]
     extract_json_array_section_mock.return_value = str(tasks)
-    get_tasks_mock.return_value = tasks
+    task_count_mock.return_value = len(tasks)
     handler = ReplaceTaskOutputHandler(agent_execution_id, agent_config)
 
     # Mock session
@@ -150,5 +171,28 @@ def test_handle_method(extract_json_array_section_mock, get_tasks_mock, add_task
     extract_json_array_section_mock.assert_called_once_with(assistant_reply)
     clear_tasks_mock.assert_called_once()
     assert add_task_mock.call_count == len(tasks)
-    get_tasks_mock.assert_called_once()
+    task_count_mock.assert_called_once()
+    assert response.status == "PENDING"
+
+
+@patch.object(TaskQueue, 'completed_task_count', return_value=3)
+@patch.object(TaskQueue, 'task_count', return_value=0)
+@patch.object(TaskQueue, 'complete_task')
+def test_check_for_completion_when_no_task_is_pending(complete_task_mock, task_count_mock, completed_task_count_mock):
+    handler = ToolOutputHandler(1, {"agent_id": 2}, [], None)
+
+    response = handler._check_for_completion(ToolExecutorResponse(status="PENDING", result="done"))
+
+    complete_task_mock.assert_called_once_with("done")
+    assert response.status == "COMPLETE"
+
+
+@patch.object(TaskQueue, 'completed_task_count', return_value=3)
+@patch.object(TaskQueue, 'task_count', return_value=2)
+@patch.object(TaskQueue, 'complete_task')
+def test_check_for_completion_keeps_pending_tasks(complete_task_mock, task_count_mock, completed_task_count_mock):
+    handler = ToolOutputHandler(1, {"agent_id": 2}, [], None)
+
+    response = handler._check_for_completion(ToolExecutorResponse(status="COMPLETE", result="done"))
+
     assert response.status == "PENDING"
@@ -1,6 +1,7 @@
 import pytest
+from unittest.mock import patch
 
-from superagi.agent.output_parser import AgentGPTAction, AgentSchemaOutputParser
+from superagi.agent.output_parser import AgentGPTAction, AgentReply, AgentSchemaOutputParser
 
 import pytest
 
@@ -32,4 +33,27 @@ def test_agent_schema_output_parser():
         parsed = parser.parse(response)
 
 
+def test_agent_reply_decodes_json_once():
+    reply = AgentReply('{"thoughts": {"text": "t"}, "tool": {"name": "Tool1", "args": {"flag": true}}}')
 
+    with patch("superagi.agent.output_parser.ast.literal_eval") as literal_eval_mock:
+        assert reply.data["tool"]["args"] == {"flag": True}
+        assert reply.tool_name == "Tool1"
+        assert AgentSchemaOutputParser().parse(reply) == AgentGPTAction(name="Tool1", args={"flag": True})
+    literal_eval_mock.assert_not_called()
+    assert AgentReply.of(reply) is reply
+
+
+def test_agent_reply_falls_back_for_wrapped_and_python_replies():
+    assert AgentReply('Sure, here it is:\n```json\n{"tool": {"name": "Tool1"}}\n```').tool_name == "Tool1"
+    assert AgentReply("{'tool': {'name': 'Tool2', 'args': {'flag': true}}}").data["tool"]["args"] == {"flag": True}
+
+
+def test_agent_reply_without_json():
+    reply = AgentReply("invalid response")
+
+    assert reply.tool_name == ""
+    assert reply.get("tool", {}) == {}
+    with pytest.raises(Exception):
+        reply.data
+    assert AgentReply('["task1", "task2"]').tool_name == ""
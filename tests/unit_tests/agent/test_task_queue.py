@@ -1,7 +1,11 @@
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
 from superagi.agent.task_queue import TaskQueue
+from superagi.models.agent_execution import AgentExecution
 
 
 class TaskQueueTests(unittest.TestCase):
@@ -47,6 +51,87 @@ class TaskQueueTests(unittest.TestCase):
         self.queue.get_last_task_details()
         mock_get_last_task_details.assert_called()
 
+    def test_get_completed_tasks_decodes_json_and_legacy_entries(self):
+        self.queue.db = MagicMock()
+        self.queue.db.lrange.return_value = ['{"task": "Task 2", "response": "Done 2"}',
+                                             "{'task': 'Task 1', 'response': 'Done 1'}"]
+
+        tasks = self.queue.get_completed_tasks(limit=2)
+
+        self.queue.db.lrange.assert_called_once_with("test_queue_q_completed", 0, 1)
+        self.assertEqual(tasks, [{"task": "Task 2", "response": "Done 2"}, {"task": "Task 1", "response": "Done 1"}])
+
+    def test_complete_task_runs_script(self):
+        self.queue.db = MagicMock()
+        with patch.object(TaskQueue, '_complete_task_script', return_value="Task 1") as mock_script:
+            self.assertEqual(self.queue.complete_task("Done"), "Task 1")
+        mock_script.assert_called_once_with(keys=["test_queue_q", "test_queue_q_completed"], args=["Done"],
+                                            client=self.queue.db)
+
+    def test_task_count(self):
+        self.queue.db = MagicMock()
+        self.queue.db.llen.return_value = 3
+        self.assertEqual(self.queue.task_count(), 3)
+        self.queue.db.llen.assert_called_once_with("test_queue_q")
+
+    def test_expire(self):
+        self.queue.db = MagicMock()
+        pipe = self.queue.db.pipeline.return_value
+
+        self.queue.expire(ttl=60)
+
+        self.assertEqual([call.args for call in pipe.expire.call_args_list],
+                         [("test_queue_q", 60), ("test_queue_q_completed", 60), ("test_queue_q_status", 60)])
+        pipe.execute.assert_called_once()
+
+    def test_persist(self):
+        self.queue.db = MagicMock()
+        pipe = self.queue.db.pipeline.return_value
+
+        self.queue.persist()
+
+        self.assertEqual([call.args for call in pipe.persist.call_args_list],
+                         [("test_queue_q",), ("test_queue_q_completed",), ("test_queue_q_status",)])
+        pipe.execute.assert_called_once()
+
+
+class TaskQueueExpiryTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        AgentExecution.__table__.create(engine)
+        self.session = sessionmaker(bind=engine)()
+        self.agent_execution = AgentExecution(id=1, agent_id=1, status="RUNNING")
+        self.session.add(self.agent_execution)
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_queue_expires_when_status_change_is_committed(self):
+        for status in ("TERMINATED", "PAUSED", "ERROR_PAUSED"):
+            with patch.object(TaskQueue, 'expire') as mock_expire:
+                self.agent_execution.status = status
+                mock_expire.assert_not_called()
+                self.session.commit()
+            mock_expire.assert_called_once_with()
+
+    def test_queue_is_kept_when_execution_resumes(self):
+        self.agent_execution.status = "PAUSED"
+        with patch.object(TaskQueue, 'expire'):
+            self.session.commit()
+
+        with patch.object(TaskQueue, 'persist') as mock_persist:
+            self.agent_execution.status = "RUNNING"
+            self.session.commit()
+        mock_persist.assert_called_once_with()
+
+    def test_rolled_back_status_change_keeps_queue(self):
+        with patch.object(TaskQueue, 'expire') as mock_expire:
+            self.agent_execution.status = "TERMINATED"
+            self.session.rollback()
+            self.session.commit()
+        mock_expire.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import Mock, patch
 
-from superagi.agent.tool_builder import ToolBuilder
+from superagi.agent.tool_builder import ToolBuilder, DBToolkitConfiguration
 from superagi.models.tool import Tool
 
 
@@ -47,4 +47,38 @@ def test_build_tool(mock_getattr, mock_import_module, tool_builder, tool):
     mock_getattr.assert_called_with(mock_module, tool.class_name)
 
     assert result_tool.toolkit_config.session == tool_builder.session
-    assert result_tool.toolkit_config.toolkit_id == tool.toolkit_id
\ No newline at end of file
+    assert result_tool.toolkit_config.toolkit_id == tool.toolkit_id
+
+@patch('superagi.agent.tool_builder.importlib.import_module')
+def test_build_tool_imports_tool_class_once(mock_import_module, tool_builder, tool):
+    tool_builder.build_tool(tool)
+    tool_builder.build_tool(tool)
+
+    assert mock_import_module.call_count == 1
+
+
+@patch('superagi.agent.tool_builder.get_model')
+@patch('superagi.agent.tool_builder.Agent.find_org_by_agent_id')
+def test_set_default_params_tool_lazy(mock_find_org, mock_get_model, tool_builder, agent_execution_config):
+    agent_config = {"model": "gpt-4", "agent_id": 1}
+    built_tool = Mock()
+    built_tool.name = "Test Tool"
+
+    tool_builder.set_default_params_tool(built_tool, agent_config, agent_execution_config, "key", lazy=True)
+    assert built_tool.goals == "Test Goal"
+    mock_get_model.assert_not_called()
+
+    tool_builder.tool_initializer(agent_config, "key")(built_tool)
+    tool_builder.tool_initializer(agent_config, "key")(built_tool)
+    assert built_tool.llm == mock_get_model.return_value
+    assert mock_get_model.call_count == 2
+    mock_find_org.assert_called_once()
+
+
+@patch('superagi.agent.tool_builder.ToolkitConfigCache.fetch_configs', return_value={"API_KEY": "secret"})
+def test_db_toolkit_configuration_fetches_snapshot_once(mock_fetch_configs, session):
+    toolkit_config = DBToolkitConfiguration(session=session, toolkit_id=1)
+
+    assert toolkit_config.get_tool_config("API_KEY") == "secret"
+    assert toolkit_config.get_tool_config("API_KEY") == "secret"
+    mock_fetch_configs.assert_called_once_with(session, 1)
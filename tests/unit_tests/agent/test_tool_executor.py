@@ -54,4 +54,15 @@ def test_tool_executor_unknown_tool(executor):
 def test_clean_tool_args(executor):
     args = {"arg1": {"value": 1}, "arg2": 2}
     clean_args = executor.clean_tool_args(args)
-    assert clean_args == {"arg1": 1, "arg2": 2}
\ No newline at end of file
+    assert clean_args == {"arg1": 1, "arg2": 2}
+
+@patch('superagi.agent.tool_executor.EventHandler')
+def test_tool_executor_initializes_only_the_chosen_tool(mock_event_handler, mock_tools):
+    tool_initializer = Mock()
+    executor = ToolExecutor(organisation_id=1, agent_id=1, tools=mock_tools, agent_execution_id=1,
+                            tool_initializer=tool_initializer)
+
+    res = executor.execute(None, 'tool2', {})
+
+    assert res.status == 'SUCCESS'
+    tool_initializer.assert_called_once_with(mock_tools[2])
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from superagi.apm.analytics_helper import AnalyticsHelper
+from superagi.apm.analytics_rollup import AnalyticsRollup
+from superagi.models.analytics_agent import AnalyticsAgent
+from superagi.models.analytics_agent_tool import AnalyticsAgentTool
+from superagi.models.analytics_daily_rollup import AnalyticsDailyRollup
+from superagi.models.analytics_run import AnalyticsRun
+
+START = datetime(2023, 10, 18, 10, 0, 0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    tables = [model.__table__ for model in (AnalyticsAgent, AnalyticsAgentTool, AnalyticsDailyRollup, AnalyticsRun)]
+    AnalyticsAgent.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def event(event_name, event_property, agent_id=1, org_id=1, created_at=START):
+    return {"event_name": event_name, "event_property": event_property, "agent_id": agent_id, "org_id": org_id,
+            "created_at": created_at}
+
+
+def apply_run(session, agent_execution_id, tokens, calls, started_at, run_time):
+    AnalyticsRollup.apply(session, [
+        event("run_created", {"agent_execution_id": agent_execution_id, "agent_execution_name": f"run {agent_execution_id}"},
+              created_at=started_at),
+        event("tool_used", {"tool_name": "Read File", "agent_execution_id": agent_execution_id}, created_at=started_at),
+        event("run_completed", {"agent_execution_id": agent_execution_id, "name": f"run {agent_execution_id}",
+                                "tokens_consumed": tokens, "calls": calls},
+              created_at=started_at + timedelta(seconds=run_time)),
+    ])
+
+
+def test_rollups_serve_the_analytics(session):
+    AnalyticsRollup.apply(session, [event("agent_created", {"agent_name": "Agent", "model": "gpt-4"})])
+    apply_run(session, 10, 100, 2, START, 30)
+    apply_run(session, 11, 50, 1, START + timedelta(minutes=5), 10)
+    AnalyticsRollup.apply(session, [event("run_created", {"agent_execution_id": 12, "agent_execution_name": "run 12"})])
+    session.commit()
+
+    helper = AnalyticsHelper(session, 1)
+    metrics = helper.calculate_run_completed_metrics()
+    assert metrics["agent_details"]["total_agents"] == 1
+    assert metrics["run_details"]["model_metrics"] == [{"name": "gpt-4", "value": 2}]
+    assert metrics["tokens_details"]["total_tokens"] == 150
+
+    agent = helper.fetch_agent_data()["agent_details"][0]
+    assert agent["runs_completed"] == 2
+    assert agent["total_calls"] == 3
+    assert agent["tools_used"] == ["Read File"]
+    assert agent["avg_run_time"] == 20
+
+    runs = helper.fetch_agent_runs(1)
+    assert [run["name"] for run in runs] == ["run 10", "run 11"]
+    assert runs[0]["tokens_consumed"] == 100
+
+    assert [run["name"] for run in helper.get_active_runs()] == ["run 12"]
+    assert session.query(AnalyticsAgentTool).one().calls == 2
+
+
+def test_rollups_are_per_organisation(session):
+    AnalyticsRollup.apply(session, [event("agent_created", {"agent_name": "Agent", "model": "gpt-4"})])
+    apply_run(session, 10, 100, 2, START, 30)
+    session.commit()
+
+    helper = AnalyticsHelper(session, 2)
+    assert helper.calculate_run_completed_metrics()["run_details"]["total_runs"] == 0
+    assert helper.fetch_agent_data() == {"agent_details": []}
+    assert helper.get_active_runs() == []
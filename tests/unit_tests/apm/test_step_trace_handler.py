@@ -0,0 +1,41 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from superagi.apm.step_trace_handler import StepTraceHandler
+from superagi.models.agent_execution_step_trace import AgentExecutionStepTrace
+
+
+def _trace(total_ms, llm_ms, tokens):
+    return AgentExecutionStepTrace(agent_execution_id=1, step_type="ITERATION_WORKFLOW", total_ms=total_ms,
+                                   queue_wait_ms=1.0, db_ms=2.0, llm_ms=llm_ms, tool_ms=0.0, embedding_ms=0.0,
+                                   tokens=tokens, spans={"llm": {"ms": llm_ms, "count": 1}})
+
+
+@patch('superagi.apm.step_trace_handler.AgentExecutionStepTrace.fetch_by_execution_id')
+@patch('superagi.apm.step_trace_handler.Agent.find_org_by_agent_id')
+@patch('superagi.apm.step_trace_handler.AgentExecution.get_agent_execution_from_id')
+def test_get_execution_traces(mock_get_execution, mock_find_org, mock_fetch_traces):
+    mock_find_org.return_value = MagicMock(id=7)
+    mock_fetch_traces.return_value = [_trace(1000.0, 500.0, 100), _trace(3000.0, 2000.0, 300)]
+
+    result = StepTraceHandler(MagicMock(), 7).get_execution_traces(1)
+
+    assert len(result["steps"]) == 2
+    assert result["steps"][0]["tokens_per_second"] == 200.0
+    assert result["summary"]["steps"] == 2
+    assert result["summary"]["total_ms"]["total"] == 4000.0
+    assert result["summary"]["total_ms"]["max"] == 3000.0
+    assert result["summary"]["tokens_per_second"] == 160.0
+
+
+@patch('superagi.apm.step_trace_handler.Agent.find_org_by_agent_id')
+@patch('superagi.apm.step_trace_handler.AgentExecution.get_agent_execution_from_id')
+def test_get_execution_traces_of_other_organisation(mock_get_execution, mock_find_org):
+    mock_find_org.return_value = MagicMock(id=8)
+
+    with pytest.raises(HTTPException) as exc_info:
+        StepTraceHandler(MagicMock(), 7).get_execution_traces(1)
+
+    assert exc_info.value.status_code == 404
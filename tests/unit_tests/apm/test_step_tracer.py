@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from superagi.apm.step_tracer import StepTracer, LLM_SPAN, TOOL_SPAN
+from superagi.models.agent_execution_step_trace import AgentExecutionStepTrace
+
+
+@pytest.fixture(autouse=True)
+def tracing_enabled():
+    with patch.object(StepTracer, 'enabled', return_value=True):
+        yield
+    StepTracer.finish(MagicMock())
+
+
+def test_spans_are_noop_without_a_trace():
+    with StepTracer.span(LLM_SPAN):
+        pass
+    StepTracer.add_tokens(10)
+
+    assert StepTracer.current() is None
+
+
+def test_finish_persists_step_trace():
+    session = MagicMock()
+    StepTracer.start(5, queue_wait_ms=12.5)
+    StepTracer.set_step(3, "ITERATION_WORKFLOW")
+    with StepTracer.span(LLM_SPAN):
+        pass
+    with StepTracer.span(TOOL_SPAN):
+        pass
+    with StepTracer.span(TOOL_SPAN):
+        pass
+    StepTracer.add_tokens(100)
+
+    StepTracer.finish(MagicMock(return_value=session))
+
+    trace = session.add.call_args.args[0]
+    assert isinstance(trace, AgentExecutionStepTrace)
+    assert trace.agent_execution_id == 5
+    assert trace.agent_id == 3
+    assert trace.step_type == "ITERATION_WORKFLOW"
+    assert trace.queue_wait_ms == 12.5
+    assert trace.tokens == 100
+    assert trace.spans[TOOL_SPAN]["count"] == 2
+    assert trace.llm_ms >= 0
+    session.commit.assert_called_once()
+    session.close.assert_called_once()
+    assert StepTracer.current() is None
+
+
+def test_finish_skips_steps_that_did_not_run():
+    session = MagicMock()
+    session_maker = MagicMock(return_value=session)
+    StepTracer.start(5)
+
+    StepTracer.finish(session_maker)
+
+    session_maker.assert_not_called()
+
+
+def test_finish_closes_session_when_trace_is_not_stored():
+    session = MagicMock()
+    session.commit.side_effect = Exception("connection lost")
+    StepTracer.start(5)
+    StepTracer.set_step(3, "ITERATION_WORKFLOW")
+
+    StepTracer.finish(MagicMock(return_value=session))
+
+    session.rollback.assert_called_once()
+    session.close.assert_called_once()
+
+
+def test_queue_wait_ms_is_measured_from_eta():
+    enqueued_at = datetime.now() - timedelta(seconds=10)
+    eta = (datetime.now() - timedelta(seconds=1)).astimezone().isoformat()
+
+    queue_wait_ms = StepTracer.queue_wait_ms(enqueued_at.isoformat(), eta)
+
+    assert 1000 <= queue_wait_ms < 5000
+    assert StepTracer.queue_wait_ms("not a date") is None
@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from superagi.apm.call_log_helper import CallLogHelper
+from superagi.apm.event_handler import EventHandler
+from superagi.apm.telemetry_writer import TelemetryWriter
+from superagi.models.call_logs import CallLogs
+from superagi.models.events import Event
+
+
+@pytest.fixture(autouse=True)
+def writer(tmp_path):
+    config = {"TELEMETRY_SPOOL_PATH": str(tmp_path / "spool.jsonl"), "TELEMETRY_BATCH_SIZE": 2}
+    with patch("superagi.apm.telemetry_writer.get_config", side_effect=lambda key, default=None: config.get(key, default)), \
+            patch.object(TelemetryWriter, "_ensure_flusher"), \
+            patch.object(TelemetryWriter, "_rows", {"events": [], "call_logs": []}):
+        yield TelemetryWriter
+
+
+@pytest.fixture
+def mock_engine():
+    engine = MagicMock()
+    with patch("superagi.models.db.connect_db", return_value=engine):
+        yield engine
+
+
+def test_buffered_event_is_not_committed(writer):
+    session = MagicMock()
+
+    event = EventHandler(session).create_event('tool_used', {'tool_name': 'Tool'}, 1, 2, buffered=True)
+
+    assert event is None
+    session.commit.assert_not_called()
+    assert writer._rows["events"][0]["event_name"] == 'tool_used'
+    assert writer._rows["events"][0]["org_id"] == 2
+
+
+def test_buffered_call_log_is_not_committed(writer):
+    session = MagicMock()
+
+    CallLogHelper(session, 3).create_call_log('run', 1, 100, 'Tool', 'gpt-4', buffered=True)
+
+    session.commit.assert_not_called()
+    assert writer._rows["call_logs"][0]["org_id"] == 3
+
+
+def test_full_batch_requests_a_flush(writer):
+    writer._flush_requested.clear()
+    writer.add(Event, {'event_name': 'a', 'event_value': 1})
+    assert not writer._flush_requested.is_set()
+    writer.add(CallLogs, {'agent_execution_name': 'run', 'agent_id': 1})
+    assert writer._flush_requested.is_set()
+    writer._flush_requested.clear()
+
+
+def test_flush_inserts_one_statement_per_table(writer, mock_engine):
+    writer.add(Event, {'event_name': 'a', 'event_value': 1})
+    writer.add(Event, {'event_name': 'b', 'event_value': 1})
+    writer.add(CallLogs, {'agent_execution_name': 'run', 'agent_id': 1})
+
+    assert writer.flush()
+
+    connection = mock_engine.begin.return_value.__enter__.return_value
+    assert connection.execute.call_count == 2
+    assert writer.pending() == 0
+
+
+def test_failed_flush_is_spooled_and_replayed_on_shutdown(writer, mock_engine):
+    writer.add(Event, {'event_name': 'a', 'event_value': 1})
+    mock_engine.begin.side_effect = OperationalError("INSERT", {}, Exception("down"))
+
+    writer.shutdown()
+
+    assert writer.pending() == 0
+    mock_engine.begin.side_effect = None
+    assert writer.flush()
+    statement = mock_engine.begin.return_value.__enter__.return_value.execute.call_args[0][0]
+    assert statement.table.name == "events"
+
+
+def test_rejected_batch_is_stored_row_by_row(writer, mock_engine):
+    writer.add(CallLogs, {'agent_execution_name': 'good', 'agent_id': 1})
+    writer.add(CallLogs, {'agent_execution_name': 'bad', 'agent_id': 1})
+    writer.add(CallLogs, {'agent_execution_name': 'good', 'agent_id': 2})
+    connection = mock_engine.begin.return_value.__enter__.return_value
+    rejected = IntegrityError("INSERT", {}, Exception("constraint"))
+    connection.execute.side_effect = [rejected, None, rejected, None]
+
+    assert writer.flush()
+
+    assert connection.execute.call_count == 4
+    assert writer.pending() == 0
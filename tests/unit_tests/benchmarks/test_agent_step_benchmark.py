@@ -0,0 +1,48 @@
+from benchmarks.agent_step_benchmark import AgentStepBenchmark, WORKFLOWS, check_thresholds, format_results
+from benchmarks.fakes import FakeLlm, InMemoryRedis
+
+
+def test_benchmark_runs_every_workflow_offline():
+    results = AgentStepBenchmark(steps=4, warmup=1, allocation_steps=1).run()
+
+    assert [result["workflow"] for result in results] == list(WORKFLOWS)
+    for result in results:
+        assert result["failed_steps"] == 0
+        assert result["executions"] >= 1
+        assert result["queries_per_step"] > 0
+        assert result["p99_ms"] >= result["p50_ms"] > 0
+        assert result["peak_alloc_kib"] > 0
+    assert "goal_based" in format_results(results)
+
+
+def test_check_thresholds():
+    results = [{"workflow": "goal_based", "failed_steps": 0, "p99_ms": 20.0, "queries_per_step": 50.0},
+               {"workflow": "task_based", "failed_steps": 2, "p99_ms": 5.0, "queries_per_step": 10.0}]
+
+    assert check_thresholds(results, max_p99_ms=10, max_queries_per_step=40) == [
+        "goal_based: p99 20.0ms > 10ms",
+        "goal_based: 50.0 queries per step > 40",
+        "task_based: 2 steps failed",
+    ]
+
+
+def test_fake_llm_answers_the_workflow_prompts():
+    llm = FakeLlm(initial_tasks=2)
+
+    assert llm.chat_completion([{"role": "system", "content": "Construct a sequence of actions. JSON.parse()"}])[
+               "content"] == '["Task 1 towards the goal", "Task 2 towards the goal"]'
+    prioritize = "You have following incomplete tasks `['b', 'a']`. sort them in the order of execution JSON.parse()"
+    assert llm.chat_completion([{"role": "system", "content": prioritize}])["content"] == '["b", "a"]'
+    assert '"ThinkingTool"' in llm.chat_completion([{"role": "system", "content": 'respond with "tool"'}])["content"]
+
+
+def test_in_memory_redis_lists():
+    client = InMemoryRedis()
+    client.lpush("q", "a")
+    client.lpush("q", "b")
+
+    assert client.lrange("q", 0, -1) == ["b", "a"]
+    assert client.lindex("q", 0) == "b"
+    assert client.lpop("q") == "b"
+    assert client.delete("q") == 1
+    assert client.lindex("q", 0) is None
@@ -40,4 +40,31 @@ def test_get_agent_execution_feed(mock_query):
     mock_agent_execution = Mock() 
     mock_query.return_value.filter.return_value.first.return_value = mock_agent_execution
     mock_agent_execution_id = 1
-    assert get_agent_execution_feed(mock_agent_execution_id)
\ No newline at end of file
+    assert get_agent_execution_feed(mock_agent_execution_id)
+
+def test_build_execution_feed_returns_feeds_after_cursor():
+    from superagi.controllers.agent_execution_feed import _build_execution_feed
+
+    session = MagicMock()
+    agent_execution = Mock(id=1, status="RUNNING", last_shown_error_id=None)
+    feeds = [Mock(id=feed_id, feed=f"feed {feed_id}", role="user", error_message=None) for feed_id in (4, 5, 6)]
+    session.query.return_value.filter.return_value.filter.return_value.order_by.return_value.limit.return_value \
+        .all.return_value = feeds
+    session.query.return_value.filter_by.return_value.order_by.return_value.all.return_value = []
+
+    with patch('superagi.controllers.agent_execution_feed.parse_feed', side_effect=lambda feed: feed.feed):
+        response = _build_execution_feed(session, agent_execution, since_feed_id=3, limit=2)
+
+    assert response["feeds"] == ["feed 4", "feed 5"]
+    assert response["last_feed_id"] == 5
+    assert response["has_more"] is True
+
+
+@patch('superagi.controllers.agent_execution_feed._build_execution_feed')
+@patch('superagi.controllers.agent_execution_feed._feed_etag', return_value='W/"abc"')
+@patch('superagi.controllers.agent_execution_feed.db')
+def test_get_agent_execution_feed_not_modified(mock_db, mock_etag, mock_build):
+    response = get_agent_execution_feed(1, since_feed_id=5, if_none_match='W/"abc"')
+
+    assert response.status_code == 304
+    mock_build.assert_not_called()
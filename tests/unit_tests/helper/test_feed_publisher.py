@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock, patch
+
+import redis
+
+from superagi.helper.feed_publisher import FeedPublisher, discard_feed_announcements, publish_committed_feeds
+
+
+def test_announcements_are_published_on_commit():
+    session = MagicMock(info={})
+    FeedPublisher.announce_on_commit(session, 1)
+    FeedPublisher.announce_on_commit(session, 1)
+    FeedPublisher.announce_on_commit(session, 2)
+
+    with patch.object(FeedPublisher, '_redis_client') as mock_client:
+        publish_committed_feeds(session)
+
+    published = sorted(call.args for call in mock_client.return_value.publish.call_args_list)
+    assert published == [("agent_execution_feed:1", "1"), ("agent_execution_feed:2", "2")]
+    assert "feed_agent_execution_ids" not in session.info
+
+
+def test_announcements_are_discarded_on_rollback():
+    session = MagicMock(info={})
+    FeedPublisher.announce_on_commit(session, 1)
+
+    discard_feed_announcements(session)
+
+    assert session.info == {}
+
+
+def test_publish_ignores_redis_errors():
+    with patch.object(FeedPublisher, '_redis_client') as mock_client:
+        mock_client.return_value.publish.side_effect = redis.RedisError("down")
+        FeedPublisher.publish(1)
@@ -1,11 +1,12 @@
 import base64
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 
 from superagi.helper.github_helper import GithubHelper
 
 class TestGithubHelper(unittest.TestCase):
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_check_repository_visibility(self, mock_get):
         # Create response mock
         mock_resp = MagicMock()
@@ -22,14 +23,14 @@ class TestGithubHelper(unittest.TestCase):
             headers={"Authorization": "Token access_token", "Accept": "application/vnd.github.v3+json"}
         )
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_file_path(self, mock_get):
         gh = GithubHelper('access_token', 'username')
         path = gh.get_file_path('test.txt', 'dir')
         self.assertEqual(path, 'dir/test.txt')
 
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_search_repo(self, mock_get):
         # Create response mock
         mock_resp = MagicMock()
@@ -46,8 +47,8 @@ class TestGithubHelper(unittest.TestCase):
             headers={"Authorization": "token access_token", "Content-Type": "application/vnd.github+json"}
         )
 
-    @patch('requests.get')
-    @patch('requests.patch')
+    @patch('requests.Session.get')
+    @patch('requests.Session.patch')
     def test_sync_branch(self, mock_patch, mock_get):
         # Create response mocks
         mock_get_resp = MagicMock()
@@ -70,8 +71,8 @@ class TestGithubHelper(unittest.TestCase):
             headers={'header': 'value'}
         )
 
-    @patch('requests.get')
-    @patch('requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_create_branch(self, mock_post, mock_get):
         # Create response mocks
         mock_get_resp = MagicMock()
@@ -95,7 +96,7 @@ class TestGithubHelper(unittest.TestCase):
             headers={'header': 'value'}
         )
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_make_fork(self, mock_post):
         # Create response mock
         mock_resp = MagicMock()
@@ -113,7 +114,7 @@ class TestGithubHelper(unittest.TestCase):
         )
         mock_sync.assert_called_once_with('owner', 'repo', 'base', 'base', {'header': 'value'})
 
-    @patch('requests.delete')
+    @patch('requests.Session.delete')
     def test_delete_file(self, mock_delete):
         # Create response mock
         mock_resp = MagicMock()
@@ -132,7 +133,7 @@ class TestGithubHelper(unittest.TestCase):
             headers={'header': 'value'}
         )
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_create_pull_request(self, mock_post):
         # Create response mock
         mock_resp = MagicMock()
@@ -155,7 +156,7 @@ class TestGithubHelper(unittest.TestCase):
             headers={'header': 'value'}
         )
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_pull_request_content_success(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.text = "some_content"
@@ -165,7 +166,7 @@ class TestGithubHelper(unittest.TestCase):
 
         self.assertEqual(result, "some_content")
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_pull_request_content_not_found(self, mock_get):
         mock_get.return_value.status_code = 404
 
@@ -174,7 +175,7 @@ class TestGithubHelper(unittest.TestCase):
 
         self.assertIsNone(result)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_latest_commit_id_of_pull_request(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = [{"sha": "123"}, {"sha": "456"}]
@@ -184,7 +185,7 @@ class TestGithubHelper(unittest.TestCase):
 
         self.assertEqual(result, "456")
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_add_line_comment_to_pull_request(self, mock_post):
         mock_post.return_value.status_code = 201
         mock_post.return_value.json.return_value = {"id": 1, "body": "comment"}
@@ -194,6 +195,67 @@ class TestGithubHelper(unittest.TestCase):
 
         self.assertEqual(result, {"id": 1, "body": "comment"})
 
+    @patch('requests.Session.post')
+    def test_add_review_to_pull_request(self, mock_post):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {"id": 1}
+        comments = [{"path": "file_path", "position": 1, "body": "comment"}]
+
+        github_api = GithubHelper('access_token', 'username')
+        result = github_api.add_review_to_pull_request("owner", "repo", 1, "commit_id", comments)
+
+        self.assertEqual(result, {"id": 1})
+        mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args.kwargs["json"],
+                         {"commit_id": "commit_id", "event": "COMMENT", "comments": comments})
+
+    def tearDown(self):
+        GithubHelper._responses.clear()
+        GithubHelper._rate_limit_resets.clear()
+
+    @patch('requests.Session.get')
+    def test_get_revalidates_cached_response_with_etag(self, mock_get):
+        cached_resp = MagicMock(status_code=200, headers={"ETag": '"abc"'})
+        cached_resp.json.return_value = {'private': True}
+        mock_get.side_effect = [cached_resp, MagicMock(status_code=304, headers={})]
+
+        gh = GithubHelper('access_token', 'username')
+        self.assertEqual(gh.check_repository_visibility('owner', 'repo'), True)
+        self.assertEqual(gh.check_repository_visibility('owner', 'repo'), True)
+
+        self.assertEqual(mock_get.call_args.kwargs["headers"]["If-None-Match"], '"abc"')
+
+    @patch('superagi.helper.github_helper.time.sleep')
+    @patch('requests.Session.get')
+    def test_request_waits_for_rate_limit_reset_and_retries(self, mock_get, mock_sleep):
+        limited_resp = MagicMock(status_code=403, headers={"Retry-After": "5"})
+        ok_resp = MagicMock(status_code=200, headers={})
+        ok_resp.json.return_value = {'private': False}
+        mock_get.side_effect = [limited_resp, ok_resp]
+
+        gh = GithubHelper('access_token', 'username')
+        self.assertEqual(gh.check_repository_visibility('owner', 'repo'), False)
+
+        self.assertEqual(mock_get.call_count, 2)
+        mock_sleep.assert_called_once()
+        self.assertLessEqual(mock_sleep.call_args.args[0], 5)
+
+    @patch('superagi.helper.github_helper.time.sleep')
+    @patch('requests.Session.get')
+    def test_rate_limit_is_tracked_per_access_token(self, mock_get, mock_sleep):
+        limited_resp = MagicMock(status_code=200, headers={"X-RateLimit-Remaining": "0",
+                                                           "X-RateLimit-Reset": str(time.time() + 30)})
+        limited_resp.json.return_value = {'private': False}
+        mock_get.return_value = limited_resp
+
+        GithubHelper('limited_token', 'username').check_repository_visibility('owner', 'repo')
+        mock_get.return_value = MagicMock(status_code=200, headers={})
+        GithubHelper('other_token', 'username').check_repository_visibility('owner', 'repo')
+        mock_sleep.assert_not_called()
+
+        GithubHelper('limited_token', 'username').check_repository_visibility('owner', 'repo')
+        mock_sleep.assert_called_once()
+
 
 # ... more tests for other methods
 
@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from superagi.helper.model_registry import ModelRegistry
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    ModelRegistry._entries.clear()
+    yield
+    ModelRegistry._entries.clear()
+
+
+def _model_row(model_name, token_limit, provider):
+    row = MagicMock()
+    row.model_name = model_name
+    row.token_limit = token_limit
+    row.end_point = ""
+    row.version = ""
+    row.context_length = None
+    row.model_provider_id = 1
+    row.provider = provider
+    return row
+
+
+@patch.object(ModelRegistry, "_fetch_version", return_value="1")
+def test_fetch_model_is_cached(mock_fetch_version):
+    session = MagicMock()
+    session.query.return_value.outerjoin.return_value.filter.return_value.all.return_value = [
+        _model_row("gpt-4", 8092, "OpenAI"), _model_row("models/chat-bison-001", 8192, "Google Palm")]
+
+    assert ModelRegistry.fetch_model(session, 1, "gpt-4")["provider"] == "OpenAI"
+    assert ModelRegistry.fetch_model_tokens(session, 1) == {"gpt-4": 8092, "models/chat-bison-001": 8192}
+    assert ModelRegistry.fetch_model(session, 1, "unknown") is None
+    assert session.query.call_count == 1
+
+
+@patch.object(ModelRegistry, "_fetch_version")
+def test_fetch_model_reloads_on_version_change(mock_fetch_version):
+    session = MagicMock()
+    session.query.return_value.outerjoin.return_value.filter.return_value.all.side_effect = [
+        [_model_row("gpt-4", 8092, "OpenAI")], [_model_row("gpt-4", 16000, "OpenAI")]]
+    mock_fetch_version.side_effect = ["1", "2"]
+    listener = MagicMock()
+
+    with patch.object(ModelRegistry, "_invalidation_listeners", [listener]):
+        assert ModelRegistry.fetch_model(session, 1, "gpt-4")["token_limit"] == 8092
+        listener.assert_not_called()
+        assert ModelRegistry.fetch_model(session, 1, "gpt-4")["token_limit"] == 16000
+    listener.assert_called_once_with(1)
+
+
+@patch.object(ModelRegistry, "_redis_client")
+def test_invalidate_bumps_version(mock_redis_client):
+    ModelRegistry._entries[1] = ("1", 0, {})
+    ModelRegistry._entries[2] = ("1", 0, {})
+
+    ModelRegistry.invalidate(1)
+
+    assert list(ModelRegistry._entries.keys()) == [2]
+    mock_redis_client.return_value.incr.assert_called_once_with("model_registry_version:1")
@@ -4,7 +4,7 @@ from typing import List
 from unittest.mock import MagicMock, patch
 from superagi.types.common import BaseMessage
 from superagi.helper.token_counter import TokenCounter
-from superagi.models.models import Models
+from superagi.helper.model_registry import ModelRegistry
 
 
 @pytest.fixture()
@@ -21,9 +21,10 @@ def setup_model_token_limit():
     return model_token_limit_dict
 
 
-@patch.object(Models, "fetch_model_tokens", autospec=True)
-def test_token_limit(mock_fetch_model_tokens, setup_model_token_limit):
-    mock_fetch_model_tokens.return_value = setup_model_token_limit
+@patch.object(ModelRegistry, "fetch_models")
+def test_token_limit(mock_fetch_models, setup_model_token_limit):
+    mock_fetch_models.return_value = {model: {"model_name": model, "token_limit": token_limit}
+                                      for model, token_limit in setup_model_token_limit.items()}
 
     tc = TokenCounter(MagicMock(), 1)
 
@@ -52,4 +53,25 @@ def test_count_text_tokens():
     assert TokenCounter.count_text_tokens(text) == 10
 
     text = "What is your name?"
-    assert TokenCounter.count_text_tokens(text) == 9
\ No newline at end of file
+    assert TokenCounter.count_text_tokens(text) == 9
+
+def test_count_each_message_tokens_memoizes_feeds():
+    encoding = MagicMock()
+    encoding.encode.side_effect = lambda text: text.split()
+    messages = [{'role': 'user', 'content': 'one two', 'chat_id': 101},
+                {'role': 'assistant', 'content': 'one two three'},
+                'four']
+
+    with patch.object(TokenCounter, "get_encoding", return_value=encoding):
+        assert TokenCounter.count_each_message_tokens(messages, "gpt-4") == [8, 9, 7]
+        assert TokenCounter.count_each_message_tokens(messages[:1], "gpt-4") == [8]
+
+    assert encoding.encode.call_count == 3
+
+
+def test_find_history_split_index():
+    assert TokenCounter.find_history_split_index([5, 5, 5], 20) == 0
+    assert TokenCounter.find_history_split_index([5, 5, 5], 10) == 1
+    assert TokenCounter.find_history_split_index([5, 5, 5], 9) == 2
+    assert TokenCounter.find_history_split_index([5, 5, 30], 10) == 3
+    assert TokenCounter.find_history_split_index([], 10) == 0
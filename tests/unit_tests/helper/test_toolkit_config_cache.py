@@ -0,0 +1,63 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from superagi.helper.encyption_helper import encrypt_data
+from superagi.helper.toolkit_config_cache import ToolkitConfigCache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    ToolkitConfigCache._entries.clear()
+    yield
+    ToolkitConfigCache._entries.clear()
+
+
+def _config_row(key, value):
+    row = MagicMock()
+    row.key = key
+    row.value = value
+    return row
+
+
+def _session(rows):
+    session = MagicMock()
+    session.query.return_value.filter.return_value.all.return_value = rows
+    return session
+
+
+@patch.object(ToolkitConfigCache, "_fetch_version", return_value="1")
+def test_fetch_configs_decrypts_once_and_caches(mock_fetch_version):
+    session = _session([_config_row("API_KEY", encrypt_data("secret")), _config_row("URL", "https://example.com"),
+                        _config_row("EMPTY", None)])
+
+    with patch("superagi.helper.toolkit_config_cache.decrypt_if_encrypted",
+               side_effect=lambda value: "secret" if value.startswith("gAAAA") else value) as mock_decrypt:
+        configs = ToolkitConfigCache.fetch_configs(session, 1)
+        assert ToolkitConfigCache.fetch_configs(session, 1) is configs
+
+    assert configs == {"API_KEY": "secret", "URL": "https://example.com"}
+    assert mock_decrypt.call_count == 2
+    assert session.query.call_count == 1
+
+
+@patch.object(ToolkitConfigCache, "_fetch_version")
+def test_fetch_configs_reloads_on_version_change(mock_fetch_version):
+    session = _session([_config_row("API_KEY", "old")])
+    mock_fetch_version.return_value = "1"
+    assert ToolkitConfigCache.fetch_configs(session, 1) == {"API_KEY": "old"}
+
+    session.query.return_value.filter.return_value.all.return_value = [_config_row("API_KEY", "new")]
+    mock_fetch_version.return_value = "2"
+    assert ToolkitConfigCache.fetch_configs(session, 1) == {"API_KEY": "new"}
+
+
+@patch.object(ToolkitConfigCache, "_fetch_version", return_value="1")
+@patch.object(ToolkitConfigCache, "_redis_client")
+def test_invalidate_bumps_version(mock_redis_client, mock_fetch_version):
+    session = _session([_config_row("API_KEY", "old")])
+    ToolkitConfigCache.fetch_configs(session, 1)
+
+    ToolkitConfigCache.invalidate(1)
+
+    assert 1 not in ToolkitConfigCache._entries
+    mock_redis_client.return_value.incr.assert_called_once_with("toolkit_config_version:1")
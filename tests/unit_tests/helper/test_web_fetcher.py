@@ -0,0 +1,88 @@
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from superagi.helper.web_fetcher import WebFetcher
+
+
+@pytest.fixture(autouse=True)
+def fake_redis():
+    store = {}
+    client = MagicMock()
+    client.get.side_effect = store.get
+    client.set.side_effect = lambda key, value, ex=None: store.__setitem__(key, value)
+    with patch.object(WebFetcher, "_redis", client), \
+            patch.object(WebFetcher, "host_interval", return_value=0), \
+            patch.object(WebFetcher, "_host_next_fetch", {}):
+        yield store
+
+
+def _response(status_code=200, text="<p>page</p>", headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    return response
+
+
+def test_fetch_serves_fresh_responses_from_cache():
+    session = MagicMock()
+    session.get.return_value = _response(headers={"ETag": '"v1"'})
+    with patch.object(WebFetcher, "_http_session", return_value=session):
+        first = WebFetcher.fetch("https://example.com/page")
+        second = WebFetcher.fetch("https://example.com/page")
+
+    assert first.text == second.text == "<p>page</p>"
+    assert session.get.call_count == 1
+
+
+def test_fetch_revalidates_stale_responses(fake_redis):
+    session = MagicMock()
+    session.get.return_value = _response(headers={"ETag": '"v1"'})
+    with patch.object(WebFetcher, "_http_session", return_value=session):
+        WebFetcher.fetch("https://example.com/page")
+        key = next(iter(fake_redis))
+        entry = json.loads(fake_redis[key])
+        entry["fetched_at"] = time.time() - WebFetcher.cache_ttl() - 1
+        fake_redis[key] = json.dumps(entry)
+
+        session.get.return_value = _response(status_code=304, text="")
+        result = WebFetcher.fetch("https://example.com/page")
+
+    assert result.status_code == 200
+    assert result.text == "<p>page</p>"
+    assert session.get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+
+
+def test_fetch_retries_failed_requests_without_caching_errors(fake_redis):
+    session = MagicMock()
+    session.get.side_effect = [requests.ConnectionError("refused"), _response(status_code=500, text="error")]
+    with patch.object(WebFetcher, "_http_session", return_value=session):
+        result = WebFetcher.fetch("https://example.com/page", attempts=2)
+
+    assert result.status_code == 500
+    assert fake_redis == {}
+
+
+def test_fetch_all_keeps_the_order_of_the_urls():
+    urls = [f"https://example{i}.com" for i in range(5)]
+    session = MagicMock()
+    session.get.side_effect = lambda url, headers=None, timeout=None: _response(text=url)
+    with patch.object(WebFetcher, "_http_session", return_value=session):
+        results = WebFetcher.fetch_all(urls)
+
+    assert [result.text for result in results] == urls
+
+
+def test_wait_for_host_spaces_requests_to_the_same_host():
+    with patch.object(WebFetcher, "host_interval", return_value=2), \
+            patch("superagi.helper.web_fetcher.time.sleep") as mock_sleep:
+        WebFetcher._wait_for_host("https://example.com/1")
+        WebFetcher._wait_for_host("https://other.com/1")
+        WebFetcher._wait_for_host("https://example.com/2")
+
+    assert mock_sleep.call_count == 1
+    assert 1.5 < mock_sleep.call_args.args[0] <= 2
@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from superagi.jobs.execution_context import ExecutionContextCache, AgentExecutionContext
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    ExecutionContextCache.invalidate()
+    yield
+    ExecutionContextCache.invalidate()
+
+
+def _patch_builders():
+    organisation = MagicMock()
+    organisation.id = 7
+    return (patch('superagi.agent.agent_runtime_config.Agent.fetch_configuration', return_value={"model": "gpt-4"}),
+            patch('superagi.agent.agent_runtime_config.Agent.find_org_by_agent_id', return_value=organisation),
+            patch('superagi.agent.agent_runtime_config.AgentConfiguration.get_model_api_key',
+                  return_value={"api_key": "key", "provider": "OpenAI"}),
+            patch('superagi.llms.llm_model_factory.get_model', return_value=MagicMock()),
+            patch('superagi.agent.agent_runtime_config.AgentExecutionConfiguration.fetch_configuration',
+                  return_value={"goal": ["goal"]}))
+
+
+def test_get_or_build_reuses_context_while_config_unchanged():
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = ("2023-01-01", 3, None, 0)
+    build_memory = MagicMock(return_value="memory")
+    fetch_config, find_org, get_api_key, get_model, fetch_execution_config = _patch_builders()
+    with fetch_config as fetch_config_mock, find_org, get_api_key, get_model as get_model_mock, fetch_execution_config:
+        first = ExecutionContextCache.get_or_build(session, 1, 10, build_memory=build_memory)
+        second = ExecutionContextCache.get_or_build(session, 1, 10, build_memory=build_memory)
+
+    assert first is second
+    assert first.organisation_id == 7
+    assert first.model_api_key == "key"
+    assert first.memory == "memory"
+    assert first.runtime_config.goal == ["goal"]
+    assert fetch_config_mock.call_count == 1
+    assert get_model_mock.call_count == 1
+    build_memory.assert_called_once_with("OpenAI", "key")
+
+
+def test_get_or_build_rebuilds_context_on_config_change():
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.side_effect = [("2023-01-01", 3, None, 0), ("2023-01-02", 3, None, 0),
+                                                                        ("2023-01-02", 3, None, 0)]
+    build_memory = MagicMock(return_value="memory")
+    fetch_config, find_org, get_api_key, get_model, fetch_execution_config = _patch_builders()
+    with fetch_config as fetch_config_mock, find_org, get_api_key, get_model, fetch_execution_config:
+        first = ExecutionContextCache.get_or_build(session, 1, 10, build_memory=build_memory)
+        second = ExecutionContextCache.get_or_build(session, 1, 10, build_memory=build_memory)
+
+    assert first is not second
+    assert fetch_config_mock.call_count == 2
+    # memory store is shared for the same provider and api key
+    build_memory.assert_called_once()
+
+
+def test_invalidate_by_agent_id():
+    ExecutionContextCache.put(AgentExecutionContext(1, 10, 7, {}, "key", "OpenAI"))
+    ExecutionContextCache.put(AgentExecutionContext(1, 11, 7, {}, "key", "OpenAI"))
+    ExecutionContextCache.put(AgentExecutionContext(2, 12, 7, {}, "key", "OpenAI"))
+
+    ExecutionContextCache.invalidate(agent_id=1)
+
+    assert list(ExecutionContextCache._contexts.keys()) == [12]
+
+
+def test_expired_context_is_not_returned():
+    session = MagicMock()
+    context = AgentExecutionContext(1, 10, 7, {}, "key", "OpenAI", fingerprint=("2023-01-01", 3, None, 0))
+    context.created_at -= 10000
+    ExecutionContextCache.put(context)
+
+    assert ExecutionContextCache.get(session, 1, 10) is None
@@ -0,0 +1,50 @@
+from unittest.mock import MagicMock, patch
+
+from superagi.jobs.step_scheduler import StepScheduler
+
+
+@patch('superagi.worker.execute_agent')
+def test_schedule_next_step_is_not_delayed(mock_execute_agent):
+    StepScheduler.schedule_next_step(5)
+
+    args, kwargs = mock_execute_agent.apply_async.call_args
+    assert args[0][0] == 5
+    assert kwargs["countdown"] is None
+
+
+@patch.object(StepScheduler, '_redis_client')
+def test_schedule_wait_step_scores_by_due_time(mock_redis_client):
+    with patch('superagi.jobs.step_scheduler.time.time', return_value=1000):
+        StepScheduler.schedule_wait_step(5, 60)
+
+    mock_redis_client.return_value.zadd.assert_called_once_with(StepScheduler.WAIT_STEP_QUEUE, {"5": 1060})
+
+
+@patch.object(StepScheduler, '_redis_client')
+def test_pop_due_wait_steps_returns_claimed_executions(mock_redis_client):
+    client = mock_redis_client.return_value
+    client.zrangebyscore.return_value = ["5", "6"]
+    # another worker claimed execution 6 first
+    client.zrem.side_effect = [1, 0]
+
+    assert StepScheduler.pop_due_wait_steps(now=1000) == [5]
+    client.zrangebyscore.assert_called_once_with(StepScheduler.WAIT_STEP_QUEUE, 0, 1000)
+
+
+@patch('superagi.worker.object_session')
+def test_answered_permission_wakes_execution_after_commit(mock_object_session):
+    from superagi.worker import agent_execution_permission_status_change, wake_permission_blocked_executions
+    session = MagicMock()
+    session.info = {}
+    mock_object_session.return_value = session
+    permission = MagicMock(agent_execution_id=9)
+
+    agent_execution_permission_status_change(permission, "APPROVED", "PENDING", None)
+    assert session.info["answered_permission_executions"] == {9}
+
+    with patch('superagi.worker.sys') as mock_sys, patch.object(StepScheduler, 'wake') as mock_wake:
+        del mock_sys._called_from_test
+        wake_permission_blocked_executions(session)
+
+    mock_wake.assert_called_once_with(9)
+    assert "answered_permission_executions" not in session.info
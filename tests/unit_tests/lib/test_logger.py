@@ -0,0 +1,68 @@
+import json
+import logging
+from unittest.mock import MagicMock
+
+from superagi.lib.logger import JsonFormatter, LogMessage, TextFormatter, log_context, logger, truncate_message
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self, formatter):
+        super().__init__()
+        self.setFormatter(formatter)
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def capture(formatter):
+    handler = CaptureHandler(formatter)
+    handler.addFilter(logger.logger.handlers[0].filters[0])
+    logger.logger.addHandler(handler)
+    return handler
+
+
+def test_extra_args_are_logged_in_one_record_with_the_caller():
+    handler = capture(TextFormatter(fmt='%(filename)s - %(message)s'))
+    try:
+        logger.info("Prompt:", ["message"])
+    finally:
+        logger.logger.removeHandler(handler)
+
+    assert handler.lines == ["test_logger.py - Prompt: ['message']"]
+
+
+def test_disabled_level_does_not_format_the_message():
+    payload = MagicMock()
+    level = logger.logger.level
+    logger.logger.setLevel(logging.INFO)
+    try:
+        logger.debug("Tool Response :", payload)
+    finally:
+        logger.logger.setLevel(level)
+
+    payload.__str__.assert_not_called()
+
+
+def test_json_records_carry_context_ids_and_truncated_message():
+    handler = capture(JsonFormatter(max_message_length=5))
+    try:
+        with log_context(agent_execution_id=1):
+            with log_context(agent_workflow_step_id=2):
+                logger.warning("response text")
+        logger.warning("outside")
+    finally:
+        logger.logger.removeHandler(handler)
+
+    entry = json.loads(handler.lines[0])
+    assert entry["agent_execution_id"] == 1
+    assert entry["agent_workflow_step_id"] == 2
+    assert entry["message"] == "respo... [8 characters omitted]"
+    assert entry["file"] == "test_logger.py"
+    assert "agent_execution_id" not in json.loads(handler.lines[1])
+
+
+def test_log_message_and_truncation():
+    assert str(LogMessage("Tasks:", (["a"], 2))) == "Tasks: ['a'] 2"
+    assert truncate_message("short", 0) == "short"
+    assert truncate_message("abcdef", 3) == "abc... [3 characters omitted]"
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+from superagi.llms.base_llm import BaseLlm
+from superagi.llms.utils.async_pool import AsyncLlmPool
+
+
+class BlockingLlm(BaseLlm):
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def chat_completion(self, messages, max_tokens=100):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        threading.Event().wait(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        return {"content": messages[0]["content"], "max_tokens": max_tokens}
+
+    def get_source(self):
+        return "blocking"
+
+    def get_api_key(self):
+        return "key"
+
+    def get_model(self):
+        return "model"
+
+    def get_models(self):
+        return ["model"]
+
+    def verify_access_key(self):
+        return True
+
+
+def test_concurrency_limit_from_config():
+    with patch('superagi.llms.utils.async_pool.get_config',
+               side_effect=lambda key, default=None: {"LLM_CONCURRENCY_LIMITS": {"openai": 7},
+                                                      "LLM_MAX_CONCURRENCY": 20}.get(key, default)):
+        assert AsyncLlmPool.concurrency_limit("openai") == 7
+        assert AsyncLlmPool.concurrency_limit("Local LLM") == 1
+        assert AsyncLlmPool.concurrency_limit("replicate") == 20
+
+
+def test_session_is_shared_within_a_loop():
+    async def run():
+        first = AsyncLlmPool.get_session()
+        second = AsyncLlmPool.get_session()
+        await AsyncLlmPool.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first is second
+    assert first.closed
+
+
+def test_default_achat_completion_is_bounded_by_provider_limit():
+    llm = BlockingLlm()
+    messages = [{"role": "user", "content": "hello"}]
+
+    async def run():
+        return await asyncio.gather(*[llm.achat_completion(messages, max_tokens=10) for _ in range(4)])
+
+    with patch.object(AsyncLlmPool, 'concurrency_limit', return_value=2):
+        results = asyncio.run(run())
+
+    assert results == [{"content": "hello", "max_tokens": 10}] * 4
+    assert llm.max_in_flight == 2
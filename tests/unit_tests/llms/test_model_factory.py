@@ -1,8 +1,11 @@
+from collections import OrderedDict
+
 import pytest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from superagi.llms.google_palm import GooglePalm
 from superagi.llms.hugging_face import HuggingFace
+from superagi.helper.model_registry import ModelRegistry
 from superagi.llms.llm_model_factory import get_model, build_model_with_api_key
 from superagi.llms.openai import OpenAi
 from superagi.llms.replicate import Replicate
@@ -75,8 +78,51 @@ def test_build_model_with_hugging_face(mock_hugging_face, monkeypatch):
     mock_hugging_face.assert_called_once_with(api_key='fake_key')
     assert isinstance(model, Mock)
 
-def test_build_model_with_unknown_provider(capsys):  # capsys is a built-in pytest fixture for capturing print output
-    model = build_model_with_api_key('Unknown', 'fake_key')
+def test_build_model_with_unknown_provider():
+    with patch('superagi.llms.llm_model_factory.logger') as mock_logger:
+        model = build_model_with_api_key('Unknown', 'fake_key')
     assert model is None
-    captured = capsys.readouterr()
-    assert "Unknown provider." in captured.out
\ No newline at end of file
+    mock_logger.error.assert_called_once_with("Unknown provider: Unknown")
+
+def test_get_model_reuses_pooled_client(mock_openai, monkeypatch):
+    mock_openai.side_effect = lambda **kwargs: Mock()
+    monkeypatch.setattr('superagi.llms.llm_model_factory.OpenAi', mock_openai)
+    monkeypatch.setattr('superagi.llms.llm_model_factory._model_pool', OrderedDict())
+    monkeypatch.setattr('superagi.llms.llm_model_factory.ModelRegistry.fetch_model',
+                        lambda session, organisation_id, model: {"model_name": model, "provider": "OpenAI",
+                                                                 "end_point": "", "version": "",
+                                                                 "context_length": None})
+
+    first = get_model(1, 'fake_key', model='gpt-4', temperature=0.4)
+    second = get_model(1, 'fake_key', model='gpt-4', temperature=0.4)
+    other_key = get_model(1, 'other_key', model='gpt-4', temperature=0.4)
+
+    assert first is second
+    assert other_key is not first
+    assert mock_openai.call_count == 2
+    mock_openai.assert_any_call(model='gpt-4', api_key='fake_key', temperature=0.4)
+    mock_openai.assert_any_call(model='gpt-4', api_key='other_key', temperature=0.4)
+
+
+def test_model_pool_is_bounded_and_cleared_on_invalidation(monkeypatch):
+    mock_openai = Mock(side_effect=lambda **kwargs: Mock())
+    monkeypatch.setattr('superagi.llms.llm_model_factory.OpenAi', mock_openai)
+    monkeypatch.setattr('superagi.llms.llm_model_factory._model_pool', OrderedDict())
+    monkeypatch.setattr('superagi.llms.llm_model_factory.get_config', lambda key, default=None: 2)
+    monkeypatch.setattr('superagi.llms.llm_model_factory.ModelRegistry.fetch_model',
+                        lambda session, organisation_id, model: {"model_name": model, "provider": "OpenAI",
+                                                                 "end_point": "", "version": "",
+                                                                 "context_length": None})
+    monkeypatch.setattr(ModelRegistry, '_redis_client', Mock())
+
+    first = get_model(1, 'first_key', model='gpt-4')
+    get_model(2, 'second_key', model='gpt-4')
+    assert get_model(1, 'first_key', model='gpt-4') is first
+    get_model(3, 'third_key', model='gpt-4')
+    assert mock_openai.call_count == 3
+    # the client of organisation 2 was the least recently used
+    get_model(2, 'second_key', model='gpt-4')
+    assert mock_openai.call_count == 4
+
+    ModelRegistry.invalidate(1)
+    assert get_model(1, 'first_key', model='gpt-4') is not first
@@ -1,8 +1,11 @@
+import asyncio
+
 import openai
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from superagi.llms.openai import OpenAi, MAX_RETRY_ATTEMPTS
+from superagi.llms.utils.async_pool import AsyncLlmPool
 
 
 @patch('superagi.llms.openai.openai')
@@ -31,7 +34,9 @@ def test_chat_completion(mock_openai):
         max_tokens=max_tokens,
         top_p=openai_instance.top_p,
         frequency_penalty=openai_instance.frequency_penalty,
-        presence_penalty=openai_instance.presence_penalty
+        presence_penalty=openai_instance.presence_penalty,
+        api_key=api_key,
+        api_base=openai_instance.api_base
     )
 
 
@@ -113,3 +118,35 @@ def test_verify_access_key():
     openai_instance = OpenAi(api_key, model=model)
     result = openai_instance.verify_access_key()
     assert result is False
+
+
+@patch('superagi.llms.openai.AsyncLlmPool.get_session')
+@patch('superagi.llms.openai.openai')
+def test_achat_completion(mock_openai, mock_get_session):
+    openai_instance = OpenAi('test_key', model='gpt-4')
+    messages = [{"role": "system", "content": "You are a helpful assistant."}]
+    mock_chat_response = MagicMock()
+    mock_chat_response.choices[0].message = {"content": "I'm here to help!"}
+    mock_openai.ChatCompletion.acreate = AsyncMock(return_value=mock_chat_response)
+
+    result = asyncio.run(openai_instance.achat_completion(messages, 100))
+
+    assert result == {"response": mock_chat_response, "content": "I'm here to help!"}
+    mock_openai.aiosession.set.assert_called_once_with(mock_get_session.return_value)
+    assert mock_openai.ChatCompletion.acreate.call_args.kwargs["max_tokens"] == 100
+
+
+@patch('superagi.llms.openai.openai')
+def test_achat_completion_authentication_error(mock_openai):
+    openai_instance = OpenAi('test_key', model='gpt-4')
+    mock_openai.ChatCompletion.acreate = AsyncMock(side_effect=openai.error.AuthenticationError("bad key"))
+
+    async def run():
+        try:
+            return await openai_instance.achat_completion([{"role": "user", "content": "hi"}], 100)
+        finally:
+            await AsyncLlmPool.close()
+
+    result = asyncio.run(run())
+
+    assert result["error"] == "ERROR_AUTHENTICATION"
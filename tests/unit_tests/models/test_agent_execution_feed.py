@@ -25,3 +25,20 @@ def test_get_last_tool_response_with_tool_name():
 
     result = AgentExecutionFeed.get_last_tool_response(mock_session, 2, "test2")
     assert result == agent_execution_feed_2.feed
+
+
+def test_populate_token_count_on_insert():
+    from superagi.models.agent_execution_feed import populate_token_count
+    from superagi.helper.token_counter import TokenCounter
+    from unittest.mock import patch
+
+    feed = AgentExecutionFeed(agent_execution_id=2, feed="Tool test1", role='system')
+    counted_feed = AgentExecutionFeed(agent_execution_id=2, feed="Tool test2", role='system', token_count=5)
+
+    with patch.object(TokenCounter, "count_content_tokens", return_value=3) as mock_count_content_tokens:
+        populate_token_count(None, None, feed)
+        populate_token_count(None, None, counted_feed)
+
+    assert feed.token_count == 3
+    assert counted_feed.token_count == 5
+    mock_count_content_tokens.assert_called_once_with("Tool test1")
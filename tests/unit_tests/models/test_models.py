@@ -232,4 +232,15 @@ def test_fetch_model_details(mock_models_config, mock_session):
         "token_limit": 100,
         "type": "type1",
         "model_provider": "example_provider"
-    }
\ No newline at end of file
+    }
+@patch('superagi.helper.model_registry.ModelRegistry.invalidate')
+@patch('superagi.models.models.decrypt_data', return_value="key")
+@patch('superagi.models.models_config.ModelsConfig.store_api_key')
+def test_api_key_from_configurations_invalidates_model_registry(mock_store_api_key, mock_decrypt_data,
+                                                                 mock_invalidate, mock_session):
+    mock_session.query.return_value.filter.return_value.first.side_effect = [None, MagicMock(value="encrypted")]
+
+    Models.api_key_from_configurations(mock_session, 1)
+
+    mock_store_api_key.assert_called_once_with(mock_session, 1, "OpenAI", "key")
+    mock_invalidate.assert_called_once_with(1)
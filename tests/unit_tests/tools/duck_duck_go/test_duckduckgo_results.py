@@ -58,3 +58,13 @@ class TestDuckDuckGoSearchTool:
 
         results = self.your_obj.get_formatted_webpages(search_results, webpages)
         assert results == expected_results
+
+    @patch('superagi.tools.duck_duck_go.duck_duck_go_search.WebpageExtractor.extract_all_with_bs4')
+    def test_get_content_from_url_fetches_first_links_together(self, mock_extract_all):
+        links = ["https://example.com/1", "https://example.com/2", "https://example.com/3", "https://example.com/4"]
+        mock_extract_all.return_value = ["Webpage 1", "Webpage 2", "Webpage 3"]
+
+        webpages = self.your_obj.get_content_from_url(links)
+
+        assert webpages == ["Webpage 1", "Webpage 2", "Webpage 3"]
+        mock_extract_all.assert_called_once_with(links[:3], attempts=3)
@@ -61,14 +61,18 @@ class MockGithubHelper:
     def add_line_comment_to_pull_request(self, *args, **kwargs):
         return True
 
+    def add_review_to_pull_request(self, *args, **kwargs):
+        return True
+
 
 # Your test case
 def test_execute():
     with patch('superagi.tools.github.review_pull_request.GithubHelper', MockGithubHelper), \
             patch('superagi.tools.github.review_pull_request.TokenCounter.count_message_tokens', return_value=3000), \
+            patch('superagi.tools.github.review_pull_request.TokenCounter.count_each_message_tokens', return_value=[3000]), \
             patch('superagi.tools.github.review_pull_request.Agent.find_org_by_agent_id', return_value=Mock()), \
             patch.object(GithubReviewPullRequest, 'get_tool_config', return_value='mock_value'), \
-            patch.object(GithubReviewPullRequest, 'run_code_review', return_value=None):
+            patch.object(GithubReviewPullRequest, 'run_code_review', return_value={"content": '{"comments": []}'}):
         # Replace 'your_module' with the actual module name
 
         tool = GithubReviewPullRequest()
@@ -80,3 +84,119 @@ def test_execute():
         result = tool._execute('mock_repo', 'mock_owner', 42)
 
         assert result == 'Added comments to the pull request:42'
+
+
+def test_split_pull_request_content_packs_file_diffs_greedily():
+    tool = GithubReviewPullRequest()
+    tool.llm = MockLLM()
+    pull_request_arr = ["", " a/one " + "x " * 400, " a/two " + "y " * 400, " a/three " + "z " * 10]
+
+    with patch('superagi.tools.github.review_pull_request.TokenCounter.count_message_tokens', return_value=10), \
+            patch('superagi.tools.github.review_pull_request.TokenCounter.count_each_message_tokens',
+                  side_effect=lambda messages, model: [len(message["content"].split()) + 10 for message in messages]) \
+            as mock_count_each:
+        result = tool.split_pull_request_content_into_multiple_parts(1000, pull_request_arr)
+
+    mock_count_each.assert_called_once()
+    assert len(result) == 2
+    assert result[0].startswith("diff --git a/one")
+    assert result[1].startswith("diff --git a/two") and "a/three" in result[1]
+
+
+def test_execute_posts_all_comments_as_one_review():
+    diff = "diff --git a/file.py b/file.py\n@@ -1,2 +1,3 @@\n+ line1\n+ line2"
+    github_helper = Mock()
+    github_helper.get_pull_request_content.return_value = diff + "\n" + diff.replace("file.py", "other.py")
+    github_helper.get_latest_commit_id_of_pull_request.return_value = "commit_id"
+
+    def review(content, model_token_limit):
+        file_path = "file.py" if "file.py" in content else "other.py"
+        return {"content": '{"comments": [{"file_path": "%s", "line": 1, "comment": "Looks good"}, '
+                           '{"file_path": "missing.py", "line": 1, "comment": "Not in the diff"}]}' % file_path}
+
+    with patch('superagi.tools.github.review_pull_request.GithubHelper', return_value=github_helper), \
+            patch('superagi.tools.github.review_pull_request.Agent.find_org_by_agent_id', return_value=Mock()), \
+            patch('superagi.tools.github.review_pull_request.TokenCounter.token_limit', return_value=20), \
+            patch('superagi.tools.github.review_pull_request.TokenCounter.count_message_tokens', return_value=3), \
+            patch('superagi.tools.github.review_pull_request.TokenCounter.count_each_message_tokens',
+                  side_effect=lambda messages, model: [10 for _ in messages]), \
+            patch.object(GithubReviewPullRequest, 'get_tool_config', return_value='mock_value'), \
+            patch.object(GithubReviewPullRequest, 'run_code_review', side_effect=review) as mock_run_code_review:
+        tool = GithubReviewPullRequest()
+        tool.llm = Mock()
+        tool.llm.get_model = Mock(return_value='mock_model')
+        tool.toolkit_config = Mock()
+
+        result = tool._execute('mock_repo', 'mock_owner', 42)
+
+    assert result == 'Added comments to the pull request:42'
+    assert mock_run_code_review.call_count == 2
+    github_helper.add_review_to_pull_request.assert_called_once()
+    comments = github_helper.add_review_to_pull_request.call_args.args[4]
+    assert comments == [{"path": "file.py", "position": 2, "body": "Looks good"},
+                        {"path": "other.py", "position": 2, "body": "Looks good"}]
+    github_helper.add_line_comment_to_pull_request.assert_not_called()
+
+
+def test_find_position_in_diff_stops_at_next_file():
+    tool = GithubReviewPullRequest()
+    diff = "@@ -1,2 +1,2 @@\n+ line1\n+ line2\ndiff --git a/other.py b/other.py\n@@ -1,3 +1,3 @@\n+ line1\n+ line2\n+ line3"
+
+    assert tool.find_position_in_diff(diff, 2) == 3
+    assert tool.find_position_in_diff(diff, 3) is None
+
+
+def _execute_review(github_helper, comments):
+    diff = "diff --git a/file.py b/file.py\n@@ -1,2 +1,2 @@\n+ line1\n+ line2\n"
+    github_helper.get_pull_request_content.return_value = diff + diff.replace("file.py", "other.py")
+    github_helper.get_latest_commit_id_of_pull_request.return_value = "commit_id"
+    review = {"content": str({"comments": comments})}
+
+    with patch('superagi.tools.github.review_pull_request.GithubHelper', return_value=github_helper), \
+            patch('superagi.tools.github.review_pull_request.Agent.find_org_by_agent_id', return_value=Mock()), \
+            patch('superagi.tools.github.review_pull_request.TokenCounter.token_limit', return_value=1000), \
+            patch('superagi.tools.github.review_pull_request.TokenCounter.count_message_tokens', return_value=3), \
+            patch('superagi.tools.github.review_pull_request.TokenCounter.count_each_message_tokens',
+                  side_effect=lambda messages, model: [10 for _ in messages]), \
+            patch.object(GithubReviewPullRequest, 'get_tool_config', return_value='mock_value'), \
+            patch.object(GithubReviewPullRequest, 'run_code_review', return_value=review):
+        tool = GithubReviewPullRequest()
+        tool.llm = Mock()
+        tool.llm.get_model = Mock(return_value='mock_model')
+        tool.toolkit_config = Mock()
+        return tool._execute('mock_repo', 'mock_owner', 42)
+
+
+def test_execute_skips_comment_with_out_of_range_line():
+    github_helper = Mock()
+
+    result = _execute_review(github_helper, [{"file_path": "file.py", "line": 2, "comment": "Looks good"},
+                                             {"file_path": "file.py", "line": 3, "comment": "Out of range"}])
+
+    assert result == 'Added comments to the pull request:42'
+    comments = github_helper.add_review_to_pull_request.call_args.args[4]
+    assert comments == [{"path": "file.py", "position": 3, "body": "Looks good"}]
+
+
+def test_execute_posts_comments_one_by_one_when_review_is_rejected():
+    github_helper = Mock()
+    github_helper.add_review_to_pull_request.return_value = None
+    github_helper.add_line_comment_to_pull_request.side_effect = [None, {"id": 1}]
+
+    result = _execute_review(github_helper, [{"file_path": "file.py", "line": 1, "comment": "First"},
+                                             {"file_path": "other.py", "line": 2, "comment": "Second"}])
+
+    assert result == 'Added comments to the pull request:42'
+    assert github_helper.add_line_comment_to_pull_request.call_count == 2
+    github_helper.add_line_comment_to_pull_request.assert_called_with('mock_owner', 'mock_repo', 42, "commit_id",
+                                                                      "other.py", 3, "Second")
+
+
+def test_execute_returns_error_when_no_comment_is_posted():
+    github_helper = Mock()
+    github_helper.add_review_to_pull_request.return_value = None
+    github_helper.add_line_comment_to_pull_request.return_value = None
+
+    result = _execute_review(github_helper, [{"file_path": "file.py", "line": 1, "comment": "First"}])
+
+    assert result == 'Error: Unable to add comments to the pull request 42'
@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from superagi.vector_store.embedding.embedding_cache import EmbeddingCache, DiskEmbeddingStore
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    EmbeddingCache.clear()
+    yield
+    EmbeddingCache.clear()
+
+
+def test_get_many_counts_hits_and_misses():
+    with patch.object(EmbeddingCache, '_get_backend', return_value=None):
+        EmbeddingCache.put_many("model", ["hello"], [[0.5, 1.0]])
+
+        assert EmbeddingCache.get_many("model", ["hello", "world"]) == [[0.5, 1.0], None]
+        assert EmbeddingCache.get_many("other-model", ["hello"]) == [None]
+
+    stats = EmbeddingCache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_memory_is_bounded_by_bytes():
+    # every vector of 4 float32 takes 16 bytes
+    with patch.object(EmbeddingCache, '_get_backend', return_value=None), \
+            patch.object(EmbeddingCache, 'memory_limit', return_value=32):
+        EmbeddingCache.put_many("model", ["a", "b"], [[0.5] * 4, [1.0] * 4])
+        EmbeddingCache.get_many("model", ["a"])
+        EmbeddingCache.put_many("model", ["c"], [[2.0] * 4])
+
+        assert EmbeddingCache.get_many("model", ["a", "b", "c"]) == [[0.5] * 4, None, [2.0] * 4]
+    assert EmbeddingCache.stats()["memory_bytes"] == 32
+
+
+def test_get_many_falls_back_to_backend(tmp_path):
+    backend = DiskEmbeddingStore(str(tmp_path / "cache.sqlite3"), max_entries=10)
+    with patch.object(EmbeddingCache, '_get_backend', return_value=backend):
+        EmbeddingCache.put_many("model", ["hello"], [[0.5, 1.0]])
+        EmbeddingCache.clear()
+
+        assert EmbeddingCache.get_many("model", ["hello"]) == [[0.5, 1.0]]
+
+
+def test_disk_store_evicts_least_recently_used(tmp_path):
+    store = DiskEmbeddingStore(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    store.put_many({("model", "a"): b"a"})
+    store.put_many({("model", "b"): b"b"})
+    store.get_many([("model", "a")])
+    store.put_many({("model", "c"): b"c"})
+
+    assert store.get_many([("model", "a"), ("model", "b"), ("model", "c")]) == [b"a", None, b"c"]
+
+
+def test_get_dimension_embeds_sample_once():
+    embedding_model = MagicMock()
+    embedding_model.model = "model"
+    embedding_model.get_embedding.return_value = [0.1, 0.2, 0.3]
+
+    assert EmbeddingCache.get_dimension(embedding_model) == 3
+    assert EmbeddingCache.get_dimension(embedding_model) == 3
+    embedding_model.get_embedding.assert_called_once_with("sample")
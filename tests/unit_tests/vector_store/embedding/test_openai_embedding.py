@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+import pytest
+
+from superagi.vector_store.embedding.embedding_cache import EmbeddingCache
+from superagi.vector_store.embedding.openai import OpenAiEmbedding
+from superagi.vector_store.embedding.palm import PalmEmbedding
+
+
+@pytest.fixture(autouse=True)
+def in_memory_embedding_cache():
+    EmbeddingCache.clear()
+    with patch.object(EmbeddingCache, '_get_backend', return_value=None):
+        yield
+    EmbeddingCache.clear()
+
+
+def _count_tokens(text):
+    return len(text.split())
+
+
+@patch('superagi.vector_store.embedding.openai.get_config', return_value=5)
+@patch('superagi.vector_store.embedding.openai.TokenCounter.count_content_tokens', side_effect=_count_tokens)
+def test_split_batches_by_token_budget(mock_count, mock_get_config):
+    texts = ["one two", "three four", "five", "six seven eight nine ten eleven", "twelve"]
+
+    batches = OpenAiEmbedding.split_batches(texts)
+
+    assert batches == [["one two", "three four", "five"], ["six seven eight nine ten eleven"], ["twelve"]]
+
+
+@patch('superagi.vector_store.embedding.openai.OpenAiEmbedding.split_batches',
+       return_value=[["a", "b"], ["c"]])
+@patch('superagi.vector_store.embedding.openai.openai')
+def test_get_embeddings_makes_one_request_per_batch(mock_openai, mock_split_batches):
+    mock_openai.Embedding.create.side_effect = [
+        {"data": [{"index": 1, "embedding": [2.0]}, {"index": 0, "embedding": [1.0]}]},
+        {"data": [{"index": 0, "embedding": [3.0]}]},
+    ]
+    embedding_model = OpenAiEmbedding(api_key="key")
+
+    embeddings = embedding_model.get_embeddings(["a", "b", "c"])
+
+    assert embeddings == [[1.0], [2.0], [3.0]]
+    assert mock_openai.Embedding.create.call_count == 2
+    mock_openai.Embedding.create.assert_any_call(api_key="key", input=["a", "b"], engine=embedding_model.model)
+
+
+@patch('superagi.vector_store.embedding.palm.palm')
+def test_palm_get_embeddings_falls_back_to_single_requests(mock_palm):
+    mock_palm.generate_embeddings.side_effect = lambda model, text: {"embedding": [len(text)]}
+
+    embeddings = PalmEmbedding(api_key="key").get_embeddings(["a", "bb"])
+
+    assert embeddings == [[1], [2]]
+
+
+@patch('superagi.vector_store.embedding.openai.OpenAiEmbedding.split_batches', side_effect=lambda texts: [texts])
+@patch('superagi.vector_store.embedding.openai.openai')
+def test_get_embeddings_only_requests_uncached_texts(mock_openai, mock_split_batches):
+    EmbeddingCache.put_many("text-embedding-ada-002", ["a"], [[1.0]])
+    mock_openai.Embedding.create.return_value = {"data": [{"index": 0, "embedding": [2.0]}]}
+
+    embeddings = OpenAiEmbedding(api_key="key").get_embeddings(["a", "b", "b"])
+
+    assert embeddings == [[1.0], [2.0], [2.0]]
+    assert mock_openai.Embedding.create.call_args.kwargs["input"] == ["b"]
+
+
+@patch('superagi.vector_store.embedding.openai.OpenAiEmbedding.split_batches', return_value=[["a"], ["b"]])
+@patch('superagi.vector_store.embedding.openai.openai')
+def test_get_embeddings_raises_when_a_batch_fails(mock_openai, mock_split_batches):
+    mock_openai.Embedding.create.side_effect = [{"data": [{"index": 0, "embedding": [1.0]}]},
+                                                Exception("Rate limit reached")]
+
+    with pytest.raises(Exception, match="Rate limit reached"):
+        OpenAiEmbedding(api_key="key").get_embeddings(["a", "b"])
+
+    assert EmbeddingCache.get_many("text-embedding-ada-002", ["a", "b"]) == [[1.0], None]
+
+
+@patch('superagi.vector_store.embedding.palm.palm')
+def test_palm_get_embeddings_raises_when_an_embedding_fails(mock_palm):
+    mock_palm.generate_embeddings.side_effect = Exception("Invalid API key")
+
+    with pytest.raises(ValueError, match="Invalid API key"):
+        PalmEmbedding(api_key="key").get_embeddings(["a", "bb"])
@@ -1,4 +1,5 @@
 from unittest.mock import MagicMock, patch
+import redis
 import numpy as np
 from superagi.vector_store.document import Document
 from superagi.vector_store.redis import Redis
@@ -39,4 +40,102 @@ def test_get_matching_text(redis_mock):
 
     # Assert
     redis_object.embedding_model.get_embedding.assert_called_once_with(query)
-    assert "documents" in result
\ No newline at end of file
+    assert "documents" in result
+
+def test_convert_to_redis_filters():
+    redis_object = Redis(None, None)
+
+    assert redis_object._convert_to_redis_filters(None) == "*"
+    assert redis_object._convert_to_redis_filters({}) == "*"
+    assert redis_object._convert_to_redis_filters({"agent_execution_id": 12, "agent_id": 3}) == \
+           "(@agent_execution_id:{12} @agent_id:{3})"
+    assert redis_object._convert_to_redis_filters({"unknown": "value"}) == "*"
+
+
+@patch('redis.Redis')
+def test_add_texts_stores_indexed_metadata_fields(redis_mock):
+    redis_object = Redis("mock_index", MagicMock())
+    redis_object.embedding_model.get_embeddings.return_value = [[0.1], [0.2]]
+
+    redis_object.add_texts(["Hello", "World"], [{"agent_execution_id": 12}, {}])
+
+    pipe = redis_object.redis_client.pipeline.return_value
+    first_mapping = pipe.hset.call_args_list[0].kwargs["mapping"]
+    second_mapping = pipe.hset.call_args_list[1].kwargs["mapping"]
+    assert first_mapping["agent_execution_id"] == "12"
+    assert "agent_execution_id" not in second_mapping
+    redis_object.embedding_model.get_embeddings.assert_called_once_with(["Hello", "World"])
+
+
+@patch('superagi.vector_store.redis.EmbeddingCache.get_dimension', return_value=3)
+@patch('redis.Redis')
+def test_create_index_creates_hnsw_index_once(redis_mock, mock_get_dimension):
+    Redis._existing_indexes.clear()
+    redis_object = Redis("new_index", MagicMock())
+    redis_object.redis_client.ft.return_value.info.side_effect = redis.ResponseError("Unknown Index name")
+
+    redis_object.create_index()
+    redis_object.create_index()
+
+    ft = redis_object.redis_client.ft.return_value
+    ft.info.assert_called_once()
+    fields = ft.create_index.call_args.kwargs["fields"]
+    assert [field.name for field in fields] == ["tag", "agent_execution_id", "agent_id", "content_vector"]
+    assert "HNSW" in fields[-1].args
+    Redis._existing_indexes.clear()
+
+
+@patch('redis.Redis')
+def test_create_index_adds_missing_tag_fields(redis_mock):
+    Redis._existing_indexes.clear()
+    redis_object = Redis("old_index", MagicMock())
+    redis_object.redis_client.ft.return_value.info.return_value = {
+        "attributes": [["identifier", "tag", "attribute", "tag", "type", "TAG"]]}
+
+    redis_object.create_index()
+
+    assert redis_object.redis_client.ft.return_value.alter_schema_add.call_count == 2
+    Redis._existing_indexes.clear()
+
+
+@patch('redis.Redis')
+def test_create_index_keeps_index_with_other_algorithm(redis_mock):
+    Redis._existing_indexes.clear()
+    redis_object = Redis("flat_index", MagicMock())
+    ft = redis_object.redis_client.ft.return_value
+    ft.info.return_value = {"attributes": [
+        ["identifier", "agent_execution_id", "attribute", "agent_execution_id", "type", "TAG"],
+        ["identifier", "agent_id", "attribute", "agent_id", "type", "TAG"],
+        ["identifier", "content_vector", "attribute", "content_vector", "type", "VECTOR", "algorithm", "FLAT"]]}
+
+    with patch('superagi.vector_store.redis.get_config', side_effect=lambda key, default=None: default):
+        redis_object.create_index()
+    ft.dropindex.assert_not_called()
+
+    Redis._existing_indexes.clear()
+    with patch('superagi.vector_store.redis.get_config',
+               side_effect=lambda key, default=None: True if key == "REDIS_VECTOR_INDEX_REBUILD" else default), \
+            patch('superagi.vector_store.redis.EmbeddingCache.get_dimension', return_value=3):
+        redis_object.create_index()
+    ft.dropindex.assert_called_once_with(delete_documents=False)
+    assert "HNSW" in ft.create_index.call_args.kwargs["fields"][-1].args
+    Redis._existing_indexes.clear()
+
+
+@patch('redis.Redis')
+def test_create_index_backfills_tag_fields_once(redis_mock):
+    Redis._existing_indexes.clear()
+    redis_object = Redis("old_index", MagicMock())
+    client = redis_object.redis_client
+    client.ft.return_value.info.return_value = {"attributes": []}
+    client.get.return_value = None
+    client.scan_iter.return_value = ["doc:old_index:1", "doc:old_index:2"]
+    pipe = client.pipeline.return_value
+    pipe.execute.side_effect = [[['{"agent_execution_id": 5, "agent_id": 2}', None, None],
+                                 ['{"agent_execution_id": 6, "agent_id": 2}', "6", "2"]], []]
+
+    redis_object.create_index()
+
+    pipe.hset.assert_called_once_with("doc:old_index:1", mapping={"agent_execution_id": "5", "agent_id": "2"})
+    client.set.assert_called_once_with("vector_index_tag_fields_backfilled:old_index", "1")
+    Redis._existing_indexes.clear()
@@ -63,6 +63,23 @@ class TestVectorFactory(unittest.TestCase):
             VectorFactory.get_vector_storage(VectorStoreType.get_vector_store_type('Unsupported'), 'test_index',
                                              mock_embedding_model)
 
+    @patch('superagi.vector_store.vector_factory.get_config')
+    @patch('superagi.vector_store.vector_factory.pinecone')
+    @patch('superagi.vector_store.vector_factory.Qdrant')
+    def test_get_vector_storage_raises_when_embedding_fails(self, mock_qdrant, mock_pinecone, mock_get_config):
+        mock_get_config.return_value = 'test'
+        mock_embedding_model = MagicMock()
+        mock_embedding_model.get_embedding.return_value = {"error": "Invalid API key"}
+        mock_pinecone.list_indexes.return_value = []
+
+        with self.assertRaises(ValueError):
+            VectorFactory.get_vector_storage(VectorStoreType.PINECONE, 'test_index', mock_embedding_model)
+        mock_pinecone.create_index.assert_not_called()
+
+        with self.assertRaises(ValueError):
+            VectorFactory.get_vector_storage(VectorStoreType.QDRANT, 'test_index', mock_embedding_model)
+        mock_qdrant.create_collection.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()